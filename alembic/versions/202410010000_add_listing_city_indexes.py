@@ -0,0 +1,47 @@
+from alembic import op
+import sqlalchemy as sa
+
+revision = "202410010000"
+down_revision = "202409010000"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # Built concurrently so large listing tables stay writable during the migration.
+    with op.get_context().autocommit_block():
+        # Serves the default case-insensitive "contains" city filter (ILIKE '%city%').
+        op.create_index(
+            "ix_listings_city_trgm",
+            "listings",
+            ["city"],
+            postgresql_using="gin",
+            postgresql_ops={"city": "gin_trgm_ops"},
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        # Serves exact and prefix city matches plus the city autocomplete endpoint.
+        op.create_index(
+            "ix_listings_city_lower",
+            "listings",
+            [sa.text("lower(city) text_pattern_ops")],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_listings_city_lower",
+            table_name="listings",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+        op.drop_index(
+            "ix_listings_city_trgm",
+            table_name="listings",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
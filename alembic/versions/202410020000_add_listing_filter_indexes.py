@@ -0,0 +1,57 @@
+from alembic import op
+import sqlalchemy as sa
+
+revision = "202410020000"
+down_revision = "202410010000"
+branch_labels = None
+depends_on = None
+
+# (name, table, columns, partial predicate) matching the filter/sort combinations
+# issued by ListingRepository.list. Every sort index ends in id for the keyset
+# tie-breaker.
+INDEXES = [
+    ("ix_listings_created_at_id", "listings", ["created_at DESC", "id DESC"], None),
+    ("ix_listings_price_id", "listings", ["price", "id"], None),
+    ("ix_listings_area_sqm_id", "listings", ["area_sqm", "id"], None),
+    ("ix_listings_rooms_id", "listings", ["rooms", "id"], None),
+    (
+        "ix_listings_types_created_at_id",
+        "listings",
+        ["listing_type", "property_type", "created_at DESC", "id DESC"],
+        None,
+    ),
+    (
+        "ix_listings_user_id_created_at_id",
+        "listings",
+        ["user_id", "created_at DESC", "id DESC"],
+        None,
+    ),
+    ("ix_listings_rent_price_id", "listings", ["price", "id"], "listing_type = 'rent'"),
+    ("ix_listings_sale_price_id", "listings", ["price", "id"], "listing_type = 'sale'"),
+    (
+        "ix_listing_images_listing_id_created_at",
+        "listing_images",
+        ["listing_id", "created_at"],
+        None,
+    ),
+]
+
+
+def upgrade() -> None:
+    # Built concurrently so large listing tables stay writable during the migration.
+    with op.get_context().autocommit_block():
+        for name, table, columns, where in INDEXES:
+            op.create_index(
+                name,
+                table,
+                [sa.text(column) for column in columns],
+                postgresql_where=sa.text(where) if where else None,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
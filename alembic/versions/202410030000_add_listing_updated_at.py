@@ -0,0 +1,57 @@
+from alembic import op
+import sqlalchemy as sa
+
+revision = "202410030000"
+down_revision = "202410020000"
+branch_labels = None
+depends_on = None
+
+BACKFILL_BATCH_SIZE = 10_000
+
+# Walks the primary key in batches and returns the last id of each, no row once done.
+BACKFILL_SQL = sa.text(
+    """
+    WITH batch AS (
+        SELECT id FROM listings WHERE id > :after ORDER BY id LIMIT :batch_size
+    ),
+    backfilled AS (
+        UPDATE listings SET updated_at = listings.created_at
+        FROM batch
+        WHERE listings.id = batch.id AND listings.updated_at IS NULL
+    )
+    SELECT id FROM batch ORDER BY id DESC LIMIT 1
+    """
+)
+
+
+def upgrade() -> None:
+    # Added without a default so existing rows are not rewritten in this transaction;
+    # the default set afterwards only applies to rows inserted from here on.
+    op.add_column("listings", sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True))
+    op.alter_column("listings", "updated_at", server_default=sa.text("now()"))
+
+    with op.get_context().autocommit_block():
+        # Committed batch by batch so listings stay writable during the backfill.
+        if op.get_context().as_sql:
+            op.execute("UPDATE listings SET updated_at = created_at WHERE updated_at IS NULL")
+        else:
+            after = "00000000-0000-0000-0000-000000000000"
+            while after is not None:
+                after = (
+                    op.get_bind()
+                    .execute(BACKFILL_SQL, {"after": after, "batch_size": BACKFILL_BATCH_SIZE})
+                    .scalar()
+                )
+        # A validated CHECK constraint lets SET NOT NULL skip its full-table scan under an
+        # exclusive lock; validating it only blocks schema changes.
+        op.execute(
+            "ALTER TABLE listings ADD CONSTRAINT ck_listings_updated_at_not_null "
+            "CHECK (updated_at IS NOT NULL) NOT VALID"
+        )
+        op.execute("ALTER TABLE listings VALIDATE CONSTRAINT ck_listings_updated_at_not_null")
+        op.alter_column("listings", "updated_at", nullable=False)
+        op.drop_constraint("ck_listings_updated_at_not_null", "listings", type_="check")
+
+
+def downgrade() -> None:
+    op.drop_column("listings", "updated_at")
@@ -0,0 +1,48 @@
+from alembic import op
+import sqlalchemy as sa
+
+revision = "202410040000"
+down_revision = "202410030000"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("listings", sa.Column("latitude", sa.Float(), nullable=True))
+    op.add_column("listings", sa.Column("longitude", sa.Float(), nullable=True))
+    op.create_check_constraint(
+        "ck_listings_latitude_range", "listings", "latitude BETWEEN -90 AND 90"
+    )
+    op.create_check_constraint(
+        "ck_listings_longitude_range", "listings", "longitude BETWEEN -180 AND 180"
+    )
+    op.create_check_constraint(
+        "ck_listings_location_complete",
+        "listings",
+        "(latitude IS NULL) = (longitude IS NULL)",
+    )
+    # Serves bounding-box, radius and map cluster queries (point <@ box).
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_listings_location",
+            "listings",
+            [sa.text("point(longitude, latitude)")],
+            postgresql_using="gist",
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_listings_location",
+            table_name="listings",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+    op.drop_constraint("ck_listings_location_complete", "listings", type_="check")
+    op.drop_constraint("ck_listings_longitude_range", "listings", type_="check")
+    op.drop_constraint("ck_listings_latitude_range", "listings", type_="check")
+    op.drop_column("listings", "longitude")
+    op.drop_column("listings", "latitude")
@@ -0,0 +1,46 @@
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "202410050000"
+down_revision = "202410040000"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Adding a stored generated column rewrites the table under an exclusive lock;
+    # schedule this migration in a maintenance window on large databases.
+    op.add_column(
+        "listings",
+        sa.Column(
+            "search_vector",
+            postgresql.TSVECTOR(),
+            sa.Computed(
+                "setweight(to_tsvector('simple', title), 'A') || "
+                "setweight(to_tsvector('simple', coalesce(description, '')), 'B')",
+                persisted=True,
+            ),
+            nullable=False,
+        ),
+    )
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_listings_search_vector",
+            "listings",
+            ["search_vector"],
+            postgresql_using="gin",
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_listings_search_vector",
+            table_name="listings",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+    op.drop_column("listings", "search_vector")
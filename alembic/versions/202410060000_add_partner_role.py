@@ -0,0 +1,27 @@
+from alembic import op
+
+revision = "202410060000"
+down_revision = "202410050000"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # New enum values cannot be used inside the transaction that adds them.
+    with op.get_context().autocommit_block():
+        op.execute("ALTER TYPE user_role_enum ADD VALUE IF NOT EXISTS 'partner'")
+
+
+def downgrade() -> None:
+    # PostgreSQL cannot drop an enum value, so the type is rebuilt without it and
+    # partners are demoted to regular users.
+    op.execute("UPDATE users SET role = 'user' WHERE role = 'partner'")
+    op.execute("ALTER TABLE users ALTER COLUMN role DROP DEFAULT")
+    op.execute("ALTER TYPE user_role_enum RENAME TO user_role_enum_old")
+    op.execute("CREATE TYPE user_role_enum AS ENUM ('user', 'moderator', 'admin')")
+    op.execute(
+        "ALTER TABLE users ALTER COLUMN role TYPE user_role_enum "
+        "USING role::text::user_role_enum"
+    )
+    op.execute("ALTER TABLE users ALTER COLUMN role SET DEFAULT 'user'")
+    op.execute("DROP TYPE user_role_enum_old")
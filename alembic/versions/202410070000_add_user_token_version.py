@@ -0,0 +1,19 @@
+from alembic import op
+import sqlalchemy as sa
+
+revision = "202410070000"
+down_revision = "202410060000"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # A constant default is stored in the catalog, so this does not rewrite the table.
+    op.add_column(
+        "users",
+        sa.Column("token_version", sa.Integer(), server_default="0", nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("users", "token_version")
@@ -0,0 +1,35 @@
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "202410080000"
+down_revision = "202410070000"
+branch_labels = None
+depends_on = None
+
+user_role_enum = postgresql.ENUM(name="user_role_enum", create_type=False)
+
+
+def upgrade() -> None:
+    op.create_table(
+        "refresh_sessions",
+        sa.Column("token_hash", sa.String(length=64), nullable=False),
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("role", user_role_enum, nullable=False),
+        sa.Column("token_version", sa.Integer(), nullable=False),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("token_hash"),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+    )
+    op.create_index("ix_refresh_sessions_user_id", "refresh_sessions", ["user_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_refresh_sessions_user_id", table_name="refresh_sessions")
+    op.drop_table("refresh_sessions")
@@ -0,0 +1,28 @@
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "202410090000"
+down_revision = "202410080000"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "deleted_users",
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column(
+            "deleted_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("user_id"),
+    )
+    op.create_index("ix_deleted_users_deleted_at", "deleted_users", ["deleted_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_deleted_users_deleted_at", table_name="deleted_users")
+    op.drop_table("deleted_users")
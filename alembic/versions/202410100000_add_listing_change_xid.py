@@ -0,0 +1,50 @@
+from alembic import op
+
+revision = "202410100000"
+down_revision = "202410090000"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # A constant default is stored in the catalog, so existing rows are not rewritten; they
+    # predate every search snapshot and are read by its first full build.
+    op.execute("ALTER TABLE listings ADD COLUMN change_xid xid8 NOT NULL DEFAULT '0'")
+    # Every writer, the feed import included, stamps the rows it writes with its
+    # transaction id, which the search engine's refresh watermark relies on.
+    op.execute(
+        """
+        CREATE FUNCTION listings_set_change_xid() RETURNS trigger AS $$
+        BEGIN
+            NEW.change_xid := pg_current_xact_id();
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        "CREATE TRIGGER listings_set_change_xid BEFORE INSERT OR UPDATE ON listings "
+        "FOR EACH ROW EXECUTE FUNCTION listings_set_change_xid()"
+    )
+    # Built concurrently so large listing tables stay writable during the migration.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_listings_change_xid",
+            "listings",
+            ["change_xid"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_listings_change_xid",
+            table_name="listings",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+    op.execute("DROP TRIGGER listings_set_change_xid ON listings")
+    op.execute("DROP FUNCTION listings_set_change_xid()")
+    op.drop_column("listings", "change_xid")
@@ -1,8 +1,9 @@
 from fastapi import APIRouter
 
-from app.api.v1 import auth, listings, users
+from app.api.v1 import auth, listings, metrics, users
 
 api_router = APIRouter(prefix="/api/v1")
 api_router.include_router(listings.router)
 api_router.include_router(auth.router)
 api_router.include_router(users.router)
+api_router.include_router(metrics.router)
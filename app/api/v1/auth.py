@@ -1,10 +1,16 @@
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.responses import ModelResponse
 from app.db.session import get_session
-from app.models.user import User, UserRole
-from app.schemas.user import Token, UserCreate, UserLogin, UserRead
-from app.services.auth_service import AuthService, get_auth_service, require_roles
+from app.models.user import UserRole
+from app.schemas.user import RefreshTokenRequest, Token, UserCreate, UserLogin, UserRead
+from app.services.auth_service import (
+    AuthService,
+    UserPrincipal,
+    get_auth_service,
+    require_roles,
+)
 from app.services.user_service import UserService
 
 router = APIRouter(prefix="/auth", tags=["auth"])
@@ -14,7 +20,7 @@ def get_user_service() -> UserService:
     return UserService()
 
 
-authenticated_roles = (UserRole.USER, UserRole.MODERATOR, UserRole.ADMIN)
+authenticated_roles = (UserRole.USER, UserRole.MODERATOR, UserRole.ADMIN, UserRole.PARTNER)
 
 
 @router.post("/register", response_model=UserRead, status_code=status.HTTP_201_CREATED)
@@ -22,8 +28,9 @@ async def register_user(
     payload: UserCreate,
     session: AsyncSession = Depends(get_session),
     service: UserService = Depends(get_user_service),
-) -> UserRead:
-    return await service.create_user(session, payload)
+) -> Response:
+    user = await service.create_user(session, payload)
+    return ModelResponse(user, status_code=status.HTTP_201_CREATED)
 
 
 @router.post("/login", response_model=Token)
@@ -31,10 +38,34 @@ async def login(
     payload: UserLogin,
     session: AsyncSession = Depends(get_session),
     auth_service: AuthService = Depends(get_auth_service),
-) -> Token:
-    return await auth_service.login(session, payload)
+) -> Response:
+    return ModelResponse(await auth_service.login(session, payload))
+
+
+@router.post("/refresh", response_model=Token)
+async def refresh_token(
+    payload: RefreshTokenRequest,
+    session: AsyncSession = Depends(get_session),
+    auth_service: AuthService = Depends(get_auth_service),
+) -> Response:
+    return ModelResponse(await auth_service.refresh(session, payload))
+
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(
+    payload: RefreshTokenRequest,
+    session: AsyncSession = Depends(get_session),
+    auth_service: AuthService = Depends(get_auth_service),
+) -> None:
+    await auth_service.logout(session, payload)
+    return None
 
 
 @router.get("/me", response_model=UserRead)
-async def read_current_user(current_user: User = Depends(require_roles(authenticated_roles))) -> UserRead:
-    return UserRead.model_validate(current_user)
+async def read_current_user(
+    current_user: UserPrincipal = Depends(require_roles(authenticated_roles)),
+    session: AsyncSession = Depends(get_session),
+    service: UserService = Depends(get_user_service),
+) -> Response:
+    # The cached principal only carries what authorization needs; the profile is read.
+    return ModelResponse(await service.get_user(session, current_user.id))
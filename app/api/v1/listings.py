@@ -1,64 +1,87 @@
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, File, Query, UploadFile, status
+from fastapi import APIRouter, Body, Depends, File, Query, Request, Response, UploadFile, status
+from fastapi.responses import StreamingResponse
+from pydantic import SkipValidation
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.conditional import is_conditional, is_not_modified, validator_headers
+from app.core.config import settings
+from app.core.responses import ModelResponse
 from app.db.session import get_session
-from app.models.user import User, UserRole
+from app.models.user import UserRole
 from app.schemas.listing import (
+    CitySuggestion,
+    CountStrategy,
+    ExportFormat,
+    ListingBulkResult,
+    ListingBulkUpdate,
     ListingCreate,
+    ListingFacetsRead,
+    ListingFilters,
     ListingImageRead,
     ListingListRead,
+    ListingMapRead,
+    ListingProjection,
     ListingRead,
     ListingSortField,
     ListingUpdate,
-    ListingType,
-    PropertyType,
     SortOrder,
 )
-from app.services.auth_service import require_roles
-from app.services.listing_service import ListingService
+from app.services.auth_service import UserPrincipal, require_roles
+from app.services.listing_service import (
+    ListingService,
+    get_listing_attribute_filters,
+    get_listing_filters,
+    get_listing_projection,
+)
 
 router = APIRouter(prefix="/listings", tags=["listings"])
 
+NOT_MODIFIED_RESPONSE = {304: {"description": "Not modified"}}
+
+EXPORT_MEDIA_TYPES = {ExportFormat.NDJSON: "application/x-ndjson", ExportFormat.CSV: "text/csv"}
+
 
 def get_listing_service() -> ListingService:
     return ListingService()
 
 
-@router.get("", response_model=ListingListRead)
+@router.get("", response_model=ListingListRead, responses=NOT_MODIFIED_RESPONSE)
 async def list_listings(
+    request: Request,
     page: int = Query(1, ge=1),
     page_size: int = Query(10, ge=1, le=100),
     sort_by: ListingSortField = Query(ListingSortField.CREATED_AT),
     sort_order: SortOrder = Query(SortOrder.DESC),
-    property_type: PropertyType | None = Query(None),
-    listing_type: ListingType | None = Query(None),
-    city: str | None = Query(None, max_length=100),
-    min_price: float | None = Query(None, ge=0),
-    max_price: float | None = Query(None, ge=0),
-    min_area: int | None = Query(None, ge=1),
-    max_area: int | None = Query(None, ge=1),
-    min_rooms: int | None = Query(None, ge=0),
-    max_rooms: int | None = Query(None, ge=0),
+    cursor: str | None = Query(None, max_length=512),
+    count: CountStrategy = Query(CountStrategy.EXACT),
+    filters: ListingFilters = Depends(get_listing_filters),
+    projection: ListingProjection = Depends(get_listing_projection),
     session: AsyncSession = Depends(get_session),
     service: ListingService = Depends(get_listing_service),
-) -> ListingListRead:
-    return await service.list_listings(
+) -> Response:
+    response = await service.list_listings_response(
         session,
+        filters,
         page=page,
         page_size=page_size,
         sort_by=sort_by,
         sort_order=sort_order,
-        property_type=property_type,
-        listing_type=listing_type,
-        city=city,
-        min_price=min_price,
-        max_price=max_price,
-        min_area=min_area,
-        max_area=max_area,
-        min_rooms=min_rooms,
-        max_rooms=max_rooms,
+        cursor=cursor,
+        count_strategy=count,
+        projection=projection,
+    )
+    # Pages are revalidated against the cached or just-built response, so a mismatch
+    # costs no more than an unconditional request and a match on a warm cache nothing.
+    if is_not_modified(request, response.etag):
+        return Response(
+            status_code=status.HTTP_304_NOT_MODIFIED, headers=validator_headers(response.etag)
+        )
+    return Response(
+        content=response.body,
+        media_type="application/json",
+        headers=validator_headers(response.etag, response.last_modified),
     )
 
 
@@ -68,37 +91,92 @@ async def list_my_listings(
     page_size: int = Query(10, ge=1, le=100),
     sort_by: ListingSortField = Query(ListingSortField.CREATED_AT),
     sort_order: SortOrder = Query(SortOrder.DESC),
-    property_type: PropertyType | None = Query(None),
-    listing_type: ListingType | None = Query(None),
-    city: str | None = Query(None, max_length=100),
-    min_price: float | None = Query(None, ge=0),
-    max_price: float | None = Query(None, ge=0),
-    min_area: int | None = Query(None, ge=1),
-    max_area: int | None = Query(None, ge=1),
-    min_rooms: int | None = Query(None, ge=0),
-    max_rooms: int | None = Query(None, ge=0),
+    cursor: str | None = Query(None, max_length=512),
+    count: CountStrategy = Query(CountStrategy.EXACT),
+    filters: ListingFilters = Depends(get_listing_filters),
+    projection: ListingProjection = Depends(get_listing_projection),
     session: AsyncSession = Depends(get_session),
     service: ListingService = Depends(get_listing_service),
-    current_user: User = Depends(
+    current_user: UserPrincipal = Depends(
         require_roles((UserRole.USER, UserRole.MODERATOR, UserRole.ADMIN))
     ),
-) -> ListingListRead:
-    return await service.list_user_listings(
+) -> Response:
+    listings = await service.list_user_listings(
         session,
+        filters,
         user=current_user,
         page=page,
         page_size=page_size,
         sort_by=sort_by,
         sort_order=sort_order,
-        property_type=property_type,
-        listing_type=listing_type,
-        city=city,
-        min_price=min_price,
-        max_price=max_price,
-        min_area=min_area,
-        max_area=max_area,
-        min_rooms=min_rooms,
-        max_rooms=max_rooms,
+        cursor=cursor,
+        count_strategy=count,
+        projection=projection,
+    )
+    return ModelResponse(listings, include=projection.list_include())
+
+
+@router.get("/cities", response_model=list[CitySuggestion])
+async def list_cities(
+    prefix: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(10, ge=1, le=50),
+    session: AsyncSession = Depends(get_session),
+    service: ListingService = Depends(get_listing_service),
+) -> Response:
+    return ModelResponse(await service.list_cities(session, prefix=prefix, limit=limit))
+
+
+@router.get("/facets", response_model=ListingFacetsRead)
+async def get_listing_facets(
+    filters: ListingFilters = Depends(get_listing_filters),
+    session: AsyncSession = Depends(get_session),
+    service: ListingService = Depends(get_listing_service),
+) -> Response:
+    return ModelResponse(await service.get_facets(session, filters))
+
+
+@router.get("/map", response_model=ListingMapRead)
+async def get_listing_map(
+    zoom: int = Query(..., ge=0, le=22),
+    min_lat: float = Query(..., ge=-90, le=90),
+    max_lat: float = Query(..., ge=-90, le=90),
+    min_lng: float = Query(..., ge=-180, le=180),
+    max_lng: float = Query(..., ge=-180, le=180),
+    filters: ListingFilters = Depends(get_listing_attribute_filters),
+    session: AsyncSession = Depends(get_session),
+    service: ListingService = Depends(get_listing_service),
+) -> Response:
+    bbox = dict(min_lat=min_lat, max_lat=max_lat, min_lng=min_lng, max_lng=max_lng)
+    clusters = await service.get_map_clusters(
+        session, filters.model_copy(update=bbox), zoom=zoom
+    )
+    return ModelResponse(clusters)
+
+
+@router.get(
+    "/export",
+    response_class=StreamingResponse,
+    responses={
+        200: {
+            "description": "Matching listings in id order, one per line",
+            "content": {media_type: {} for media_type in EXPORT_MEDIA_TYPES.values()},
+        }
+    },
+)
+async def export_listings(
+    export_format: ExportFormat = Query(ExportFormat.NDJSON, alias="format"),
+    after_id: UUID | None = Query(None),
+    filters: ListingFilters = Depends(get_listing_filters),
+    service: ListingService = Depends(get_listing_service),
+    _: UserPrincipal = Depends(require_roles((UserRole.ADMIN, UserRole.PARTNER))),
+) -> StreamingResponse:
+    chunks = service.export_listings(filters, export_format=export_format, after_id=after_id)
+    return StreamingResponse(
+        chunks,
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={
+            "Content-Disposition": f'attachment; filename="listings.{export_format.value}"'
+        },
     )
 
 
@@ -107,20 +185,86 @@ async def create_listing(
     payload: ListingCreate,
     session: AsyncSession = Depends(get_session),
     service: ListingService = Depends(get_listing_service),
-    current_user: User = Depends(
+    current_user: UserPrincipal = Depends(
+        require_roles((UserRole.USER, UserRole.MODERATOR, UserRole.ADMIN))
+    ),
+) -> Response:
+    listing = await service.create_listing(session, payload, current_user)
+    return ModelResponse(listing, status_code=status.HTTP_201_CREATED)
+
+
+@router.post("/bulk", response_model=ListingBulkResult)
+async def bulk_create_listings(
+    items: list[SkipValidation[ListingCreate]] = Body(
+        ...,
+        min_length=1,
+        max_length=settings.listing_bulk_max_items,
+        description="ListingCreate objects, validated one by one",
+    ),
+    session: AsyncSession = Depends(get_session),
+    service: ListingService = Depends(get_listing_service),
+    current_user: UserPrincipal = Depends(
         require_roles((UserRole.USER, UserRole.MODERATOR, UserRole.ADMIN))
     ),
-) -> ListingRead:
-    return await service.create_listing(session, payload, current_user)
+) -> Response:
+    return ModelResponse(await service.bulk_create_listings(session, items, current_user))
 
 
-@router.get("/{listing_id}", response_model=ListingRead)
+@router.patch("/bulk", response_model=ListingBulkResult)
+async def bulk_update_listings(
+    items: list[SkipValidation[ListingBulkUpdate]] = Body(
+        ...,
+        min_length=1,
+        max_length=settings.listing_bulk_max_items,
+        description="ListingUpdate objects with the listing's id, validated one by one",
+    ),
+    session: AsyncSession = Depends(get_session),
+    service: ListingService = Depends(get_listing_service),
+    current_user: UserPrincipal = Depends(
+        require_roles((UserRole.USER, UserRole.MODERATOR, UserRole.ADMIN))
+    ),
+) -> Response:
+    return ModelResponse(await service.bulk_update_listings(session, items, current_user))
+
+
+@router.post("/bulk/delete", response_model=ListingBulkResult)
+async def bulk_delete_listings(
+    ids: list[UUID] = Body(
+        ..., embed=True, min_length=1, max_length=settings.listing_bulk_max_items
+    ),
+    session: AsyncSession = Depends(get_session),
+    service: ListingService = Depends(get_listing_service),
+    current_user: UserPrincipal = Depends(
+        require_roles((UserRole.USER, UserRole.MODERATOR, UserRole.ADMIN))
+    ),
+) -> Response:
+    return ModelResponse(await service.bulk_delete_listings(session, ids, current_user))
+
+
+@router.get("/{listing_id}", response_model=ListingRead, responses=NOT_MODIFIED_RESPONSE)
 async def get_listing(
+    request: Request,
     listing_id: UUID,
+    projection: ListingProjection = Depends(get_listing_projection),
     session: AsyncSession = Depends(get_session),
     service: ListingService = Depends(get_listing_service),
-) -> ListingRead:
-    return await service.get_listing(session, listing_id)
+) -> Response:
+    if is_conditional(request):
+        etag, last_modified = await service.get_listing_validators(
+            session, listing_id, projection
+        )
+        if is_not_modified(request, etag, last_modified):
+            return Response(
+                status_code=status.HTTP_304_NOT_MODIFIED,
+                headers=validator_headers(etag, last_modified),
+            )
+
+    response = await service.get_listing_response(session, listing_id, projection)
+    return Response(
+        content=response.body,
+        media_type="application/json",
+        headers=validator_headers(response.etag, response.last_modified),
+    )
 
 
 @router.post(
@@ -133,11 +277,12 @@ async def upload_listing_image(
     file: UploadFile = File(...),
     session: AsyncSession = Depends(get_session),
     service: ListingService = Depends(get_listing_service),
-    current_user: User = Depends(
+    current_user: UserPrincipal = Depends(
         require_roles((UserRole.USER, UserRole.MODERATOR, UserRole.ADMIN))
     ),
-) -> ListingImageRead:
-    return await service.upload_listing_image(session, listing_id, file, current_user)
+) -> Response:
+    image = await service.upload_listing_image(session, listing_id, file, current_user)
+    return ModelResponse(image, status_code=status.HTTP_201_CREATED)
 
 
 @router.patch("/{listing_id}", response_model=ListingRead)
@@ -146,11 +291,13 @@ async def update_listing(
     payload: ListingUpdate,
     session: AsyncSession = Depends(get_session),
     service: ListingService = Depends(get_listing_service),
-    current_user: User = Depends(
+    current_user: UserPrincipal = Depends(
         require_roles((UserRole.USER, UserRole.MODERATOR, UserRole.ADMIN))
     ),
-) -> ListingRead:
-    return await service.update_listing(session, listing_id, payload, current_user)
+) -> Response:
+    return ModelResponse(
+        await service.update_listing(session, listing_id, payload, current_user)
+    )
 
 
 @router.delete("/{listing_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -158,7 +305,7 @@ async def delete_listing(
     listing_id: UUID,
     session: AsyncSession = Depends(get_session),
     service: ListingService = Depends(get_listing_service),
-    current_user: User = Depends(
+    current_user: UserPrincipal = Depends(
         require_roles((UserRole.USER, UserRole.MODERATOR, UserRole.ADMIN))
     ),
 ) -> None:
@@ -0,0 +1,16 @@
+from typing import Any
+
+from fastapi import APIRouter, Depends
+
+from app.core.metrics import collect_stats
+from app.models.user import UserRole
+from app.services.auth_service import UserPrincipal, require_roles
+
+router = APIRouter(prefix="/metrics", tags=["metrics"])
+
+
+@router.get("", response_model=dict[str, dict[str, Any]])
+async def read_metrics(
+    _: UserPrincipal = Depends(require_roles((UserRole.ADMIN,))),
+) -> dict[str, dict[str, Any]]:
+    return collect_stats()
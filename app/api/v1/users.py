@@ -1,12 +1,13 @@
 import uuid
 
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.responses import ModelResponse
 from app.db.session import get_session
-from app.models.user import User, UserRole
+from app.models.user import UserRole
 from app.schemas.user import UserRead, UserUpdate
-from app.services.auth_service import require_roles
+from app.services.auth_service import UserPrincipal, require_roles
 from app.services.user_service import UserService
 
 router = APIRouter(prefix="/users", tags=["users"])
@@ -23,9 +24,9 @@ admin_roles = (UserRole.ADMIN,)
 async def list_users(
     session: AsyncSession = Depends(get_session),
     service: UserService = Depends(get_user_service),
-    _: User = Depends(require_roles(admin_roles)),
-) -> list[UserRead]:
-    return await service.list_users(session)
+    _: UserPrincipal = Depends(require_roles(admin_roles)),
+) -> Response:
+    return ModelResponse(await service.list_users(session))
 
 
 @router.get("/{user_id}", response_model=UserRead)
@@ -33,9 +34,9 @@ async def get_user(
     user_id: uuid.UUID,
     session: AsyncSession = Depends(get_session),
     service: UserService = Depends(get_user_service),
-    _: User = Depends(require_roles(admin_roles)),
-) -> UserRead:
-    return await service.get_user(session, user_id)
+    _: UserPrincipal = Depends(require_roles(admin_roles)),
+) -> Response:
+    return ModelResponse(await service.get_user(session, user_id))
 
 
 @router.patch("/{user_id}", response_model=UserRead)
@@ -44,9 +45,9 @@ async def update_user(
     payload: UserUpdate,
     session: AsyncSession = Depends(get_session),
     service: UserService = Depends(get_user_service),
-    _: User = Depends(require_roles(admin_roles)),
-) -> UserRead:
-    return await service.update_user(session, user_id, payload)
+    _: UserPrincipal = Depends(require_roles(admin_roles)),
+) -> Response:
+    return ModelResponse(await service.update_user(session, user_id, payload))
 
 
 @router.delete("/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -54,7 +55,7 @@ async def delete_user(
     user_id: uuid.UUID,
     session: AsyncSession = Depends(get_session),
     service: UserService = Depends(get_user_service),
-    _: User = Depends(require_roles(admin_roles)),
+    _: UserPrincipal = Depends(require_roles(admin_roles)),
 ) -> None:
     await service.delete_user(session, user_id)
     return None
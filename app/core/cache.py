@@ -0,0 +1,86 @@
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from typing import Generic, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class TTLCache(Generic[K, V]):
+    """Bounded in-process LRU cache whose entries also expire after a TTL.
+
+    The cache is not shared between worker processes; every worker keeps its own copy.
+
+    ``generation`` changes whenever entries are invalidated. A reader that loads a value
+    passes the generation it saw before loading to ``set``, which then drops the value if
+    an invalidation happened meanwhile, since it may predate the write behind it.
+    """
+
+    def __init__(self, maxsize: int, ttl_seconds: float) -> None:
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[K, tuple[float, V]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.generation = 0
+
+    def get(self, key: K) -> V | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(
+        self,
+        key: K,
+        value: V,
+        ttl_seconds: float | None = None,
+        generation: int | None = None,
+    ) -> None:
+        if self.maxsize <= 0 or (generation is not None and generation != self.generation):
+            return
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def delete(self, key: K) -> None:
+        self.generation += 1
+        self._entries.pop(key, None)
+
+    def delete_where(self, predicate: Callable[[K, V], bool]) -> int:
+        self.generation += 1
+        stale = [key for key, (_, value) in self._entries.items() if predicate(key, value)]
+        for key in stale:
+            del self._entries[key]
+        return len(stale)
+
+    def clear(self) -> None:
+        self.generation += 1
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
@@ -1,4 +1,4 @@
-from typing import Annotated
+from typing import Annotated, Literal
 
 from pydantic import Field, field_validator
 from pydantic_settings import BaseSettings, NoDecode, SettingsConfigDict
@@ -11,8 +11,43 @@ class Settings(BaseSettings):
     secret_key: str = Field(..., alias="SECRET_KEY")
     token_algorithm: str = Field("HS256", alias="TOKEN_ALGORITHM")
     access_token_expire_minutes: int = Field(30, alias="ACCESS_TOKEN_EXPIRE_MINUTES")
+    refresh_token_expire_days: int = Field(30, alias="REFRESH_TOKEN_EXPIRE_DAYS")
+    refresh_session_store: Literal["postgres", "memory"] = Field(
+        "postgres", alias="REFRESH_SESSION_STORE"
+    )
+    verified_token_cache_size: int = Field(10_000, alias="VERIFIED_TOKEN_CACHE_SIZE")
+    current_user_cache_size: int = Field(10_000, alias="CURRENT_USER_CACHE_SIZE")
+    # Cached principals are dropped once the token version map (reloaded every
+    # TOKEN_VERSION_REFRESH_SECONDS) shows their user revoked or deleted, so role changes
+    # reach every worker within that interval; email changes wait for this TTL.
+    current_user_cache_ttl_seconds: float = Field(30, alias="CURRENT_USER_CACHE_TTL_SECONDS")
+    auth_stateless_enabled: bool = Field(False, alias="AUTH_STATELESS_ENABLED")
+    token_version_refresh_seconds: float = Field(30, alias="TOKEN_VERSION_REFRESH_SECONDS")
+    password_hash_workers: int = Field(4, alias="PASSWORD_HASH_WORKERS")
+    password_hash_max_queue: int = Field(64, alias="PASSWORD_HASH_MAX_QUEUE")
     bucket_name: str = Field("", alias="BUCKET_NAME")
     sa_key_path: str | None = Field(None, alias="SA_KEY_PATH")
+    listing_count_cache_size: int = Field(1024, alias="LISTING_COUNT_CACHE_SIZE")
+    listing_count_cache_ttl_seconds: float = Field(60, alias="LISTING_COUNT_CACHE_TTL_SECONDS")
+    listing_count_exact_up_to: int = Field(10_000, alias="LISTING_COUNT_EXACT_UP_TO")
+    listing_facets_cache_size: int = Field(512, alias="LISTING_FACETS_CACHE_SIZE")
+    listing_facets_cache_ttl_seconds: float = Field(30, alias="LISTING_FACETS_CACHE_TTL_SECONDS")
+    listing_facets_top_cities: int = Field(20, alias="LISTING_FACETS_TOP_CITIES")
+    listing_response_cache_size: int = Field(2048, alias="LISTING_RESPONSE_CACHE_SIZE")
+    listing_response_cache_ttl_seconds: float = Field(
+        30, alias="LISTING_RESPONSE_CACHE_TTL_SECONDS"
+    )
+    listing_search_engine_enabled: bool = Field(False, alias="LISTING_SEARCH_ENGINE_ENABLED")
+    listing_search_engine_refresh_seconds: float = Field(
+        5, alias="LISTING_SEARCH_ENGINE_REFRESH_SECONDS"
+    )
+    listing_search_engine_full_refresh_seconds: float = Field(
+        600, alias="LISTING_SEARCH_ENGINE_FULL_REFRESH_SECONDS"
+    )
+    listing_map_cells_per_tile: int = Field(8, alias="LISTING_MAP_CELLS_PER_TILE")
+    listing_map_max_clusters: int = Field(1000, alias="LISTING_MAP_MAX_CLUSTERS")
+    listing_export_batch_size: int = Field(1000, alias="LISTING_EXPORT_BATCH_SIZE")
+    listing_bulk_max_items: int = Field(500, alias="LISTING_BULK_MAX_ITEMS")
     cors_origins: Annotated[list[str], NoDecode] = Field(
         default_factory=lambda: [
             "https://property-systems.memcommerce.shop",
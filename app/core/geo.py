@@ -0,0 +1,36 @@
+import math
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE_LATITUDE = math.pi * EARTH_RADIUS_KM / 180
+
+
+def haversine_km(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lng2 - lng1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def radius_bounds(lat: float, lng: float, radius_km: float) -> tuple[float, float, float, float]:
+    """Return ``(min_lat, max_lat, min_lng, max_lng)`` of a box enclosing the circle.
+
+    ``min_lng > max_lng`` means the box crosses the antimeridian.
+    """
+
+    lat_delta = radius_km / KM_PER_DEGREE_LATITUDE
+    min_lat, max_lat = lat - lat_delta, lat + lat_delta
+    if min_lat <= -90 or max_lat >= 90:
+        # The circle covers a pole, so it spans every longitude.
+        return max(min_lat, -90.0), min(max_lat, 90.0), -180.0, 180.0
+
+    ratio = math.sin(math.radians(lat_delta)) / math.cos(math.radians(lat))
+    if ratio >= 1:
+        return min_lat, max_lat, -180.0, 180.0
+    lng_delta = math.degrees(math.asin(ratio))
+    min_lng, max_lng = lng - lng_delta, lng + lng_delta
+    if min_lng < -180:
+        min_lng += 360
+    if max_lng > 180:
+        max_lng -= 360
+    return min_lat, max_lat, min_lng, max_lng
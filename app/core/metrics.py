@@ -0,0 +1,14 @@
+from collections.abc import Callable
+from typing import Any
+
+_providers: dict[str, Callable[[], dict[str, Any]]] = {}
+
+
+def register_stats(name: str, provider: Callable[[], dict[str, Any]]) -> None:
+    """Expose ``provider()`` under ``name`` in the metrics endpoint."""
+
+    _providers[name] = provider
+
+
+def collect_stats() -> dict[str, dict[str, Any]]:
+    return {name: provider() for name, provider in sorted(_providers.items())}
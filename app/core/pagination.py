@@ -0,0 +1,120 @@
+import base64
+import binascii
+import json
+import math
+from collections.abc import Mapping
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from decimal import Decimal, InvalidOperation
+from typing import Any
+from uuid import UUID
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor cannot be decoded."""
+
+
+@dataclass(frozen=True)
+class Cursor:
+    """Keyset position: the sort key and id of the row a page starts after."""
+
+    sort_field: str
+    descending: bool
+    value: Any
+    id: UUID
+    backwards: bool = False
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    if isinstance(value, Decimal):
+        return {"dec": str(value)}
+    return value
+
+
+# Bounds of PostgreSQL ``integer``: values outside them cannot be bound to such a column.
+INT4_MIN, INT4_MAX = -(2**31), 2**31 - 1
+# Digits PostgreSQL ``numeric`` allows before and after the decimal point.
+NUMERIC_MAX_WEIGHT, NUMERIC_MAX_SCALE = 131072, 16383
+
+
+def _decode_value(value: Any, value_type: type) -> Any:
+    """Decode ``value`` as the type of the column the cursor sorts by.
+
+    Cursors come back from clients, so anything that could not have been produced for
+    that column is rejected here rather than failing inside the query.
+    """
+
+    if value_type is datetime:
+        if not isinstance(value, dict) or not isinstance(value.get("dt"), str):
+            raise InvalidCursorError("Expected a timestamp cursor value")
+        decoded = datetime.fromisoformat(value["dt"])
+        if decoded.tzinfo is None:
+            raise InvalidCursorError("Cursor timestamps must carry a time zone")
+        try:
+            return decoded.astimezone(timezone.utc)
+        except OverflowError as exc:
+            raise InvalidCursorError("Cursor timestamp out of range") from exc
+    if value_type is Decimal:
+        if not isinstance(value, dict) or not isinstance(value.get("dec"), str):
+            raise InvalidCursorError("Expected a decimal cursor value")
+        try:
+            decoded = Decimal(value["dec"])
+        except InvalidOperation as exc:
+            raise InvalidCursorError("Expected a decimal cursor value") from exc
+        if not decoded.is_finite():
+            raise InvalidCursorError("Cursor decimals must be finite")
+        exponent = decoded.as_tuple().exponent
+        if decoded and (decoded.adjusted() >= NUMERIC_MAX_WEIGHT or exponent < -NUMERIC_MAX_SCALE):
+            raise InvalidCursorError("Cursor decimal out of range")
+        return decoded
+    if value_type is int:
+        if not isinstance(value, int) or isinstance(value, bool):
+            raise InvalidCursorError("Expected an integer cursor value")
+        if not INT4_MIN <= value <= INT4_MAX:
+            raise InvalidCursorError("Cursor integer out of range")
+        return value
+    if value_type is float:
+        if not isinstance(value, (int, float)) or isinstance(value, bool):
+            raise InvalidCursorError("Expected a numeric cursor value")
+        try:
+            decoded = float(value)
+        except OverflowError as exc:
+            raise InvalidCursorError("Cursor number out of range") from exc
+        if not math.isfinite(decoded):
+            raise InvalidCursorError("Cursor numbers must be finite")
+        return decoded
+    raise InvalidCursorError("Unsupported cursor value")
+
+
+def encode_cursor(cursor: Cursor) -> str:
+    payload = {
+        "f": cursor.sort_field,
+        "d": cursor.descending,
+        "v": _encode_value(cursor.value),
+        "id": str(cursor.id),
+        "b": cursor.backwards,
+    }
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(token: str, value_types: Mapping[str, type]) -> Cursor:
+    """Decode ``token``; ``value_types`` maps every sortable field to its value type."""
+
+    padded = token + "=" * (-len(token) % 4)
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        sort_field = str(payload["f"])
+        if sort_field not in value_types:
+            raise InvalidCursorError("Unknown cursor sort field")
+        return Cursor(
+            sort_field=sort_field,
+            descending=bool(payload["d"]),
+            value=_decode_value(payload["v"], value_types[sort_field]),
+            id=UUID(payload["id"]),
+            backwards=bool(payload.get("b", False)),
+        )
+    except (binascii.Error, ValueError, TypeError, KeyError) as exc:
+        raise InvalidCursorError("Invalid pagination cursor") from exc
@@ -0,0 +1,26 @@
+from typing import Any
+
+import pydantic_core
+from fastapi import Response
+
+
+class ModelResponse(Response):
+    """JSON response serialized straight to bytes by pydantic-core.
+
+    Endpoints return it with models that are already validated (or built with
+    ``model_construct`` from trusted rows). Because it is a ``Response``, FastAPI
+    skips re-validating the content against ``response_model`` and its
+    ``jsonable_encoder`` pass, while ``response_model`` still documents the schema.
+    ``include`` narrows the output like ``BaseModel.model_dump``'s argument.
+    """
+
+    media_type = "application/json"
+
+    def __init__(self, content: Any, *, include: Any = None, **kwargs: Any) -> None:
+        self.include = include
+        super().__init__(content, **kwargs)
+
+    def render(self, content: Any) -> bytes:
+        # Models, lists of models and plain containers all go through the models'
+        # own compiled serializers.
+        return pydantic_core.to_json(content, include=self.include)
@@ -1,13 +1,23 @@
+import asyncio
+import hashlib
+import secrets
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
+from typing import Any, TypeVar
 
 from fastapi import HTTPException, status
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from pydantic import BaseModel
 
+from app.core.cache import TTLCache
 from app.core.config import settings
+from app.core.metrics import register_stats
 from app.models.user import UserRole
 
+T = TypeVar("T")
+
 # bcrypt_sha256 avoids bcrypt's 72-byte input limit while remaining compatible with bcrypt hashes.
 pwd_context = CryptContext(schemes=["bcrypt_sha256"], deprecated="auto")
 
@@ -20,21 +30,129 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+class PasswordHasher:
+    """Hash and verify passwords on a dedicated thread pool instead of the event loop.
+
+    A bcrypt round takes a few hundred milliseconds of CPU; the bcrypt backend releases
+    the GIL while it runs, so threads keep the event loop serving other requests.
+    ``max_workers`` caps how many run at once and at most ``max_queue`` more may wait;
+    beyond that requests are rejected with a 503 instead of queueing without bound.
+    """
+
+    def __init__(self, max_workers: int, max_queue: int) -> None:
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="password-hasher"
+        )
+        self._pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.peak_pending = 0
+
+    async def hash(self, password: str) -> str:
+        return await self._run(get_password_hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(verify_password, plain_password, hashed_password)
+
+    async def _run(self, function: Callable[..., T], *args: Any) -> T:
+        if self._pending >= self.max_workers + self.max_queue:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many password checks in progress, please retry shortly.",
+                headers={"Retry-After": "1"},
+            )
+
+        loop = asyncio.get_running_loop()
+        future = self._executor.submit(function, *args)
+        self._pending += 1
+        self.peak_pending = max(self.peak_pending, self._pending)
+        # The slot is released when the thread is done rather than when this request
+        # stops waiting: a cancelled request leaves its bcrypt round running.
+        future.add_done_callback(lambda _: loop.call_soon_threadsafe(self._release))
+        result = await asyncio.wrap_future(future)
+        self.completed += 1
+        return result
+
+    def _release(self) -> None:
+        self._pending -= 1
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "pending": self._pending,
+            "peak_pending": self.peak_pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
+
+
+password_hasher = PasswordHasher(
+    max_workers=settings.password_hash_workers, max_queue=settings.password_hash_max_queue
+)
+register_stats("password_hasher", password_hasher.stats)
+
+
 class TokenPayload(BaseModel):
     sub: str
     role: UserRole
     exp: datetime
+    # Tokens issued before token versioning carry no claim and count as version 0.
+    ver: int = 0
 
 
-def create_access_token(subject: str, role: UserRole, expires_delta: timedelta | None = None) -> str:
+def create_access_token(
+    subject: str,
+    role: UserRole,
+    expires_delta: timedelta | None = None,
+    token_version: int = 0,
+) -> str:
     expire = datetime.now(timezone.utc) + (
         expires_delta or timedelta(minutes=settings.access_token_expire_minutes)
     )
-    to_encode = {"sub": subject, "role": role.value, "exp": expire}
+    to_encode = {"sub": subject, "role": role.value, "exp": expire, "ver": token_version}
     return jwt.encode(to_encode, settings.secret_key, algorithm=settings.token_algorithm)
 
 
+def create_refresh_token() -> str:
+    """Return a new opaque refresh token; only its digest is ever stored."""
+
+    return secrets.token_urlsafe(32)
+
+
+def hash_refresh_token(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+# Validated payloads keyed by the SHA-256 digest of the token, so a client reusing its
+# token skips signature verification and claim parsing. Entries expire with the token.
+verified_token_cache: TTLCache[bytes, TokenPayload] = TTLCache(
+    maxsize=settings.verified_token_cache_size,
+    ttl_seconds=settings.access_token_expire_minutes * 60,
+)
+
+register_stats("verified_token_cache", verified_token_cache.stats)
+
+
 def decode_access_token(token: str) -> TokenPayload:
+    digest = hashlib.sha256(token.encode()).digest()
+    cached = verified_token_cache.get(digest)
+    if cached is not None:
+        return cached
+
+    token_data = _verify_access_token(token)
+    verified_token_cache.set(
+        digest,
+        token_data,
+        ttl_seconds=(token_data.exp - datetime.now(timezone.utc)).total_seconds(),
+    )
+    return token_data
+
+
+def _verify_access_token(token: str) -> TokenPayload:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
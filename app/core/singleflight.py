@@ -0,0 +1,66 @@
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Generic, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class SingleFlight(Generic[K, V]):
+    """Collapse concurrent calls with the same key into one execution.
+
+    The first caller for a key (the leader) runs the call; callers arriving while it
+    is in flight wait for its result, or its exception, instead of running their own.
+    Like ``TTLCache`` it is per process and per event loop.
+    """
+
+    def __init__(self) -> None:
+        self._calls: dict[K, asyncio.Future[V]] = {}
+        self.leaders = 0
+        self.collapsed = 0
+
+    async def do(self, key: K, call: Callable[[], Awaitable[V]]) -> V:
+        while (shared := self._calls.get(key)) is not None:
+            self.collapsed += 1
+            try:
+                return await asyncio.shield(shared)
+            except asyncio.CancelledError:
+                if not shared.cancelled():
+                    raise
+                # The leader was cancelled (its client went away); retry, possibly
+                # as the new leader.
+
+        future: asyncio.Future[V] = asyncio.get_running_loop().create_future()
+        self._calls[key] = future
+        self.leaders += 1
+        try:
+            result = await call()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as exc:
+            future.set_exception(exc)
+            # Marks the exception as retrieved when nobody was waiting for it.
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            if self._calls.get(key) is future:
+                del self._calls[key]
+
+    def forget(self) -> None:
+        """Make later callers start new executions instead of joining running ones.
+
+        Callers already waiting still get the results of the executions they joined.
+        """
+
+        self._calls.clear()
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "in_flight": len(self._calls),
+            "leaders": self.leaders,
+            "collapsed": self.collapsed,
+        }
@@ -1,6 +1,8 @@
-from collections.abc import AsyncGenerator
+from collections.abc import AsyncGenerator, Callable
 
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
 
 from app.core.config import settings
 
@@ -15,6 +17,29 @@ engine = create_async_engine(
 )
 SessionLocal = async_sessionmaker(bind=engine, expire_on_commit=False, class_=AsyncSession)
 
+AFTER_COMMIT_CALLBACKS = "after_commit_callbacks"
+
+
+def run_after_commit(session: AsyncSession, callback: Callable[[], None]) -> None:
+    """Run ``callback`` once the session's transaction commits; a rollback drops it.
+
+    Used for in-process side effects of writes, such as cache eviction, that must not be
+    observable before the write is.
+    """
+
+    session.info.setdefault(AFTER_COMMIT_CALLBACKS, []).append(callback)
+
+
+@event.listens_for(Session, "after_commit")
+def _run_after_commit_callbacks(session: Session) -> None:
+    for callback in session.info.pop(AFTER_COMMIT_CALLBACKS, []):
+        callback()
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_after_commit_callbacks(session: Session) -> None:
+    session.info.pop(AFTER_COMMIT_CALLBACKS, None)
+
 
 async def get_session() -> AsyncGenerator[AsyncSession, None]:
     async with SessionLocal() as session:
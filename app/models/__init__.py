@@ -1,12 +1,15 @@
 from app.models.listing import Listing, ListingType, PropertyType
 from app.models.listing_image import ListingImage
-from app.models.user import User, UserRole
+from app.models.refresh_session import RefreshSession
+from app.models.user import DeletedUser, User, UserRole
 
 __all__ = [
     "Listing",
     "ListingType",
     "PropertyType",
     "ListingImage",
+    "RefreshSession",
+    "DeletedUser",
     "User",
     "UserRole",
 ]
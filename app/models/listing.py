@@ -4,17 +4,22 @@ import uuid
 from sqlalchemy import (
     CheckConstraint,
     Column,
+    Computed,
     DateTime,
     Enum,
+    Float,
     ForeignKey,
+    Index,
     Integer,
     Numeric,
     String,
     Text,
+    text,
 )
-from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import relationship
+from sqlalchemy.dialects.postgresql import TSVECTOR, UUID
+from sqlalchemy.orm import deferred, query_expression, relationship
 from sqlalchemy.sql import func
+from sqlalchemy.types import UserDefinedType
 
 from app.db.base import Base
 
@@ -31,6 +36,20 @@ class ListingType(str, enum.Enum):
     RENT = "rent"
 
 
+class XID8(UserDefinedType):
+    """PostgreSQL's 64-bit transaction id; asyncpg reads and writes it as ``int``."""
+
+    cache_ok = True
+
+    def get_col_spec(self, **kw: object) -> str:
+        return "xid8"
+
+
+# Text search configuration for listing full-text search. "simple" only lowercases, so
+# titles in any of our markets' languages match without language-specific stemming.
+LISTING_SEARCH_CONFIG = "simple"
+
+
 class Listing(Base):
     __tablename__ = "listings"
 
@@ -59,12 +78,77 @@ class Listing(Base):
     city = Column(String(100), nullable=False)
     area_sqm = Column(Integer, nullable=False)
     rooms = Column(Integer, nullable=False)
+    latitude = Column(Float)
+    longitude = Column(Float)
     created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    updated_at = Column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+        onupdate=func.now(),
+    )
+    # Id of the transaction that last wrote the row, set by a trigger. Unlike updated_at
+    # (the transaction's start time) it orders rows by the snapshots that can see them.
+    change_xid = Column(XID8(), nullable=False, server_default="0")
+    # Maintained by PostgreSQL on every insert/update; titles rank above descriptions.
+    search_vector = deferred(
+        Column(
+            TSVECTOR,
+            Computed(
+                f"setweight(to_tsvector('{LISTING_SEARCH_CONFIG}', title), 'A') || "
+                f"setweight(to_tsvector('{LISTING_SEARCH_CONFIG}', "
+                "coalesce(description, '')), 'B')",
+                persisted=True,
+            ),
+            nullable=False,
+        )
+    )
+    # Full-text rank, populated only by searches sorted by relevance.
+    relevance = query_expression()
 
     __table_args__ = (
         CheckConstraint("price >= 0", name="ck_listings_price_non_negative"),
         CheckConstraint("area_sqm > 0", name="ck_listings_area_positive"),
         CheckConstraint("rooms >= 0", name="ck_listings_rooms_non_negative"),
+        CheckConstraint("latitude BETWEEN -90 AND 90", name="ck_listings_latitude_range"),
+        CheckConstraint("longitude BETWEEN -180 AND 180", name="ck_listings_longitude_range"),
+        CheckConstraint(
+            "(latitude IS NULL) = (longitude IS NULL)", name="ck_listings_location_complete"
+        ),
+        Index(
+            "ix_listings_city_trgm",
+            "city",
+            postgresql_using="gin",
+            postgresql_ops={"city": "gin_trgm_ops"},
+        ),
+        Index("ix_listings_city_lower", text("lower(city) text_pattern_ops")),
+        Index("ix_listings_created_at_id", created_at.desc(), id.desc()),
+        Index("ix_listings_price_id", price, id),
+        Index("ix_listings_area_sqm_id", area_sqm, id),
+        Index("ix_listings_rooms_id", rooms, id),
+        Index(
+            "ix_listings_types_created_at_id",
+            listing_type,
+            property_type,
+            created_at.desc(),
+            id.desc(),
+        ),
+        Index("ix_listings_change_xid", change_xid),
+        Index("ix_listings_user_id_created_at_id", user_id, created_at.desc(), id.desc()),
+        Index(
+            "ix_listings_rent_price_id",
+            price,
+            id,
+            postgresql_where=text("listing_type = 'rent'"),
+        ),
+        Index(
+            "ix_listings_sale_price_id",
+            price,
+            id,
+            postgresql_where=text("listing_type = 'sale'"),
+        ),
+        Index("ix_listings_location", text("point(longitude, latitude)"), postgresql_using="gist"),
+        Index("ix_listings_search_vector", search_vector, postgresql_using="gin"),
     )
 
     user = relationship("User", back_populates="listings")
@@ -1,7 +1,7 @@
 import enum
 import uuid
 
-from sqlalchemy import Column, DateTime, Enum, String
+from sqlalchemy import Column, DateTime, Enum, Integer, String
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -13,6 +13,8 @@ class UserRole(str, enum.Enum):
     USER = "user"
     MODERATOR = "moderator"
     ADMIN = "admin"
+    # Read-only catalogue access for integrations, e.g. the bulk listing export.
+    PARTNER = "partner"
 
 
 class User(Base):
@@ -32,5 +34,18 @@ class User(Base):
         server_default=UserRole.USER.value,
     )
     created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    # Embedded in access tokens as ``ver``; bumping it revokes every token issued before.
+    token_version = Column(Integer, nullable=False, server_default="0")
 
     listings = relationship("Listing", back_populates="user", cascade="all, delete-orphan")
+
+
+class DeletedUser(Base):
+    """Tombstone of a deleted user, kept while access tokens issued to them may be valid."""
+
+    __tablename__ = "deleted_users"
+
+    user_id = Column(UUID(as_uuid=True), primary_key=True)
+    deleted_at = Column(
+        DateTime(timezone=True), nullable=False, server_default=func.now(), index=True
+    )
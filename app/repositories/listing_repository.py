@@ -1,121 +1,782 @@
-from uuid import UUID
+import json
+from collections.abc import AsyncIterator, Collection, Sequence
+from dataclasses import dataclass
+from datetime import datetime
+from types import SimpleNamespace
+from typing import Any
+from uuid import UUID, uuid4
 
-from sqlalchemy import func, select
+from sqlalchemy import (
+    BigInteger,
+    ColumnElement,
+    Float,
+    Numeric,
+    Row,
+    Select,
+    String,
+    bindparam,
+    cast,
+    delete,
+    func,
+    insert,
+    literal,
+    literal_column,
+    or_,
+    select,
+    tuple_,
+    update,
+)
+from sqlalchemy.dialects.postgresql import REAL
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import joinedload, selectinload, with_expression
+from sqlalchemy.sql.base import Executable
+from sqlalchemy.sql.elements import ClauseElement, Label
+from sqlalchemy.types import NullType
 
-from app.models.listing import Listing
+from app.core.geo import EARTH_RADIUS_KM, radius_bounds
+from app.core.pagination import Cursor
+from app.models.listing import LISTING_SEARCH_CONFIG, XID8, Listing
 from app.models.listing_image import ListingImage
-from app.schemas.listing import ListingCreate, ListingUpdate
+from app.schemas.listing import (
+    FULL_PROJECTION,
+    CityMatch,
+    ListingCreate,
+    ListingFilters,
+    ListingInclude,
+    ListingProjection,
+    ListingUpdate,
+)
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+class _ExplainRows(Executable, ClauseElement):
+    """``EXPLAIN`` of a statement, compiled with its parameters still bound."""
+
+    inherit_cache = False
+
+    def __init__(self, statement: Select) -> None:
+        self.statement = statement
+
+
+@compiles(_ExplainRows, "postgresql")
+def _compile_explain_rows(element: _ExplainRows, compiler: Any, **kw: Any) -> str:
+    return f"EXPLAIN (FORMAT JSON) {compiler.process(element.statement, **kw)}"
+
+
+# Lower bucket edges of the facet histograms; the last bucket is open-ended.
+FACET_HISTOGRAM_EDGES: dict[str, tuple[int, ...]] = {
+    "price": (0, 500, 1_000, 2_000, 5_000, 100_000, 250_000, 500_000, 1_000_000),
+    "area_sqm": (0, 30, 50, 75, 100, 150, 200, 300),
+    "rooms": (0, 1, 2, 3, 4, 5, 6),
+}
+
+
+def listing_images_column(listing_id: ColumnElement, limit: int | None = None) -> Label:
+    """A listing's images, oldest first, as an array of ``(id, url, created_at)`` records.
+
+    Selected in the same statement so listings and their images arrive in one round
+    trip; asyncpg decodes the records into tuples of native values. The correlated
+    lookup walks ix_listing_images_listing_id_created_at, already in order, and stops
+    after ``limit`` images.
+    """
+
+    images = (
+        select(tuple_(ListingImage.id, ListingImage.url, ListingImage.created_at))
+        .where(ListingImage.listing_id == listing_id)
+        .order_by(ListingImage.created_at)
+    )
+    if limit is not None:
+        images = images.limit(limit)
+    # ARRAY(subquery) keeps the subquery's order. The result is passed through as decoded
+    # by asyncpg; SQLAlchemy has no row type to apply.
+    return func.array(images.scalar_subquery(), type_=NullType()).label("images")
+
+
+# Columns ListingRead is built from on the ORM-free read path. Enums are read as plain
+# strings, which is what the response models hold.
+LISTING_READ_COLUMNS = (
+    Listing.id,
+    Listing.user_id,
+    Listing.title,
+    Listing.description,
+    cast(Listing.property_type, String).label("property_type"),
+    cast(Listing.listing_type, String).label("listing_type"),
+    Listing.price,
+    Listing.currency,
+    Listing.city,
+    Listing.area_sqm,
+    Listing.rooms,
+    Listing.latitude,
+    Listing.longitude,
+    Listing.created_at,
+    Listing.updated_at,
+)
+
+# Columns every projection loads: ETags, cursors and cache invalidation rely on them.
+LISTING_KEY_COLUMNS = frozenset({"id", "updated_at"})
+
+
+# The columns ListingFilters.matches looks at; writes report their previous values so
+# cached searches the listing used to match can be evicted.
+LISTING_FILTERED_FIELDS = (
+    "user_id",
+    "property_type",
+    "listing_type",
+    "city",
+    "price",
+    "area_sqm",
+    "rooms",
+    "latitude",
+    "longitude",
+)
+
+
+def listing_read_columns(
+    projection: ListingProjection, extra_fields: Collection[str] = ()
+) -> list:
+    """Return the ``LISTING_READ_COLUMNS`` a projection needs."""
+
+    if projection.fields is None:
+        return list(LISTING_READ_COLUMNS)
+    names = LISTING_KEY_COLUMNS.union(projection.fields, extra_fields)
+    return [column for column in LISTING_READ_COLUMNS if column.key in names]
+
+
+def listing_image_columns(
+    listing_id: ColumnElement, projection: ListingProjection
+) -> list[Label]:
+    """Return the images column a projection needs, looked up for ``listing_id``."""
+
+    if projection.include == ListingInclude.IMAGES:
+        return [listing_images_column(listing_id)]
+    if projection.include == ListingInclude.FIRST_IMAGE:
+        return [listing_images_column(listing_id, limit=1)]
+    return []
+
+
+@dataclass
+class ListingPage:
+    items: list[Listing] | list[Row]
+    has_more: bool
+
+
+@dataclass
+class UpdatedListing:
+    record: Row
+    # The filterable columns before the update, as attributes.
+    previous: Any
 
 
 class ListingRepository:
     async def create(
         self, session: AsyncSession, listing_data: ListingCreate, user_id: UUID
-    ) -> Listing:
-        listing = Listing(**listing_data.model_dump(), user_id=user_id)
-        session.add(listing)
-        await session.flush()
-        await session.refresh(listing)
-        return listing
+    ) -> Row:
+        """Insert a listing and return it as a read row, in one INSERT ... RETURNING."""
+
+        result = await session.execute(
+            insert(Listing)
+            .values(**listing_data.model_dump(), user_id=user_id)
+            .returning(*LISTING_READ_COLUMNS)
+        )
+        return result.one()
 
     async def get_by_id(self, session: AsyncSession, listing_id: UUID) -> Listing | None:
+        # Joined rather than select-in loading keeps this to a single round trip.
         result = await session.execute(
             select(Listing)
-                .options(selectinload(Listing.images))
+                .options(joinedload(Listing.images))
                 .where(Listing.id == listing_id)
         )
-        return result.scalar_one_or_none()
+        return result.unique().scalar_one_or_none()
+
+    async def get_record(
+        self,
+        session: AsyncSession,
+        listing_id: UUID,
+        projection: ListingProjection = FULL_PROJECTION,
+    ) -> Row | None:
+        """Load the ``projection`` of one listing as a row without ORM instances."""
+
+        query = select(
+            *listing_read_columns(projection), *listing_image_columns(Listing.id, projection)
+        ).where(Listing.id == listing_id)
+        rows = await self._fetch_rows(session, query)
+        return rows[0] if rows else None
+
+    async def get_records_by_ids(
+        self,
+        session: AsyncSession,
+        listing_ids: Sequence[UUID],
+        projection: ListingProjection = FULL_PROJECTION,
+    ) -> list[Row]:
+        """Load listing rows by id in the order of ``listing_ids``, skipping missing ones."""
+
+        if not listing_ids:
+            return []
+        query = select(
+            *listing_read_columns(projection), *listing_image_columns(Listing.id, projection)
+        ).where(Listing.id.in_(listing_ids))
+        rows = await self._fetch_rows(session, query)
+        by_id = {row.id: row for row in rows}
+        return [by_id[listing_id] for listing_id in listing_ids if listing_id in by_id]
+
+    async def _fetch_rows(self, session: AsyncSession, query: Select) -> list[Row]:
+        # Core statements run on the session's connection skip the ORM result layer
+        # (and autoflush), which the read-only record loaders have no use for.
+        connection = await session.connection()
+        result = await connection.execute(query)
+        return list(result.all())
+
+    async def get_version(self, session: AsyncSession, listing_id: UUID) -> datetime | None:
+        return await session.scalar(
+            select(Listing.updated_at).where(Listing.id == listing_id)
+        )
+
+    async def snapshot_horizon(self, session: AsyncSession) -> int:
+        """Return the oldest transaction id still running; every older one has finished."""
+
+        return await session.scalar(
+            select(func.pg_snapshot_xmin(func.pg_current_snapshot(), type_=XID8()))
+        )
+
+    async def stream_search_rows(
+        self, session: AsyncSession, *, changed_since: int | None = None
+    ) -> AsyncIterator[Sequence[Row]]:
+        """Yield batches of the columns the in-memory search engine indexes.
+
+        ``changed_since`` limits the rows to those written by that transaction id or a
+        later one. Values are converted to plain floats, strings and epoch microseconds in
+        SQL so millions of rows load without per-row Python type processing.
+        """
+
+        query = select(
+            Listing.id,
+            cast(Listing.price, Float).label("price"),
+            Listing.area_sqm,
+            Listing.rooms,
+            cast(Listing.property_type, String).label("property_type"),
+            cast(Listing.listing_type, String).label("listing_type"),
+            func.lower(Listing.city).label("city"),
+            cast(func.extract("epoch", Listing.created_at) * 1_000_000, BigInteger).label(
+                "created_at_us"
+            ),
+        )
+        if changed_since is not None:
+            query = query.where(Listing.change_xid >= changed_since)
+
+        result = await session.stream(query.execution_options(yield_per=10_000))
+        async for partition in result.partitions():
+            yield partition
+
+    async def stream_export_rows(
+        self,
+        session: AsyncSession,
+        filters: ListingFilters,
+        *,
+        after_id: UUID | None = None,
+        batch_size: int,
+    ) -> AsyncIterator[Sequence[Row]]:
+        """Yield batches of ``ListingRead`` rows, images included, in id order.
+
+        Rows come from a server-side cursor, so memory stays bounded by ``batch_size``
+        however many listings match. ``after_id`` resumes after the last row received.
+        """
+
+        query = (
+            select(*LISTING_READ_COLUMNS, listing_images_column(Listing.id))
+            .where(*self._filter_conditions(filters))
+            .order_by(Listing.id)
+        )
+        if after_id is not None:
+            query = query.where(Listing.id > after_id)
+
+        result = await session.stream(query.execution_options(yield_per=batch_size))
+        async for partition in result.partitions():
+            yield partition
 
     async def update(
-        self, session: AsyncSession, listing: Listing, listing_data: ListingUpdate
-    ) -> Listing:
+        self,
+        session: AsyncSession,
+        listing_id: UUID,
+        listing_data: ListingUpdate,
+        *,
+        owner_id: UUID | None = None,
+    ) -> UpdatedListing | None:
+        """Apply the fields set on ``listing_data`` and return the listing before and after.
+
+        One statement does the whole write: the UPDATE joins a locked snapshot of the
+        row, so it returns the new state with the listing's images and the previous
+        values of the filterable columns. With ``owner_id`` only that user's listing is
+        updated. ``None`` means no listing matched. Nothing to change is a plain read.
+        """
+
+        conditions = self._owned_listing_conditions(listing_id, owner_id)
         data = listing_data.model_dump(exclude_unset=True)
+        if not data:
+            rows = await self._fetch_rows(
+                session,
+                select(*LISTING_READ_COLUMNS, listing_images_column(Listing.id)).where(
+                    *conditions
+                ),
+            )
+            return UpdatedListing(record=rows[0], previous=rows[0]) if rows else None
 
-        for field, value in data.items():
-            setattr(listing, field, value)
+        previous = (
+            select(Listing.id, *(Listing.__table__.c[name] for name in LISTING_FILTERED_FIELDS))
+            .where(*conditions)
+            .with_for_update()
+            .subquery("previous")
+        )
+        result = await session.execute(
+            update(Listing)
+            .where(Listing.id == previous.c.id)
+            .values(**data)
+            .returning(
+                *LISTING_READ_COLUMNS,
+                listing_images_column(Listing.id),
+                *(previous.c[name].label(f"previous_{name}") for name in LISTING_FILTERED_FIELDS),
+            )
+            .execution_options(synchronize_session=False)
+        )
+        row = result.one_or_none()
+        if row is None:
+            return None
+        values = row._asdict()
+        return UpdatedListing(
+            record=row,
+            previous=SimpleNamespace(
+                **{name: values[f"previous_{name}"] for name in LISTING_FILTERED_FIELDS}
+            ),
+        )
 
-        await session.flush()
-        await session.refresh(listing)
-        return listing
+    async def add_image(self, session: AsyncSession, listing_id: UUID, url: str) -> Row:
+        """Insert an image and bump the listing's version in a single statement."""
 
-    async def add_image(
-        self, session: AsyncSession, listing_id: UUID, url: str
-    ) -> ListingImage:
-        image = ListingImage(listing_id=listing_id, url=url)
-        session.add(image)
-        await session.flush()
-        await session.refresh(image)
-        return image
+        # Images are part of the listing representation, so they bump its version.
+        bump_version = (
+            update(Listing)
+            .where(Listing.id == listing_id)
+            .values(updated_at=func.now())
+            .cte("bump_version")
+        )
+        # The column's Python-side default is not applied to an INSERT carrying a CTE.
+        result = await session.execute(
+            insert(ListingImage)
+            .values(id=uuid4(), listing_id=listing_id, url=url)
+            .returning(ListingImage.id, ListingImage.url, ListingImage.created_at)
+            .add_cte(bump_version)
+        )
+        return result.one()
 
-    async def delete(self, session: AsyncSession, listing: Listing) -> None:
-        await session.delete(listing)
-        await session.flush()
+    async def delete(
+        self, session: AsyncSession, listing_id: UUID, *, owner_id: UUID | None = None
+    ) -> Row | None:
+        """Delete a listing in one statement and return its filterable columns.
 
-    async def list(
+        Images go with it through the ON DELETE CASCADE foreign key. With ``owner_id``
+        only that user's listing is deleted; ``None`` means no listing matched.
+        """
+
+        result = await session.execute(
+            delete(Listing)
+            .where(*self._owned_listing_conditions(listing_id, owner_id))
+            .returning(*(Listing.__table__.c[name] for name in LISTING_FILTERED_FIELDS))
+            .execution_options(synchronize_session=False)
+        )
+        return result.one_or_none()
+
+    async def get_owner(self, session: AsyncSession, listing_id: UUID) -> UUID | None:
+        return await session.scalar(select(Listing.user_id).where(Listing.id == listing_id))
+
+    async def bulk_create(
+        self, session: AsyncSession, listings: Sequence[ListingCreate], user_id: UUID
+    ) -> list[UUID]:
+        """Insert listings with multi-row INSERT ... RETURNING; ids come back in input order."""
+
+        if not listings:
+            return []
+        result = await session.execute(
+            insert(Listing).returning(Listing.id, sort_by_parameter_order=True),
+            [{**listing.model_dump(), "user_id": user_id} for listing in listings],
+        )
+        return list(result.scalars().all())
+
+    async def get_owners(
+        self, session: AsyncSession, listing_ids: Collection[UUID]
+    ) -> dict[UUID, UUID]:
+        """Map the existing ``listing_ids`` to their owners.
+
+        The rows stay locked until the transaction ends, so ownership checked against
+        the result still holds when the bulk write that follows runs.
+        """
+
+        if not listing_ids:
+            return {}
+        result = await session.execute(
+            select(Listing.id, Listing.user_id)
+            .where(Listing.id.in_(listing_ids))
+            .with_for_update()
+        )
+        return {listing_id: user_id for listing_id, user_id in result.all()}
+
+    async def bulk_update(self, session: AsyncSession, changes: Sequence[dict[str, Any]]) -> None:
+        """Apply per-listing changes, each holding the listing's ``id``.
+
+        Runs as executemany UPDATEs by primary key, one per distinct set of changed columns.
+        """
+
+        if changes:
+            await session.execute(update(Listing), changes)
+
+    async def bulk_delete(self, session: AsyncSession, listing_ids: Collection[UUID]) -> list[UUID]:
+        if not listing_ids:
+            return []
+        result = await session.execute(
+            delete(Listing).where(Listing.id.in_(listing_ids)).returning(Listing.id)
+        )
+        return list(result.scalars().all())
+
+    async def list_cities(
+        self, session: AsyncSession, prefix: str, limit: int
+    ) -> list[tuple[str, int]]:
+        listings_count = func.count().label("listings")
+        result = await session.execute(
+            select(Listing.city, listings_count)
+            .where(self._city_condition(prefix, CityMatch.PREFIX))
+            .group_by(Listing.city)
+            .order_by(listings_count.desc(), Listing.city)
+            .limit(limit)
+        )
+        return [(city, count) for city, count in result.all()]
+
+    async def facet_counts(
+        self, session: AsyncSession, filters: ListingFilters
+    ) -> dict[str, dict[Any, int]]:
+        """Count matching listings per value of every facet in one GROUPING SETS query.
+
+        Histogram facets are keyed by ``width_bucket`` index (1-based) into
+        ``FACET_HISTOGRAM_EDGES``.
+        """
+
+        # Edges are rendered inline: GROUP BY only matches select-list expressions
+        # that are textually identical, which separate bind parameters are not.
+        histograms = {
+            name: func.width_bucket(
+                getattr(Listing, name), literal_column(f"ARRAY{list(edges)}")
+            ).label(name)
+            for name, edges in FACET_HISTOGRAM_EDGES.items()
+        }
+        dimensions = [
+            Listing.property_type,
+            Listing.listing_type,
+            Listing.city,
+            *histograms.values(),
+        ]
+        query = (
+            select(*dimensions, func.count().label("count"))
+            .where(*self._filter_conditions(filters))
+            .group_by(func.grouping_sets(*dimensions))
+        )
+        result = await session.execute(query)
+
+        names = ["property_type", "listing_type", "city", *histograms]
+        facets: dict[str, dict[Any, int]] = {name: {} for name in names}
+        for row in result.all():
+            # Every dimension is NOT NULL, so the one non-null value names the grouping set.
+            for name, value in zip(names, row[:-1]):
+                if value is not None:
+                    facets[name][value] = row.count
+                    break
+        return facets
+
+    async def map_clusters(
+        self, session: AsyncSession, filters: ListingFilters, cell_size: float, limit: int
+    ) -> list[Row]:
+        """Aggregate matching listings into ``cell_size``-degree grid cells, largest first."""
+
+        cell = literal(cell_size, Float())
+        listings_count = func.count().label("count")
+        result = await session.execute(
+            select(
+                func.avg(Listing.latitude).label("latitude"),
+                func.avg(Listing.longitude).label("longitude"),
+                listings_count,
+                func.min(Listing.price).label("min_price"),
+                func.max(Listing.price).label("max_price"),
+                func.array_agg(Listing.id)[1].label("listing_id"),
+            )
+            .where(Listing.latitude.is_not(None), *self._filter_conditions(filters))
+            .group_by(func.floor(Listing.latitude / cell), func.floor(Listing.longitude / cell))
+            .order_by(listings_count.desc())
+            .limit(limit)
+        )
+        return list(result.all())
+
+    def _bbox_condition(
+        self, min_lat: float, max_lat: float, min_lng: float, max_lng: float
+    ):
+        # point <@ box is served by the GiST index on point(longitude, latitude).
+        location = func.point(Listing.longitude, Listing.latitude)
+
+        def box(west: float, east: float):
+            return func.box(
+                func.point(literal(west, Float()), literal(min_lat, Float())),
+                func.point(literal(east, Float()), literal(max_lat, Float())),
+            )
+
+        if min_lng <= max_lng:
+            return location.op("<@")(box(min_lng, max_lng))
+        # Boxes crossing the antimeridian are split in two.
+        return or_(location.op("<@")(box(min_lng, 180.0)), location.op("<@")(box(-180.0, max_lng)))
+
+    def _distance_km(self, lat: float, lng: float):
+        # Haversine distance; only evaluated on rows the enclosing box already selected.
+        lat_rad = func.radians(Listing.latitude)
+        origin_lat = func.radians(literal(lat, Float()))
+        d_lat = lat_rad - origin_lat
+        d_lng = func.radians(Listing.longitude - literal(lng, Float()))
+        a = func.power(func.sin(d_lat / 2), 2) + (
+            func.cos(origin_lat) * func.cos(lat_rad) * func.power(func.sin(d_lng / 2), 2)
+        )
+        return 2 * EARTH_RADIUS_KM * func.asin(func.least(1.0, func.sqrt(a)))
+
+    def _text_query(self, q: str):
+        # websearch_to_tsquery accepts free user input ("quoted phrases", -exclusions, or).
+        return func.websearch_to_tsquery(
+            literal_column(f"'{LISTING_SEARCH_CONFIG}'::regconfig"), q
+        )
+
+    def _relevance(self, q: str):
+        return func.ts_rank_cd(Listing.search_vector, self._text_query(q), type_=REAL)
+
+    def _city_condition(self, city: str, match: CityMatch):
+        # Contains searches are served by the pg_trgm GIN index on city; exact and
+        # prefix searches by the btree index on lower(city).
+        if match == CityMatch.EXACT:
+            return func.lower(Listing.city) == city.lower()
+        pattern = _escape_like(city.lower())
+        if match == CityMatch.PREFIX:
+            return func.lower(Listing.city).like(f"{pattern}%", escape="\\")
+        return Listing.city.ilike(f"%{pattern}%", escape="\\")
+
+    def _filter_conditions(self, filters: ListingFilters) -> list:
+        conditions = []
+        if filters.user_id:
+            conditions.append(Listing.user_id == filters.user_id)
+        if filters.q:
+            # Served by the GIN index on the generated search_vector column.
+            conditions.append(Listing.search_vector.op("@@")(self._text_query(filters.q)))
+        # The enum filters are inlined as literals so the planner can match the partial
+        # per-listing-type indexes even when the statement is prepared.
+        if filters.property_type:
+            conditions.append(
+                Listing.property_type
+                == bindparam(None, filters.property_type, literal_execute=True)
+            )
+        if filters.listing_type:
+            conditions.append(
+                Listing.listing_type
+                == bindparam(None, filters.listing_type, literal_execute=True)
+            )
+        if filters.city:
+            conditions.append(self._city_condition(filters.city, filters.city_match))
+        # Bound as unconstrained NUMERIC: a float bind would cast the price column and
+        # bypass its indexes.
+        if filters.min_price is not None:
+            conditions.append(Listing.price >= literal(filters.min_price, Numeric()))
+        if filters.max_price is not None:
+            conditions.append(Listing.price <= literal(filters.max_price, Numeric()))
+        if filters.min_area is not None:
+            conditions.append(Listing.area_sqm >= filters.min_area)
+        if filters.max_area is not None:
+            conditions.append(Listing.area_sqm <= filters.max_area)
+        if filters.min_rooms is not None:
+            conditions.append(Listing.rooms >= filters.min_rooms)
+        if filters.max_rooms is not None:
+            conditions.append(Listing.rooms <= filters.max_rooms)
+        if filters.has_bbox:
+            conditions.append(
+                self._bbox_condition(
+                    filters.min_lat, filters.max_lat, filters.min_lng, filters.max_lng
+                )
+            )
+        if filters.has_radius:
+            conditions.append(
+                self._bbox_condition(*radius_bounds(filters.lat, filters.lng, filters.radius_km))
+            )
+            conditions.append(self._distance_km(filters.lat, filters.lng) <= filters.radius_km)
+        return conditions
+
+    def build_list_query(
         self,
-        session: AsyncSession,
         *,
+        filters: ListingFilters,
         page: int,
         page_size: int,
         sort_field: str,
         sort_descending: bool,
-        user_id: UUID | None = None,
-        property_type: str | None = None,
-        listing_type: str | None = None,
-        city: str | None = None,
-        min_price: float | None = None,
-        max_price: float | None = None,
-        min_area: int | None = None,
-        max_area: int | None = None,
-        min_rooms: int | None = None,
-        max_rooms: int | None = None,
-    ) -> tuple[list[Listing], int]:
-        conditions = []
-        if user_id:
-            conditions.append(Listing.user_id == user_id)
-        if property_type:
-            conditions.append(Listing.property_type == property_type)
-        if listing_type:
-            conditions.append(Listing.listing_type == listing_type)
-        if city:
-            conditions.append(Listing.city.ilike(f"%{city}%"))
-        if min_price is not None:
-            conditions.append(Listing.price >= min_price)
-        if max_price is not None:
-            conditions.append(Listing.price <= max_price)
-        if min_area is not None:
-            conditions.append(Listing.area_sqm >= min_area)
-        if max_area is not None:
-            conditions.append(Listing.area_sqm <= max_area)
-        if min_rooms is not None:
-            conditions.append(Listing.rooms >= min_rooms)
-        if max_rooms is not None:
-            conditions.append(Listing.rooms <= max_rooms)
-
-        sort_column = {
+        cursor: Cursor | None = None,
+    ) -> Select:
+        """Build the page query; it fetches one extra row to detect further pages."""
+
+        sort_columns = {
             "created_at": Listing.created_at,
             "price": Listing.price,
             "area_sqm": Listing.area_sqm,
             "rooms": Listing.rooms,
-        }.get(sort_field, Listing.created_at)
+        }
+        if filters.q:
+            sort_columns["relevance"] = self._relevance(filters.q)
+        sort_column = sort_columns.get(sort_field, Listing.created_at)
+
+        scan_descending = self._scan_descending(sort_descending, cursor)
         order_by_clause = (
-            sort_column.desc() if sort_descending else sort_column.asc()
+            (sort_column.desc(), Listing.id.desc())
+            if scan_descending
+            else (sort_column.asc(), Listing.id.asc())
         )
 
         query = (
             select(Listing)
-            .options(selectinload(Listing.images))
-            .where(*conditions)
-            .order_by(order_by_clause)
-            .offset((page - 1) * page_size)
-            .limit(page_size)
+            .where(*self._filter_conditions(filters))
+            .order_by(*order_by_clause)
+            .limit(page_size + 1)
         )
+        if cursor is not None:
+            sort_key = tuple_(sort_column, Listing.id)
+            # Prices are bound as unconstrained NUMERIC, like the price filters: a cursor
+            # value is client input and must not overflow the column's precision.
+            value_type = Numeric() if sort_field == "price" else sort_column.type
+            position = tuple_(
+                literal(cursor.value, value_type), literal(cursor.id, Listing.id.type)
+            )
+            return query.where(sort_key < position if scan_descending else sort_key > position)
+        return query.offset((page - 1) * page_size)
 
+    async def list(
+        self,
+        session: AsyncSession,
+        *,
+        filters: ListingFilters,
+        page: int,
+        page_size: int,
+        sort_field: str,
+        sort_descending: bool,
+        cursor: Cursor | None = None,
+    ) -> ListingPage:
+        """Load one page of listings."""
+
+        query = self.build_list_query(
+            filters=filters,
+            page=page,
+            page_size=page_size,
+            sort_field=sort_field,
+            sort_descending=sort_descending,
+            cursor=cursor,
+        )
+
+        query = query.options(selectinload(Listing.images))
+        if filters.q and sort_field == "relevance":
+            # Relevance cursors are built from the rank of each row.
+            query = query.options(with_expression(Listing.relevance, self._relevance(filters.q)))
         listings_result = await session.execute(query)
-        listings = listings_result.scalars().all()
+        listings = list(listings_result.scalars().all())
+        return self._page(listings, page_size, cursor)
+
+    async def list_records(
+        self,
+        session: AsyncSession,
+        *,
+        filters: ListingFilters,
+        page: int,
+        page_size: int,
+        sort_field: str,
+        sort_descending: bool,
+        cursor: Cursor | None = None,
+        projection: ListingProjection = FULL_PROJECTION,
+    ) -> ListingPage:
+        """Load one page as plain rows, skipping ORM instantiation.
+
+        Read-only endpoints use this; the rows carry the ``ListingRead`` fields of
+        ``projection``, the sort column and ``relevance`` when sorting by it.
+        """
 
-        count_query = select(func.count()).select_from(Listing).where(*conditions)
+        columns = listing_read_columns(projection, extra_fields=(sort_field,))
+        if filters.q and sort_field == "relevance":
+            columns.append(self._relevance(filters.q).label("relevance"))
+        listings = (
+            self.build_list_query(
+                filters=filters,
+                page=page,
+                page_size=page_size,
+                sort_field=sort_field,
+                sort_descending=sort_descending,
+                cursor=cursor,
+            )
+            .with_only_columns(*columns)
+            .subquery("page")
+        )
+
+        # Images are looked up for the limited page only: a subquery in the select list
+        # of the page query itself would also run for every row skipped by OFFSET.
+        sort_column = listings.c[sort_field]
+        order_by_clause = (
+            (sort_column.desc(), listings.c.id.desc())
+            if self._scan_descending(sort_descending, cursor)
+            else (sort_column.asc(), listings.c.id.asc())
+        )
+        query = select(listings, *listing_image_columns(listings.c.id, projection)).order_by(
+            *order_by_clause
+        )
+        return self._page(await self._fetch_rows(session, query), page_size, cursor)
+
+    @staticmethod
+    def _owned_listing_conditions(listing_id: UUID, owner_id: UUID | None) -> list:
+        conditions = [Listing.id == listing_id]
+        if owner_id is not None:
+            conditions.append(Listing.user_id == owner_id)
+        return conditions
+
+    @staticmethod
+    def _scan_descending(sort_descending: bool, cursor: Cursor | None) -> bool:
+        # Walking backwards from a cursor scans in the opposite direction and
+        # flips the rows back afterwards.
+        return sort_descending != (cursor is not None and cursor.backwards)
+
+    def _page(self, rows: list, page_size: int, cursor: Cursor | None) -> ListingPage:
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        if cursor is not None and cursor.backwards:
+            rows.reverse()
+        return ListingPage(items=rows, has_more=has_more)
+
+    async def count(self, session: AsyncSession, filters: ListingFilters) -> int:
+        count_query = (
+            select(func.count()).select_from(Listing).where(*self._filter_conditions(filters))
+        )
         total = await session.scalar(count_query)
+        return int(total or 0)
+
+    async def estimate_count(
+        self, session: AsyncSession, filters: ListingFilters, *, exact_up_to: int
+    ) -> int:
+        """Count the matches exactly up to ``exact_up_to``, and estimate larger totals.
+
+        The count reads at most ``exact_up_to + 1`` rows; past that the planner's row
+        estimate is used, raised to at least the rows already counted.
+        """
 
-        return listings, int(total or 0)
+        conditions = self._filter_conditions(filters)
+        matching = select(literal(1)).select_from(Listing).where(*conditions)
+        capped = select(func.count()).select_from(matching.limit(exact_up_to + 1).subquery())
+        counted = int(await session.scalar(capped) or 0)
+        if counted <= exact_up_to:
+            return counted
+        plan = await session.scalar(_ExplainRows(matching))
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return max(counted, int(plan[0]["Plan"]["Plan Rows"]))
@@ -0,0 +1,93 @@
+import uuid
+from datetime import datetime
+
+from sqlalchemy import Row, delete, func, insert, literal, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.refresh_session import RefreshSession
+from app.models.user import UserRole
+
+REFRESH_SESSION_FIELDS = (
+    RefreshSession.user_id,
+    RefreshSession.role,
+    RefreshSession.token_version,
+    RefreshSession.expires_at,
+)
+
+
+class RefreshSessionRepository:
+    async def create(
+        self,
+        session: AsyncSession,
+        token_hash: str,
+        user_id: uuid.UUID,
+        role: UserRole,
+        token_version: int,
+        expires_at: datetime,
+    ) -> None:
+        # The user's expired sessions are purged by the same statement.
+        purge_expired = (
+            delete(RefreshSession)
+            .where(RefreshSession.user_id == user_id, RefreshSession.expires_at <= func.now())
+            .cte("purge_expired")
+        )
+        await session.execute(
+            insert(RefreshSession)
+            .values(
+                token_hash=token_hash,
+                user_id=user_id,
+                role=role,
+                token_version=token_version,
+                expires_at=expires_at,
+            )
+            .add_cte(purge_expired)
+        )
+
+    async def rotate(
+        self,
+        session: AsyncSession,
+        token_hash: str,
+        new_token_hash: str,
+        expires_at: datetime,
+    ) -> Row | None:
+        """Replace an unexpired session by one under ``new_token_hash`` in one statement.
+
+        Deleting the old row is what claims it, so of two concurrent rotations of the same
+        token only one gets a row back.
+        """
+
+        consumed = (
+            delete(RefreshSession)
+            .where(
+                RefreshSession.token_hash == token_hash,
+                RefreshSession.expires_at > func.now(),
+            )
+            .returning(
+                RefreshSession.user_id, RefreshSession.role, RefreshSession.token_version
+            )
+            .cte("consumed")
+        )
+        result = await session.execute(
+            insert(RefreshSession)
+            .from_select(
+                ["token_hash", "user_id", "role", "token_version", "expires_at"],
+                select(
+                    literal(new_token_hash, RefreshSession.token_hash.type),
+                    consumed.c.user_id,
+                    consumed.c.role,
+                    consumed.c.token_version,
+                    literal(expires_at, RefreshSession.expires_at.type),
+                ),
+            )
+            .add_cte(consumed)
+            .returning(*REFRESH_SESSION_FIELDS)
+        )
+        return result.one_or_none()
+
+    async def delete(self, session: AsyncSession, token_hash: str) -> None:
+        await session.execute(
+            delete(RefreshSession).where(RefreshSession.token_hash == token_hash)
+        )
+
+    async def delete_for_user(self, session: AsyncSession, user_id: uuid.UUID) -> None:
+        await session.execute(delete(RefreshSession).where(RefreshSession.user_id == user_id))
@@ -1,9 +1,11 @@
 import uuid
+from datetime import datetime, timedelta
+from typing import Any
 
-from sqlalchemy import select
+from sqlalchemy import delete, func, insert, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models.user import User, UserRole
+from app.models.user import DeletedUser, User, UserRole
 from app.schemas.user import UserCreate
 
 
@@ -17,16 +19,18 @@ class UserRepository:
         return result.scalar_one_or_none()
 
     async def create(self, session: AsyncSession, user_data: UserCreate, hashed_password: str) -> User:
-        user = User(
-            email=user_data.email,
-            full_name=user_data.full_name,
-            role=user_data.role,
-            hashed_password=hashed_password,
+        # INSERT ... RETURNING loads the server defaults along with the row.
+        result = await session.scalars(
+            insert(User)
+            .values(
+                email=user_data.email,
+                full_name=user_data.full_name,
+                role=user_data.role,
+                hashed_password=hashed_password,
+            )
+            .returning(User)
         )
-        session.add(user)
-        await session.flush()
-        await session.refresh(user)
-        return user
+        return result.one()
 
     async def list_all(self, session: AsyncSession) -> list[User]:
         result = await session.execute(select(User))
@@ -41,18 +45,64 @@ class UserRepository:
         full_name: str | None = None,
         role: UserRole | None = None,
         hashed_password: str | None = None,
+        bump_token_version: bool = False,
     ) -> User:
-        if email is not None:
-            user.email = email
-        if full_name is not None:
-            user.full_name = full_name
-        if role is not None:
-            user.role = role
-        if hashed_password is not None:
-            user.hashed_password = hashed_password
-        await session.flush()
-        await session.refresh(user)
-        return user
-
-    async def delete(self, session: AsyncSession, user: User) -> None:
+        changes: dict[str, Any] = {
+            name: value
+            for name, value in (
+                ("email", email),
+                ("full_name", full_name),
+                ("role", role),
+                ("hashed_password", hashed_password),
+            )
+            if value is not None
+        }
+        if bump_token_version:
+            changes["token_version"] = User.token_version + 1
+        if not changes:
+            return user
+
+        # UPDATE ... RETURNING refreshes the loaded instance in the same round trip.
+        result = await session.scalars(
+            update(User)
+            .where(User.id == user.id)
+            .values(**changes)
+            .returning(User)
+            .execution_options(populate_existing=True, synchronize_session=False)
+        )
+        return result.one()
+
+    async def list_token_versions(self, session: AsyncSession) -> dict[uuid.UUID, int]:
+        """Return the token version of every user whose tokens were ever revoked."""
+
+        result = await session.execute(
+            select(User.id, User.token_version).where(User.token_version > 0)
+        )
+        return {user_id: token_version for user_id, token_version in result.all()}
+
+    async def list_deleted_users(
+        self, session: AsyncSession, since: timedelta
+    ) -> dict[uuid.UUID, datetime]:
+        """Return when each user deleted within ``since`` was deleted."""
+
+        result = await session.execute(
+            select(DeletedUser.user_id, DeletedUser.deleted_at).where(
+                DeletedUser.deleted_at > func.now() - since
+            )
+        )
+        return {user_id: deleted_at for user_id, deleted_at in result.all()}
+
+    async def delete(self, session: AsyncSession, user: User, tombstone_ttl: timedelta) -> None:
         await session.delete(user)
+        # The tombstone lets every worker reject the user's remaining tokens; the ones
+        # older than ``tombstone_ttl`` are purged by the same statement.
+        purge_expired = (
+            delete(DeletedUser)
+            .where(DeletedUser.deleted_at <= func.now() - tombstone_ttl)
+            .cte("purge_expired")
+        )
+        await session.execute(
+            insert(DeletedUser)
+            .values(user_id=user.id)
+            .add_cte(purge_expired)
+        )
@@ -1,8 +1,11 @@
 import uuid
 from datetime import datetime
 from enum import Enum
+from typing import Any
 
-from pydantic import BaseModel, ConfigDict, Field, field_validator
+from pydantic import BaseModel, ConfigDict, Field, field_validator, model_validator
+
+from app.core.geo import haversine_km
 
 
 class PropertyType(str, Enum):
@@ -22,6 +25,8 @@ class ListingSortField(str, Enum):
     PRICE = "price"
     AREA_SQM = "area_sqm"
     ROOMS = "rooms"
+    # Full-text rank; only valid together with a ``q`` search.
+    RELEVANCE = "relevance"
 
 
 class SortOrder(str, Enum):
@@ -29,6 +34,131 @@ class SortOrder(str, Enum):
     DESC = "desc"
 
 
+class CityMatch(str, Enum):
+    CONTAINS = "contains"
+    PREFIX = "prefix"
+    EXACT = "exact"
+
+
+class CountStrategy(str, Enum):
+    EXACT = "exact"
+    ESTIMATED = "estimated"
+    NONE = "none"
+
+
+class ExportFormat(str, Enum):
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+
+class ListingInclude(str, Enum):
+    IMAGES = "images"
+    FIRST_IMAGE = "first_image"
+    NONE = "none"
+
+
+class ListingFilters(BaseModel):
+    """Normalized listing search filters; hashable so it can key caches."""
+
+    user_id: uuid.UUID | None = None
+    q: str | None = None
+    property_type: PropertyType | None = None
+    listing_type: ListingType | None = None
+    city: str | None = None
+    city_match: CityMatch = CityMatch.CONTAINS
+    min_price: float | None = None
+    max_price: float | None = None
+    min_area: int | None = None
+    max_area: int | None = None
+    min_rooms: int | None = None
+    max_rooms: int | None = None
+    # Bounding box; min_lng > max_lng selects a box crossing the antimeridian.
+    min_lat: float | None = None
+    max_lat: float | None = None
+    min_lng: float | None = None
+    max_lng: float | None = None
+    lat: float | None = None
+    lng: float | None = None
+    radius_km: float | None = None
+
+    model_config = ConfigDict(frozen=True)
+
+    @property
+    def has_bbox(self) -> bool:
+        return None not in (self.min_lat, self.max_lat, self.min_lng, self.max_lng)
+
+    @property
+    def has_radius(self) -> bool:
+        return None not in (self.lat, self.lng, self.radius_km)
+
+    @field_validator("city")
+    @classmethod
+    def normalize_city(cls, value: str | None) -> str | None:
+        # City matching is case-insensitive, so equivalent searches share one key.
+        return value.lower() if value else None
+
+    @field_validator("q")
+    @classmethod
+    def normalize_q(cls, value: str | None) -> str | None:
+        value = " ".join(value.split()) if value else None
+        return value or None
+
+    def matches(self, listing: Any) -> bool:
+        """Return whether ``listing`` (any object with listing attributes) passes the filters.
+
+        Full-text queries are evaluated by PostgreSQL only, so ``q`` is treated as matching
+        any listing; callers use this to decide what a write may affect.
+        """
+
+        if self.user_id is not None and listing.user_id != self.user_id:
+            return False
+        if self.property_type is not None and listing.property_type != self.property_type:
+            return False
+        if self.listing_type is not None and listing.listing_type != self.listing_type:
+            return False
+        if self.city is not None and not self.matches_city(listing.city):
+            return False
+        price = float(listing.price)
+        if self.min_price is not None and price < self.min_price:
+            return False
+        if self.max_price is not None and price > self.max_price:
+            return False
+        if self.min_area is not None and listing.area_sqm < self.min_area:
+            return False
+        if self.max_area is not None and listing.area_sqm > self.max_area:
+            return False
+        if self.min_rooms is not None and listing.rooms < self.min_rooms:
+            return False
+        if self.max_rooms is not None and listing.rooms > self.max_rooms:
+            return False
+        if self.has_bbox or self.has_radius:
+            return self.matches_location(listing.latitude, listing.longitude)
+        return True
+
+    def matches_location(self, latitude: float | None, longitude: float | None) -> bool:
+        if latitude is None or longitude is None:
+            return False
+        if self.has_bbox:
+            if not self.min_lat <= latitude <= self.max_lat:
+                return False
+            if self.min_lng <= self.max_lng:
+                if not self.min_lng <= longitude <= self.max_lng:
+                    return False
+            elif self.max_lng < longitude < self.min_lng:
+                return False
+        if self.has_radius:
+            return haversine_km(self.lat, self.lng, latitude, longitude) <= self.radius_km
+        return True
+
+    def matches_city(self, city: str) -> bool:
+        city = city.lower()
+        if self.city_match == CityMatch.EXACT:
+            return city == self.city
+        if self.city_match == CityMatch.PREFIX:
+            return city.startswith(self.city)
+        return self.city in city
+
+
 class ListingBase(BaseModel):
     title: str = Field(..., max_length=255)
     description: str | None = None
@@ -39,6 +169,8 @@ class ListingBase(BaseModel):
     city: str = Field(..., max_length=100)
     area_sqm: int = Field(..., gt=0)
     rooms: int = Field(..., ge=0)
+    latitude: float | None = Field(None, ge=-90, le=90)
+    longitude: float | None = Field(None, ge=-180, le=180)
 
     model_config = ConfigDict(use_enum_values=True)
 
@@ -49,6 +181,12 @@ class ListingBase(BaseModel):
             return value.lower()
         return value
 
+    @model_validator(mode="after")
+    def check_location(self) -> "ListingBase":
+        if (self.latitude is None) != (self.longitude is None):
+            raise ValueError("latitude and longitude must be provided together")
+        return self
+
 
 class ListingCreate(ListingBase):
     pass
@@ -64,6 +202,8 @@ class ListingUpdate(BaseModel):
     city: str | None = Field(None, max_length=100)
     area_sqm: int | None = Field(None, gt=0)
     rooms: int | None = Field(None, ge=0)
+    latitude: float | None = Field(None, ge=-90, le=90)
+    longitude: float | None = Field(None, ge=-180, le=180)
 
     model_config = ConfigDict(use_enum_values=True)
 
@@ -74,6 +214,56 @@ class ListingUpdate(BaseModel):
             return value.lower()
         return value
 
+    @model_validator(mode="after")
+    def check_required_fields(self) -> "ListingUpdate":
+        # Fields every listing has can be changed but not cleared.
+        cleared = sorted(
+            name
+            for name in self.model_fields_set - {"description", "latitude", "longitude"}
+            if getattr(self, name) is None
+        )
+        if cleared:
+            raise ValueError(f"{', '.join(cleared)} cannot be null")
+        return self
+
+    @model_validator(mode="after")
+    def check_location(self) -> "ListingUpdate":
+        # Coordinates are set or cleared as a pair.
+        location_fields = {"latitude", "longitude"} & self.model_fields_set
+        if location_fields and (
+            len(location_fields) == 1 or (self.latitude is None) != (self.longitude is None)
+        ):
+            raise ValueError("latitude and longitude must be provided together")
+        return self
+
+
+class ListingBulkUpdate(ListingUpdate):
+    id: uuid.UUID
+
+
+class BulkItemStatus(str, Enum):
+    CREATED = "created"
+    UPDATED = "updated"
+    DELETED = "deleted"
+    INVALID = "invalid"
+    NOT_FOUND = "not_found"
+    FORBIDDEN = "forbidden"
+
+
+class ListingBulkItemResult(BaseModel):
+    # Position of the item in the request.
+    index: int
+    status: BulkItemStatus
+    id: uuid.UUID | None = None
+    # Validation errors of an invalid item, in the format of a 422 response's detail.
+    errors: list[dict[str, Any]] | None = None
+
+
+class ListingBulkResult(BaseModel):
+    items: list[ListingBulkItemResult]
+    succeeded: int
+    failed: int
+
 
 class ListingImageRead(BaseModel):
     id: uuid.UUID
@@ -87,13 +277,129 @@ class ListingRead(ListingBase):
     id: uuid.UUID
     user_id: uuid.UUID
     created_at: datetime
+    updated_at: datetime
     images: list[ListingImageRead] = Field(default_factory=list)
 
     model_config = ConfigDict(from_attributes=True)
 
+    @classmethod
+    def from_record(cls, row: Any) -> "ListingRead":
+        """Build from a database row without validation.
+
+        The row holds trusted, already-typed column values and its images as
+        ``(id, url, created_at)`` tuples, so only the conversions validation would
+        apply (numeric price to float) are done by hand. Rows of a sparse projection
+        yield models holding just their columns; serialize those with
+        ``ListingProjection.read_include``.
+        """
+
+        values = row._asdict()
+        if values.get("price") is not None:
+            values["price"] = float(values["price"])
+        values["images"] = [
+            ListingImageRead.model_construct(id=image_id, url=url, created_at=created_at)
+            for image_id, url, created_at in values.get("images") or ()
+        ]
+        return cls.model_construct(**values)
+
+
+# Fields that ``fields=`` can select; images are controlled by ``include=``.
+LISTING_READ_FIELDS = frozenset(ListingRead.model_fields) - {"images"}
+
+
+class CitySuggestion(BaseModel):
+    city: str
+    listings: int
+
 
 class ListingListRead(BaseModel):
     items: list[ListingRead]
-    total: int
-    page: int
+    total: int | None
+    has_more: bool
+    page: int | None
     page_size: int
+    next_cursor: str | None = None
+    prev_cursor: str | None = None
+
+
+class ListingProjection(BaseModel):
+    """The part of ``ListingRead`` a response carries; hashable so it can key caches.
+
+    ``fields`` of ``None`` selects every field.
+    """
+
+    fields: tuple[str, ...] | None = None
+    include: ListingInclude = ListingInclude.IMAGES
+
+    model_config = ConfigDict(frozen=True)
+
+    @field_validator("fields")
+    @classmethod
+    def normalize_fields(cls, value: tuple[str, ...] | None) -> tuple[str, ...] | None:
+        # Sorted and deduplicated, so equivalent selections share one key (and ETag).
+        return tuple(sorted(set(value))) if value is not None else None
+
+    @property
+    def is_full(self) -> bool:
+        return self.fields is None and self.include != ListingInclude.NONE
+
+    def read_include(self) -> set[str] | None:
+        """Return the ``include`` argument that serializes a ``ListingRead`` to this projection."""
+
+        if self.is_full:
+            return None
+        names = set(self.fields if self.fields is not None else LISTING_READ_FIELDS)
+        if self.include != ListingInclude.NONE:
+            names.add("images")
+        return names
+
+    def list_include(self) -> dict[str, Any] | None:
+        """Return the ``include`` argument that serializes a ``ListingListRead``."""
+
+        item_include = self.read_include()
+        if item_include is None:
+            return None
+        return {name: True for name in ListingListRead.model_fields} | {
+            "items": {"__all__": item_include}
+        }
+
+
+FULL_PROJECTION = ListingProjection()
+
+
+class FacetCount(BaseModel):
+    value: str
+    count: int
+
+
+class HistogramBucket(BaseModel):
+    min: float
+    max: float | None
+    count: int
+
+
+class ListingFacetsRead(BaseModel):
+    total: int
+    property_types: list[FacetCount]
+    listing_types: list[FacetCount]
+    cities: list[FacetCount]
+    price: list[HistogramBucket]
+    area_sqm: list[HistogramBucket]
+    rooms: list[HistogramBucket]
+
+
+class MapCluster(BaseModel):
+    latitude: float
+    longitude: float
+    count: int
+    min_price: float
+    max_price: float
+    # Set when the cluster holds a single listing, so clients can render it as a pin.
+    listing_id: uuid.UUID | None = None
+
+
+class ListingMapRead(BaseModel):
+    zoom: int
+    cell_size: float
+    clusters: list[MapCluster]
+    truncated: bool
@@ -1,24 +1,146 @@
-from datetime import timedelta
-from typing import Iterable
-import uuid
+import asyncio
+import time
 import uuid
-from datetime import timedelta
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
 from typing import Iterable
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.cache import TTLCache
 from app.core.config import settings
-from app.core.security import create_access_token, decode_access_token, verify_password
+from app.core.metrics import register_stats
+from app.core.security import (
+    TokenPayload,
+    create_access_token,
+    create_refresh_token,
+    decode_access_token,
+    hash_refresh_token,
+    password_hasher,
+)
 from app.db.session import get_session
-from app.models.user import User, UserRole
+from app.models.user import UserRole
 from app.repositories.user_repository import UserRepository
-from app.schemas.user import Token, UserLogin
+from app.schemas.user import RefreshTokenRequest, Token, UserLogin
+from app.services.session_store import RefreshSessionData, SessionStore, get_session_store
 
 bearer_scheme = HTTPBearer(auto_error=False)
 
 
+@dataclass(frozen=True)
+class UserPrincipal:
+    """The authenticated user as far as authorization is concerned.
+
+    ``email`` is None when the principal was built from token claims alone.
+    """
+
+    id: uuid.UUID
+    email: str | None
+    role: UserRole
+    token_version: int = 0
+
+
+# Principals resolved from bearer tokens, so authenticated requests skip the user lookup.
+# User updates and deletes evict their entry in the worker making them; other workers drop
+# it once their ``token_versions`` reload sees the revocation, or after the TTL otherwise.
+current_user_cache: TTLCache[uuid.UUID, UserPrincipal] = TTLCache(
+    maxsize=settings.current_user_cache_size,
+    ttl_seconds=settings.current_user_cache_ttl_seconds,
+)
+
+register_stats(
+    "current_user_cache",
+    # Every hit is a user lookup the request did not have to make.
+    lambda: {**current_user_cache.stats(), "db_lookups_saved": current_user_cache.hits},
+)
+
+
+class TokenVersionMap:
+    """Current token versions of the users whose tokens were ever revoked.
+
+    Users missing from the map are at version 0. The map and the recently deleted users are
+    reloaded from the database every ``refresh_seconds``, so changes made through other
+    workers are picked up within that interval; ``UserService`` updates the map at once in
+    the worker making the change. Deletions are read from the ``deleted_users`` tombstones
+    while tokens issued before them may still be valid.
+    """
+
+    def __init__(self, refresh_seconds: float, revoked_ttl_seconds: float) -> None:
+        self.refresh_seconds = refresh_seconds
+        self.revoked_ttl = timedelta(seconds=revoked_ttl_seconds)
+        self._versions: dict[uuid.UUID, int] = {}
+        self._deleted: dict[uuid.UUID, datetime] = {}
+        self._loaded_at: float | None = None
+        self._lock = asyncio.Lock()
+        self.refreshes = 0
+        self.rejected = 0
+
+    async def refresh_if_stale(self, session: AsyncSession, repository: UserRepository) -> None:
+        if not self._is_stale():
+            return
+        async with self._lock:
+            # Another request may have reloaded the map while this one waited.
+            if not self._is_stale():
+                return
+            versions = await repository.list_token_versions(session)
+            deleted = await repository.list_deleted_users(session, self.revoked_ttl)
+            self._loaded_at = time.monotonic()
+            self.refreshes += 1
+            # Versions only grow, and changes recorded locally while the reload ran may be
+            # missing from it, so the loaded state is merged rather than swapped in.
+            for user_id, token_version in self._versions.items():
+                versions[user_id] = max(versions.get(user_id, 0), token_version)
+            self._versions = versions
+            cutoff = datetime.now(timezone.utc) - self.revoked_ttl
+            self._deleted = {
+                user_id: deleted_at
+                for user_id, deleted_at in {**self._deleted, **deleted}.items()
+                if deleted_at > cutoff
+            }
+
+    def _is_stale(self) -> bool:
+        return (
+            self._loaded_at is None
+            or time.monotonic() - self._loaded_at >= self.refresh_seconds
+        )
+
+    def set(self, user_id: uuid.UUID, token_version: int) -> None:
+        self._versions[user_id] = max(self._versions.get(user_id, 0), token_version)
+
+    def delete(self, user_id: uuid.UUID) -> None:
+        self._deleted[user_id] = datetime.now(timezone.utc)
+
+    def supersedes(self, user_id: uuid.UUID, token_version: int) -> bool:
+        """Whether ``user_id`` was deleted or revoked past ``token_version``."""
+
+        return user_id in self._deleted or self._versions.get(user_id, 0) > token_version
+
+    def accepts(self, user_id: uuid.UUID, token_version: int) -> bool:
+        accepted = (
+            user_id not in self._deleted and self._versions.get(user_id, 0) == token_version
+        )
+        self.rejected += not accepted
+        return accepted
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "size": len(self._versions),
+            "deleted": len(self._deleted),
+            "refreshes": self.refreshes,
+            "rejected": self.rejected,
+        }
+
+
+token_versions = TokenVersionMap(
+    refresh_seconds=settings.token_version_refresh_seconds,
+    revoked_ttl_seconds=settings.access_token_expire_minutes * 60,
+)
+
+register_stats("token_versions", token_versions.stats)
+
+
 def get_user_repository() -> UserRepository:
     return UserRepository()
 
@@ -28,31 +150,83 @@ def get_auth_service() -> "AuthService":
 
 
 class AuthService:
-    def __init__(self, repository: UserRepository | None = None) -> None:
+    def __init__(
+        self,
+        repository: UserRepository | None = None,
+        session_store: SessionStore | None = None,
+    ) -> None:
         self.repository = repository or UserRepository()
+        self.session_store = session_store or get_session_store()
 
     async def login(self, session: AsyncSession, payload: UserLogin) -> Token:
         user = await self.repository.get_by_email(session, payload.email)
-        if not user or not verify_password(payload.password, user.hashed_password):
+        if not user or not await password_hasher.verify(payload.password, user.hashed_password):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid email or password.",
                 headers={"WWW-Authenticate": "Bearer"},
             )
 
-        expires = timedelta(minutes=settings.access_token_expire_minutes)
-        access_token = create_access_token(
-            subject=str(user.id),
-            role=user.role,
-            expires_delta=expires,
+        refresh_token = create_refresh_token()
+        await self.session_store.create(
+            session,
+            hash_refresh_token(refresh_token),
+            RefreshSessionData(
+                user_id=user.id,
+                role=user.role,
+                token_version=user.token_version,
+                expires_at=self._refresh_expiry(),
+            ),
+        )
+        return Token(
+            access_token=self._access_token(user.id, user.role, user.token_version),
+            refresh_token=refresh_token,
+        )
+
+    async def refresh(self, session: AsyncSession, payload: RefreshTokenRequest) -> Token:
+        # Rotation reads neither the user row nor a password hash: the session carries
+        # what the access token needs. A role or password change revokes the sessions.
+        refresh_token = create_refresh_token()
+        refresh_session = await self.session_store.rotate(
+            session,
+            hash_refresh_token(payload.refresh_token),
+            hash_refresh_token(refresh_token),
+            expires_at=self._refresh_expiry(),
+        )
+        if refresh_session is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid or expired refresh token.",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        return Token(
+            access_token=self._access_token(
+                refresh_session.user_id, refresh_session.role, refresh_session.token_version
+            ),
+            refresh_token=refresh_token,
+        )
+
+    async def logout(self, session: AsyncSession, payload: RefreshTokenRequest) -> None:
+        await self.session_store.revoke(session, hash_refresh_token(payload.refresh_token))
+
+    @staticmethod
+    def _access_token(user_id: uuid.UUID, role: UserRole, token_version: int) -> str:
+        return create_access_token(
+            subject=str(user_id),
+            role=role,
+            expires_delta=timedelta(minutes=settings.access_token_expire_minutes),
+            token_version=token_version,
         )
-        return Token(access_token=access_token)
+
+    @staticmethod
+    def _refresh_expiry() -> datetime:
+        return datetime.now(timezone.utc) + timedelta(days=settings.refresh_token_expire_days)
 
     async def resolve_current_user(
         self,
         session: AsyncSession,
         credentials: HTTPAuthorizationCredentials,
-    ) -> User:
+    ) -> UserPrincipal:
         token_data = decode_access_token(credentials.credentials)
         try:
             user_id = uuid.UUID(token_data.sub)
@@ -62,49 +236,82 @@ class AuthService:
                 detail="Invalid authentication credentials.",
                 headers={"WWW-Authenticate": "Bearer"},
             ) from exc
-        user = await self.repository.get_by_id(session, user_id=user_id)
-        if not user:
+
+        if settings.auth_stateless_enabled:
+            return await self._principal_from_claims(session, user_id, token_data)
+
+        # Role and password changes made through other workers reach this one with the
+        # version map, so cached principals are not trusted for longer than its interval.
+        await token_versions.refresh_if_stale(session, self.repository)
+        principal = await load_principal(session, self.repository, user_id)
+        if principal is not None and principal.token_version < token_data.ver:
+            # The token was issued after a role or password change this worker has not seen
+            # yet; only tokens older than the user's version are revoked.
+            current_user_cache.delete(user_id)
+            principal = await load_principal(session, self.repository, user_id)
+        if not principal or principal.token_version != token_data.ver:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid authentication credentials.",
                 headers={"WWW-Authenticate": "Bearer"},
             )
-        return user
+        return principal
+
+    async def _principal_from_claims(
+        self, session: AsyncSession, user_id: uuid.UUID, token_data: TokenPayload
+    ) -> UserPrincipal:
+        # The signature vouches for the role; only revocation needs checking, and the
+        # version map is reloaded at most once per refresh interval.
+        await token_versions.refresh_if_stale(session, self.repository)
+        if not token_versions.accepts(user_id, token_data.ver):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Token has been revoked.",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        return UserPrincipal(
+            id=user_id, email=None, role=token_data.role, token_version=token_data.ver
+        )
+
+
+async def load_principal(
+    session: AsyncSession, repository: UserRepository, user_id: uuid.UUID
+) -> UserPrincipal | None:
+    """Return the principal of ``user_id``, from the cache or from the database."""
+
+    principal = current_user_cache.get(user_id)
+    if principal is not None and token_versions.supersedes(user_id, principal.token_version):
+        current_user_cache.delete(user_id)
+        principal = None
+    if principal is None:
+        # A user change committed while the row was being read evicts what it read.
+        generation = current_user_cache.generation
+        user = await repository.get_by_id(session, user_id=user_id)
+        if not user:
+            return None
+        principal = UserPrincipal(
+            id=user.id, email=user.email, role=user.role, token_version=user.token_version
+        )
+        current_user_cache.set(user_id, principal, generation=generation)
+    return principal
 
 
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
     session: AsyncSession = Depends(get_session),
     repository: UserRepository = Depends(get_user_repository),
-) -> User:
+) -> UserPrincipal:
     if not credentials:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Not authenticated.",
             headers={"WWW-Authenticate": "Bearer"},
         )
-
-    token_data = decode_access_token(credentials.credentials)
-    try:
-        user_id = uuid.UUID(token_data.sub)
-    except ValueError as exc:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid authentication credentials.",
-            headers={"WWW-Authenticate": "Bearer"},
-        ) from exc
-    user = await repository.get_by_id(session, user_id=user_id)
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid authentication credentials.",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    return user
+    return await AuthService(repository).resolve_current_user(session, credentials)
 
 
 def require_roles(allowed_roles: Iterable[UserRole]):
-    async def dependency(user: User = Depends(get_current_user)) -> User:
+    async def dependency(user: UserPrincipal = Depends(get_current_user)) -> UserPrincipal:
         if user.role not in allowed_roles:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
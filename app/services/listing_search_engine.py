@@ -0,0 +1,415 @@
+"""In-process, NumPy-backed search over a snapshot of the listing columns.
+
+Anonymous ``GET /listings`` searches are answered from column arrays with vectorized
+masks over presorted permutations; only the resulting page of ids is loaded from
+PostgreSQL. The snapshot refreshes in the background from a transaction-id watermark,
+so results may lag writes made by other workers by up to the refresh interval.
+Deletes are applied locally right away and picked up by other workers on the
+periodic full rebuild.
+"""
+
+import asyncio
+import logging
+import time
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.core.pagination import Cursor
+from app.db.session import SessionLocal
+from app.repositories.listing_repository import ListingRepository
+from app.schemas.listing import ListingFilters, ListingSortField, ListingType, PropertyType
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+logger = logging.getLogger(__name__)
+
+PROPERTY_TYPE_CODES = {member.value: code for code, member in enumerate(PropertyType)}
+LISTING_TYPE_CODES = {member.value: code for code, member in enumerate(ListingType)}
+# Relevance ranks a text query, which the snapshot does not index.
+SORT_FIELDS = tuple(
+    sort_field.value
+    for sort_field in ListingSortField
+    if sort_field != ListingSortField.RELEVANCE
+)
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def _to_micros(value: datetime) -> int:
+    return (value - EPOCH) // timedelta(microseconds=1)
+
+
+@dataclass(frozen=True)
+class SearchResult:
+    ids: list[UUID]
+    total: int
+    has_more: bool
+
+
+@dataclass(frozen=True)
+class _Snapshot:
+    ids: Any
+    id_hi: Any
+    id_lo: Any
+    columns: dict[str, Any]
+    property_type: Any
+    listing_type: Any
+    city: Any
+    alive: Any
+    cities: tuple[str, ...]
+    positions: dict[UUID, int]
+    # Row indices sorted ascending by (sort column, id) for every sort field.
+    orders: dict[str, Any]
+    # Oldest transaction still running when the rows were read: writes of older
+    # transactions are all included, newer ones are re-read by the next refresh.
+    watermark: int | None
+    built_at: float
+
+
+@dataclass
+class _Columns:
+    """Row-oriented batches from the database, collected into per-column lists."""
+
+    ids: list[UUID] = field(default_factory=list)
+    price: list[float] = field(default_factory=list)
+    area_sqm: list[int] = field(default_factory=list)
+    rooms: list[int] = field(default_factory=list)
+    property_type: list[int] = field(default_factory=list)
+    listing_type: list[int] = field(default_factory=list)
+    city: list[str] = field(default_factory=list)
+    created_at: list[int] = field(default_factory=list)
+    watermark: int | None = None
+
+    def extend(self, rows: Sequence[Any]) -> None:
+        if not rows:
+            return
+        ids, price, area_sqm, rooms, property_type, listing_type, city, created_at = zip(*rows)
+        self.ids.extend(ids)
+        self.price.extend(price)
+        self.area_sqm.extend(area_sqm)
+        self.rooms.extend(rooms)
+        self.property_type.extend(PROPERTY_TYPE_CODES[value] for value in property_type)
+        self.listing_type.extend(LISTING_TYPE_CODES[value] for value in listing_type)
+        self.city.extend(city)
+        self.created_at.extend(created_at)
+
+
+def _build_snapshot(
+    base: _Snapshot | None, changes: _Columns, discarded: set[UUID]
+) -> _Snapshot:
+    """Merge ``changes`` into a copy of ``base`` (or start fresh) and re-sort."""
+
+    if base is None:
+        ids = np.empty(0, dtype=object)
+        id_hi = np.empty(0, dtype=np.uint64)
+        id_lo = np.empty(0, dtype=np.uint64)
+        columns = {
+            "price": np.empty(0, dtype=np.float64),
+            "area_sqm": np.empty(0, dtype=np.int32),
+            "rooms": np.empty(0, dtype=np.int32),
+            "created_at": np.empty(0, dtype=np.int64),
+        }
+        property_type = np.empty(0, dtype=np.int8)
+        listing_type = np.empty(0, dtype=np.int8)
+        city = np.empty(0, dtype=np.int32)
+        alive = np.empty(0, dtype=bool)
+        cities: list[str] = []
+        positions: dict[UUID, int] = {}
+        watermark = None
+    else:
+        ids = base.ids
+        id_hi, id_lo = base.id_hi, base.id_lo
+        columns = {name: values.copy() for name, values in base.columns.items()}
+        property_type = base.property_type.copy()
+        listing_type = base.listing_type.copy()
+        city = base.city.copy()
+        alive = base.alive.copy()
+        cities = list(base.cities)
+        positions = dict(base.positions)
+        watermark = base.watermark
+
+    city_ids = {name: index for index, name in enumerate(cities)}
+    for name in changes.city:
+        if name not in city_ids:
+            city_ids[name] = len(cities)
+            cities.append(name)
+
+    new_ids = [listing_id for listing_id in changes.ids if listing_id not in positions]
+    if new_ids:
+        start = ids.size
+        appended = np.empty(len(new_ids), dtype=object)
+        appended[:] = new_ids
+        ids = np.concatenate([ids, appended])
+        id_hi = np.concatenate(
+            [id_hi, np.array([listing_id.int >> 64 for listing_id in new_ids], dtype=np.uint64)]
+        )
+        id_lo = np.concatenate(
+            [
+                id_lo,
+                np.array(
+                    [listing_id.int & 0xFFFFFFFFFFFFFFFF for listing_id in new_ids],
+                    dtype=np.uint64,
+                ),
+            ]
+        )
+        grow = len(new_ids)
+        columns = {
+            name: np.concatenate([values, np.zeros(grow, dtype=values.dtype)])
+            for name, values in columns.items()
+        }
+        property_type = np.concatenate([property_type, np.zeros(grow, dtype=np.int8)])
+        listing_type = np.concatenate([listing_type, np.zeros(grow, dtype=np.int8)])
+        city = np.concatenate([city, np.zeros(grow, dtype=np.int32)])
+        alive = np.concatenate([alive, np.ones(grow, dtype=bool)])
+        for offset, listing_id in enumerate(new_ids):
+            positions[listing_id] = start + offset
+
+    if changes.ids:
+        rows = np.array([positions[listing_id] for listing_id in changes.ids], dtype=np.int64)
+        columns["price"][rows] = changes.price
+        columns["area_sqm"][rows] = changes.area_sqm
+        columns["rooms"][rows] = changes.rooms
+        columns["created_at"][rows] = changes.created_at
+        property_type[rows] = changes.property_type
+        listing_type[rows] = changes.listing_type
+        city[rows] = [city_ids[name] for name in changes.city]
+        alive[rows] = True
+
+    for listing_id in discarded:
+        position = positions.get(listing_id)
+        if position is not None:
+            alive[position] = False
+
+    orders = {name: np.lexsort((id_lo, id_hi, columns[name])) for name in SORT_FIELDS}
+    if changes.watermark is not None and (watermark is None or changes.watermark > watermark):
+        watermark = changes.watermark
+
+    return _Snapshot(
+        ids=ids,
+        id_hi=id_hi,
+        id_lo=id_lo,
+        columns=columns,
+        property_type=property_type,
+        listing_type=listing_type,
+        city=city,
+        alive=alive,
+        cities=tuple(cities),
+        positions=positions,
+        orders=orders,
+        watermark=watermark,
+        built_at=time.monotonic(),
+    )
+
+
+class ListingSearchEngine:
+    def __init__(
+        self,
+        *,
+        enabled: bool,
+        refresh_seconds: float,
+        full_refresh_seconds: float,
+        session_factory: async_sessionmaker[AsyncSession] = SessionLocal,
+        repository: ListingRepository | None = None,
+    ) -> None:
+        if enabled and np is None:
+            raise RuntimeError(
+                "The listing search engine requires NumPy; install the 'search' extra."
+            )
+        self.enabled = enabled
+        self.refresh_seconds = refresh_seconds
+        self.full_refresh_seconds = full_refresh_seconds
+        self.session_factory = session_factory
+        self.repository = repository or ListingRepository()
+        self._snapshot: _Snapshot | None = None
+        self._last_full_refresh = 0.0
+        self._stale = False
+        self._discarded: set[UUID] = set()
+        self._refresh_task: asyncio.Task[None] | None = None
+        self.queries = 0
+        self.refreshes = 0
+
+    def supports(self, filters: ListingFilters) -> bool:
+        # Per-user searches are authenticated and stay on the database; location and
+        # full-text filters are served by their indexes instead of the snapshot.
+        return (
+            self.enabled
+            and filters.user_id is None
+            and filters.q is None
+            and not (filters.has_bbox or filters.has_radius)
+        )
+
+    def search(
+        self,
+        filters: ListingFilters,
+        *,
+        sort_field: str,
+        sort_descending: bool,
+        page: int,
+        page_size: int,
+        cursor: Cursor | None = None,
+    ) -> SearchResult | None:
+        """Answer a search from the snapshot, or return ``None`` while none is loaded."""
+
+        self._schedule_refresh()
+        snapshot = self._snapshot
+        if snapshot is None:
+            return None
+        self.queries += 1
+
+        mask = self._filter_mask(snapshot, filters)
+        total = int(np.count_nonzero(mask))
+
+        backwards = cursor is not None and cursor.backwards
+        scan_descending = sort_descending != backwards
+        if cursor is not None:
+            mask &= self._after_cursor_mask(snapshot, sort_field, cursor, scan_descending)
+
+        order = snapshot.orders[sort_field]
+        rows = order[mask[order]]
+        if scan_descending:
+            rows = rows[::-1]
+        start = 0 if cursor is not None else (page - 1) * page_size
+        window = rows[start : start + page_size + 1]
+        has_more = window.size > page_size
+        window = window[:page_size]
+        if backwards:
+            window = window[::-1]
+
+        return SearchResult(ids=snapshot.ids[window].tolist(), total=total, has_more=has_more)
+
+    def _filter_mask(self, snapshot: _Snapshot, filters: ListingFilters) -> Any:
+        mask = snapshot.alive.copy()
+        if filters.property_type:
+            mask &= snapshot.property_type == PROPERTY_TYPE_CODES[filters.property_type]
+        if filters.listing_type:
+            mask &= snapshot.listing_type == LISTING_TYPE_CODES[filters.listing_type]
+        if filters.city:
+            # Match the (small) city vocabulary once, then look every row up in it.
+            matching = np.array(
+                [filters.matches_city(name) for name in snapshot.cities], dtype=bool
+            )
+            mask &= matching[snapshot.city]
+
+        ranges = (
+            ("price", filters.min_price, filters.max_price),
+            ("area_sqm", filters.min_area, filters.max_area),
+            ("rooms", filters.min_rooms, filters.max_rooms),
+        )
+        for name, lower, upper in ranges:
+            values = snapshot.columns[name]
+            if lower is not None:
+                mask &= values >= lower
+            if upper is not None:
+                mask &= values <= upper
+        return mask
+
+    def _after_cursor_mask(
+        self, snapshot: _Snapshot, sort_field: str, cursor: Cursor, descending: bool
+    ) -> Any:
+        value = cursor.value
+        if isinstance(value, datetime):
+            value = _to_micros(value)
+        elif isinstance(value, Decimal):
+            value = float(value)
+        key = snapshot.columns[sort_field]
+        cursor_hi = np.uint64(cursor.id.int >> 64)
+        cursor_lo = np.uint64(cursor.id.int & 0xFFFFFFFFFFFFFFFF)
+
+        if descending:
+            id_beyond = (snapshot.id_hi < cursor_hi) | (
+                (snapshot.id_hi == cursor_hi) & (snapshot.id_lo < cursor_lo)
+            )
+            return (key < value) | ((key == value) & id_beyond)
+        id_beyond = (snapshot.id_hi > cursor_hi) | (
+            (snapshot.id_hi == cursor_hi) & (snapshot.id_lo > cursor_lo)
+        )
+        return (key > value) | ((key == value) & id_beyond)
+
+    def discard(self, listing_id: UUID) -> None:
+        """Drop a deleted listing from this worker's snapshot immediately."""
+
+        if not self.enabled:
+            return
+        self._discarded.add(listing_id)
+        snapshot = self._snapshot
+        if snapshot is not None and listing_id in snapshot.positions:
+            snapshot.alive[snapshot.positions[listing_id]] = False
+
+    def mark_stale(self) -> None:
+        """Refresh on the next search instead of waiting for the refresh interval."""
+
+        self._stale = True
+
+    def _schedule_refresh(self) -> None:
+        if self._refresh_task is not None and not self._refresh_task.done():
+            return
+        snapshot = self._snapshot
+        now = time.monotonic()
+        if (
+            snapshot is not None
+            and not self._stale
+            and now - snapshot.built_at < self.refresh_seconds
+        ):
+            return
+        full = snapshot is None or now - self._last_full_refresh >= self.full_refresh_seconds
+        self._stale = False
+        self._refresh_task = asyncio.get_running_loop().create_task(self.refresh(full=full))
+
+    async def refresh(self, *, full: bool = False) -> None:
+        base = None if full else self._snapshot
+        changed_since = None if base is None else base.watermark
+
+        pending_discards = set(self._discarded)
+        try:
+            changes = _Columns()
+            async with self.session_factory() as session:
+                # Taken before the rows are read: transactions still running now may
+                # commit rows this read cannot see, so the next refresh starts from them.
+                # updated_at cannot serve here as it holds when a transaction started,
+                # not when it committed.
+                changes.watermark = await self.repository.snapshot_horizon(session)
+                async for batch in self.repository.stream_search_rows(
+                    session, changed_since=changed_since
+                ):
+                    changes.extend(batch)
+            snapshot = await asyncio.to_thread(_build_snapshot, base, changes, pending_discards)
+        except Exception:
+            logger.exception("Refreshing the listing search snapshot failed")
+            return
+
+        # Deletes that arrived while the snapshot was being built.
+        for listing_id in self._discarded - pending_discards:
+            if listing_id in snapshot.positions:
+                snapshot.alive[snapshot.positions[listing_id]] = False
+        if base is None:
+            # A full rebuild read the table after these deletes were committed.
+            self._last_full_refresh = time.monotonic()
+            self._discarded -= pending_discards
+        self._snapshot = snapshot
+        self.refreshes += 1
+
+    def stats(self) -> dict[str, Any]:
+        snapshot = self._snapshot
+        return {
+            "enabled": self.enabled,
+            "rows": 0 if snapshot is None else int(np.count_nonzero(snapshot.alive)),
+            "age_seconds": None if snapshot is None else time.monotonic() - snapshot.built_at,
+            "queries": self.queries,
+            "refreshes": self.refreshes,
+        }
+
+
+listing_search_engine = ListingSearchEngine(
+    enabled=settings.listing_search_engine_enabled,
+    refresh_seconds=settings.listing_search_engine_refresh_seconds,
+    full_refresh_seconds=settings.listing_search_engine_full_refresh_seconds,
+)
@@ -1,121 +1,574 @@
+import csv
+import io
+from collections.abc import AsyncIterator, Hashable, Iterable, Iterator, Sequence
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, TypeVar
 from uuid import UUID
 
-from fastapi import HTTPException, UploadFile, status
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm.attributes import set_committed_value
+import pydantic_core
+from fastapi import Depends, HTTPException, Query, UploadFile, status
+from pydantic import ValidationError
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
-from app.models.user import User, UserRole
-from app.repositories.listing_repository import ListingRepository
+from app.core.cache import TTLCache
+from app.core.conditional import make_etag
+from app.core.config import settings
+from app.core.metrics import register_stats
+from app.core.pagination import Cursor, InvalidCursorError, decode_cursor, encode_cursor
+from app.core.singleflight import SingleFlight
+from app.db.session import SessionLocal, run_after_commit
+from app.models.listing import Listing
+from app.models.user import UserRole
+from app.repositories.listing_repository import (
+    FACET_HISTOGRAM_EDGES,
+    ListingPage,
+    ListingRepository,
+)
 from app.schemas.listing import (
+    FULL_PROJECTION,
+    LISTING_READ_FIELDS,
+    BulkItemStatus,
+    CityMatch,
+    CitySuggestion,
+    CountStrategy,
+    ExportFormat,
+    FacetCount,
+    HistogramBucket,
+    ListingBulkItemResult,
+    ListingBulkResult,
+    ListingBulkUpdate,
     ListingCreate,
+    ListingFacetsRead,
+    ListingFilters,
     ListingImageRead,
+    ListingInclude,
     ListingListRead,
+    ListingMapRead,
+    ListingProjection,
     ListingRead,
     ListingSortField,
+    ListingType,
     ListingUpdate,
+    MapCluster,
+    PropertyType,
     SortOrder,
 )
+from app.services.auth_service import UserPrincipal
+from app.services.listing_search_engine import ListingSearchEngine, listing_search_engine
 from app.services.storage_service import GCSStorageService, StorageService
 
+# Totals per filter combination for the "estimated" count strategy; listing writes
+# evict every combination the written listing belongs to.
+listing_count_cache: TTLCache[ListingFilters, int] = TTLCache(
+    maxsize=settings.listing_count_cache_size,
+    ttl_seconds=settings.listing_count_cache_ttl_seconds,
+)
+listing_facets_cache: TTLCache[ListingFilters, ListingFacetsRead] = TTLCache(
+    maxsize=settings.listing_facets_cache_size,
+    ttl_seconds=settings.listing_facets_cache_ttl_seconds,
+)
+
+
+@dataclass(frozen=True)
+class SerializedResponse:
+    body: bytes
+    etag: str
+    last_modified: datetime | None
+    # Listings serialized in ``body`` and, for search pages, the filters that selected
+    # them; writes use both to find the entries they affect.
+    listing_ids: frozenset[UUID]
+    filters: ListingFilters | None = None
+
+
+# Serialized anonymous read responses keyed by their normalized query.
+listing_response_cache: TTLCache[Hashable, SerializedResponse] = TTLCache(
+    maxsize=settings.listing_response_cache_size,
+    ttl_seconds=settings.listing_response_cache_ttl_seconds,
+)
+
+# Concurrent cache misses for the same response share one fetch and serialization,
+# run on the first request's session; the others never check out a connection.
+listing_response_flights: SingleFlight[Hashable, SerializedResponse] = SingleFlight()
+
+BulkItemT = TypeVar("BulkItemT", ListingCreate, ListingBulkUpdate)
+
+# Python type of each sort key as stored in a cursor, used to validate returned cursors.
+CURSOR_VALUE_TYPES: dict[str, type] = {
+    ListingSortField.CREATED_AT.value: datetime,
+    ListingSortField.PRICE.value: Decimal,
+    ListingSortField.AREA_SQM.value: int,
+    ListingSortField.ROOMS.value: int,
+    ListingSortField.RELEVANCE.value: float,
+}
+
+register_stats("listing_count_cache", listing_count_cache.stats)
+register_stats("listing_facets_cache", listing_facets_cache.stats)
+register_stats("listing_response_cache", listing_response_cache.stats)
+register_stats("listing_response_flights", listing_response_flights.stats)
+register_stats("listing_search_engine", listing_search_engine.stats)
+
+
+def _page_etag(
+    items: Sequence[object], has_more: bool, total: int | None, projection: ListingProjection
+) -> str:
+    # Cursors derive from the items' sort values, which only change along with updated_at.
+    return make_etag(
+        [(item.id, item.updated_at) for item in items],
+        has_more,
+        total,
+        projection.fields,
+        projection.include.value,
+    )
+
+
+def _listing_etag(
+    listing_id: UUID, updated_at: datetime, projection: ListingProjection
+) -> str:
+    return make_etag(listing_id, updated_at, projection.fields, projection.include.value)
+
+
+# Response cache keys. The response and the validator lookups of an endpoint must build
+# the same key, or a cached response is never found and conditional requests stop
+# short-circuiting.
+def _listing_response_key(listing_id: UUID, projection: ListingProjection) -> Hashable:
+    return ("listing", listing_id, projection)
+
+
+def _list_response_key(
+    filters: ListingFilters,
+    *,
+    page: int,
+    page_size: int,
+    sort_by: ListingSortField,
+    sort_order: SortOrder,
+    cursor: str | None,
+    count_strategy: CountStrategy,
+    projection: ListingProjection,
+) -> Hashable:
+    return (
+        "list",
+        filters,
+        page,
+        page_size,
+        sort_by,
+        sort_order,
+        cursor,
+        count_strategy,
+        projection,
+    )
+
+
+def get_listing_projection(
+    fields: str | None = Query(
+        None,
+        max_length=500,
+        description="Comma-separated listing fields to return; all of them when omitted",
+    ),
+    include: ListingInclude = Query(
+        ListingInclude.IMAGES, description="Whether to return all images, the first or none"
+    ),
+) -> ListingProjection:
+    names = None
+    if fields is not None:
+        names = tuple(name for name in (part.strip() for part in fields.split(",")) if name)
+        unknown = sorted(set(names) - LISTING_READ_FIELDS)
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown listing fields: {', '.join(unknown)}",
+            )
+    return ListingProjection(fields=names, include=include)
+
+
+def get_listing_attribute_filters(
+    q: str | None = Query(None, max_length=200),
+    property_type: PropertyType | None = Query(None),
+    listing_type: ListingType | None = Query(None),
+    city: str | None = Query(None, max_length=100),
+    city_match: CityMatch = Query(CityMatch.CONTAINS),
+    min_price: float | None = Query(None, ge=0),
+    max_price: float | None = Query(None, ge=0),
+    min_area: int | None = Query(None, ge=1),
+    max_area: int | None = Query(None, ge=1),
+    min_rooms: int | None = Query(None, ge=0),
+    max_rooms: int | None = Query(None, ge=0),
+) -> ListingFilters:
+    """Text and attribute filters, shared by every listing search endpoint."""
+
+    return ListingFilters(
+        q=q,
+        property_type=property_type,
+        listing_type=listing_type,
+        city=city,
+        city_match=city_match,
+        min_price=min_price,
+        max_price=max_price,
+        min_area=min_area,
+        max_area=max_area,
+        min_rooms=min_rooms,
+        max_rooms=max_rooms,
+    )
+
+
+def get_listing_filters(
+    filters: ListingFilters = Depends(get_listing_attribute_filters),
+    min_lat: float | None = Query(None, ge=-90, le=90),
+    max_lat: float | None = Query(None, ge=-90, le=90),
+    min_lng: float | None = Query(None, ge=-180, le=180),
+    max_lng: float | None = Query(None, ge=-180, le=180),
+    lat: float | None = Query(None, ge=-90, le=90),
+    lng: float | None = Query(None, ge=-180, le=180),
+    radius_km: float | None = Query(None, gt=0, le=1000),
+) -> ListingFilters:
+    """The attribute filters plus the optional bounding-box and radius filters."""
+
+    return filters.model_copy(
+        update=dict(
+            min_lat=min_lat,
+            max_lat=max_lat,
+            min_lng=min_lng,
+            max_lng=max_lng,
+            lat=lat,
+            lng=lng,
+            radius_km=radius_km,
+        )
+    )
+
+
+# CSV exports flatten images into their URLs, space-separated.
+EXPORT_CSV_COLUMNS = (
+    *(name for name in ListingRead.model_fields if name != "images"),
+    "image_urls",
+)
+
+
+def _csv_chunk(rows: Iterable[Sequence[object]]) -> bytes:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    return buffer.getvalue().encode()
+
+
+def _csv_row(listing: ListingRead) -> list[object]:
+    values = listing.model_dump(mode="json", exclude={"images"})
+    return [
+        *(values[name] for name in EXPORT_CSV_COLUMNS[:-1]),
+        " ".join(image.url for image in listing.images),
+    ]
+
+
+def _validate_bulk_items(
+    items: Sequence[Any], model: type[BulkItemT]
+) -> tuple[list[ListingBulkItemResult], list[tuple[int, BulkItemT]]]:
+    """Split bulk request items into results for the invalid ones and the validated rest."""
+
+    invalid: list[ListingBulkItemResult] = []
+    valid: list[tuple[int, BulkItemT]] = []
+    for index, item in enumerate(items):
+        try:
+            valid.append((index, model.model_validate(item)))
+        except ValidationError as exc:
+            invalid.append(
+                ListingBulkItemResult(
+                    index=index,
+                    status=BulkItemStatus.INVALID,
+                    errors=exc.errors(include_url=False, include_context=False),
+                )
+            )
+    return invalid, valid
+
+
+FOREIGN_KEY_VIOLATION = "23503"
+
+
+@contextmanager
+def _existing_owner() -> Iterator[None]:
+    """Reject writes by a user deleted after their token was issued with a 401."""
+
+    try:
+        yield
+    except IntegrityError as exc:
+        if getattr(exc.orig, "sqlstate", None) != FOREIGN_KEY_VIOLATION:
+            raise
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid authentication credentials.",
+            headers={"WWW-Authenticate": "Bearer"},
+        ) from exc
+
+
+def _bulk_result(results: list[ListingBulkItemResult]) -> ListingBulkResult:
+    results.sort(key=lambda result: result.index)
+    succeeded = sum(
+        result.status
+        in (BulkItemStatus.CREATED, BulkItemStatus.UPDATED, BulkItemStatus.DELETED)
+        for result in results
+    )
+    return ListingBulkResult(items=results, succeeded=succeeded, failed=len(results) - succeeded)
+
 
 class ListingService:
     def __init__(
         self,
         repository: ListingRepository | None = None,
         storage_service: StorageService | None = None,
+        search_engine: ListingSearchEngine | None = None,
+        session_factory: async_sessionmaker[AsyncSession] | None = None,
     ) -> None:
         self.repository = repository or ListingRepository()
         self.storage_service = storage_service
+        self.search_engine = search_engine or listing_search_engine
+        self.session_factory = session_factory or SessionLocal
 
     async def create_listing(
-        self, session: AsyncSession, listing: ListingCreate, user: User
+        self, session: AsyncSession, listing: ListingCreate, user: UserPrincipal
     ) -> ListingRead:
-        created = await self.repository.create(session, listing, user.id)
-        # Avoid lazy-loading images during response serialization.
-        set_committed_value(created, "images", [])
-        return ListingRead.model_validate(created)
+        with _existing_owner():
+            record = await self.repository.create(session, listing, user.id)
+        created = ListingRead.from_record(record)
+        self._invalidate_caches(session, created)
+        return created
 
     async def get_listing(
-        self, session: AsyncSession, listing_id: UUID
+        self,
+        session: AsyncSession,
+        listing_id: UUID,
+        projection: ListingProjection = FULL_PROJECTION,
     ) -> ListingRead:
-        listing = await self.repository.get_by_id(session, listing_id)
+        record = await self.repository.get_record(session, listing_id, projection)
 
-        if not listing:
+        if not record:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="Listing not found"
             )
 
-        return ListingRead.model_validate(listing)
+        return ListingRead.from_record(record)
 
-    async def upload_listing_image(
-        self, session: AsyncSession, listing_id: UUID, file: UploadFile, user: User
-    ) -> ListingImageRead:
-        listing = await self.repository.get_by_id(session, listing_id)
-        if not listing:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND, detail="Listing not found"
+    async def get_listing_response(
+        self,
+        session: AsyncSession,
+        listing_id: UUID,
+        projection: ListingProjection = FULL_PROJECTION,
+    ) -> SerializedResponse:
+        """Return the serialized listing, served from the response cache when possible."""
+
+        key = _listing_response_key(listing_id, projection)
+        cached = listing_response_cache.get(key)
+        if cached is not None:
+            return cached
+
+        async def load() -> SerializedResponse:
+            generation = listing_response_cache.generation
+            listing = await self.get_listing(session, listing_id, projection)
+            response = SerializedResponse(
+                body=listing.model_dump_json(include=projection.read_include()).encode(),
+                etag=_listing_etag(listing_id, listing.updated_at, projection),
+                last_modified=listing.updated_at,
+                listing_ids=frozenset({listing_id}),
             )
+            listing_response_cache.set(key, response, generation=generation)
+            return response
+
+        return await listing_response_flights.do(key, load)
+
+    async def get_listing_validators(
+        self,
+        session: AsyncSession,
+        listing_id: UUID,
+        projection: ListingProjection = FULL_PROJECTION,
+    ) -> tuple[str, datetime]:
+        """Return the ETag and Last-Modified of a listing without loading or serializing it."""
+
+        cached = listing_response_cache.get(_listing_response_key(listing_id, projection))
+        if cached is not None:
+            return cached.etag, cached.last_modified
 
-        if user.role == UserRole.USER and listing.user_id != user.id:
+        updated_at = await self.repository.get_version(session, listing_id)
+        if updated_at is None:
             raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="You are not allowed to modify this listing",
+                status_code=status.HTTP_404_NOT_FOUND, detail="Listing not found"
             )
+        return _listing_etag(listing_id, updated_at, projection), updated_at
+
+    async def upload_listing_image(
+        self, session: AsyncSession, listing_id: UUID, file: UploadFile, user: UserPrincipal
+    ) -> ListingImageRead:
+        # Checked before the upload so rejected requests never reach the bucket.
+        await self._check_listing_owner(session, listing_id, user)
 
         storage = self.storage_service or GCSStorageService()
         self.storage_service = storage
 
         image_url = await storage.upload_listing_image(file, listing_id)
         image = await self.repository.add_image(session, listing_id, image_url)
+        self._invalidate_caches(session, listing_id=listing_id)
         return ListingImageRead.model_validate(image)
 
     async def update_listing(
-        self, session: AsyncSession, listing_id: UUID, listing: ListingUpdate, user: User
+        self, session: AsyncSession, listing_id: UUID, listing: ListingUpdate, user: UserPrincipal
     ) -> ListingRead:
-        existing_listing = await self.repository.get_by_id(session, listing_id)
-
-        if not existing_listing:
+        updated = await self.repository.update(
+            session, listing_id, listing, owner_id=self._owner_filter(user)
+        )
+        if updated is None:
+            await self._check_listing_owner(session, listing_id, user)
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="Listing not found"
             )
 
-        if user.role == UserRole.USER and existing_listing.user_id != user.id:
+        updated_listing = ListingRead.from_record(updated.record)
+        self._invalidate_caches(
+            session, updated.previous, updated_listing, listing_id=listing_id
+        )
+        return updated_listing
+
+    async def delete_listing(
+        self, session: AsyncSession, listing_id: UUID, user: UserPrincipal
+    ) -> None:
+        deleted = await self.repository.delete(
+            session, listing_id, owner_id=self._owner_filter(user)
+        )
+        if deleted is None:
+            await self._check_listing_owner(session, listing_id, user)
             raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="You are not allowed to modify this listing",
+                status_code=status.HTTP_404_NOT_FOUND, detail="Listing not found"
             )
 
-        updated_listing = await self.repository.update(session, existing_listing, listing)
-        return ListingRead.model_validate(updated_listing)
+        self._invalidate_caches(session, deleted, listing_id=listing_id, discard=True)
 
-    async def delete_listing(
-        self, session: AsyncSession, listing_id: UUID, user: User
+    @staticmethod
+    def _owner_filter(user: UserPrincipal) -> UUID | None:
+        """The owner writes by ``user`` are restricted to; staff may modify any listing."""
+
+        return user.id if user.role == UserRole.USER else None
+
+    async def _check_listing_owner(
+        self, session: AsyncSession, listing_id: UUID, user: UserPrincipal
     ) -> None:
-        existing_listing = await self.repository.get_by_id(session, listing_id)
+        """Raise 404 for a missing listing and 403 for one ``user`` may not modify.
 
-        if not existing_listing:
+        Updates and deletes filter on the owner in the write itself and only get here
+        when it matched nothing, to tell the two apart.
+        """
+
+        owner_id = await self.repository.get_owner(session, listing_id)
+        if owner_id is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="Listing not found"
             )
 
-        if user.role == UserRole.USER and existing_listing.user_id != user.id:
+        if self._owner_filter(user) not in (None, owner_id):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="You are not allowed to modify this listing",
             )
 
-        await self.repository.delete(session, existing_listing)
+    async def bulk_create_listings(
+        self, session: AsyncSession, items: Sequence[Any], user: UserPrincipal
+    ) -> ListingBulkResult:
+        """Validate each item on its own and insert the valid ones in one statement."""
 
-    def _validate_filters(
+        results, valid = _validate_bulk_items(items, ListingCreate)
+        with _existing_owner():
+            listing_ids = await self.repository.bulk_create(
+                session, [listing for _, listing in valid], user.id
+            )
+        results += [
+            ListingBulkItemResult(index=index, status=BulkItemStatus.CREATED, id=listing_id)
+            for (index, _), listing_id in zip(valid, listing_ids)
+        ]
+        if listing_ids:
+            self._invalidate_all_caches(session)
+        return _bulk_result(results)
+
+    async def bulk_update_listings(
+        self, session: AsyncSession, items: Sequence[Any], user: UserPrincipal
+    ) -> ListingBulkResult:
+        """Validate each item and check its ownership, then apply the allowed updates together."""
+
+        results, valid = _validate_bulk_items(items, ListingBulkUpdate)
+        allowed = await self._check_bulk_ownership(
+            session, [(index, update.id) for index, update in valid], user, results
+        )
+        # Items that change nothing are reported as updated without touching updated_at.
+        changes = [
+            {"id": update.id, **update.model_dump(exclude_unset=True, exclude={"id"})}
+            for index, update in valid
+            if index in allowed and update.model_fields_set - {"id"}
+        ]
+        await self.repository.bulk_update(session, changes)
+        results += [
+            ListingBulkItemResult(index=index, status=BulkItemStatus.UPDATED, id=update.id)
+            for index, update in valid
+            if index in allowed
+        ]
+        if changes:
+            self._invalidate_all_caches(session)
+        return _bulk_result(results)
+
+    async def bulk_delete_listings(
+        self, session: AsyncSession, listing_ids: Sequence[UUID], user: UserPrincipal
+    ) -> ListingBulkResult:
+        results: list[ListingBulkItemResult] = []
+        allowed = await self._check_bulk_ownership(
+            session, list(enumerate(listing_ids)), user, results
+        )
+        deleted = set(
+            await self.repository.bulk_delete(
+                session, {listing_ids[index] for index in allowed}
+            )
+        )
+        results += [
+            ListingBulkItemResult(index=index, status=BulkItemStatus.DELETED, id=listing_ids[index])
+            for index in allowed
+            if listing_ids[index] in deleted
+        ]
+        if deleted:
+            self._invalidate_all_caches(session, deleted=deleted)
+        return _bulk_result(results)
+
+    async def _check_bulk_ownership(
         self,
-        *,
-        min_price: float | None,
-        max_price: float | None,
-        min_area: int | None,
-        max_area: int | None,
-        min_rooms: int | None,
-        max_rooms: int | None,
+        session: AsyncSession,
+        items: Sequence[tuple[int, UUID]],
+        user: UserPrincipal,
+        results: list[ListingBulkItemResult],
+    ) -> set[int]:
+        """Return the indexes of the items ``user`` may modify.
+
+        Missing and foreign listings are appended to ``results``.
+        """
+
+        owners = await self.repository.get_owners(session, {listing_id for _, listing_id in items})
+        allowed: set[int] = set()
+        for index, listing_id in items:
+            owner_id = owners.get(listing_id)
+            if owner_id is None:
+                item_status = BulkItemStatus.NOT_FOUND
+            elif user.role == UserRole.USER and owner_id != user.id:
+                item_status = BulkItemStatus.FORBIDDEN
+            else:
+                allowed.add(index)
+                continue
+            results.append(ListingBulkItemResult(index=index, status=item_status, id=listing_id))
+        return allowed
+
+    def _validate_filters(
+        self, filters: ListingFilters, sort_by: ListingSortField | None = None
     ) -> None:
+        if sort_by == ListingSortField.RELEVANCE and filters.q is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Sorting by relevance requires a search query",
+            )
+
+        min_price, max_price = filters.min_price, filters.max_price
+        min_area, max_area = filters.min_area, filters.max_area
+        min_rooms, max_rooms = filters.min_rooms, filters.max_rooms
+
         if min_price is not None and max_price is not None and min_price > max_price:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -134,106 +587,507 @@ class ListingService:
                 detail="Minimum rooms cannot exceed maximum rooms",
             )
 
-    async def list_listings(
+        bbox = (filters.min_lat, filters.max_lat, filters.min_lng, filters.max_lng)
+        if any(value is not None for value in bbox) and not filters.has_bbox:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="min_lat, max_lat, min_lng and max_lng must be provided together",
+            )
+
+        if filters.has_bbox and filters.min_lat > filters.max_lat:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Minimum latitude cannot exceed maximum latitude",
+            )
+
+        radius = (filters.lat, filters.lng, filters.radius_km)
+        if any(value is not None for value in radius) and not filters.has_radius:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="lat, lng and radius_km must be provided together",
+            )
+
+    def _decode_cursor(
+        self, cursor: str, sort_by: ListingSortField, sort_order: SortOrder
+    ) -> Cursor:
+        try:
+            decoded = decode_cursor(cursor, CURSOR_VALUE_TYPES)
+        except InvalidCursorError as exc:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid pagination cursor",
+            ) from exc
+
+        if decoded.sort_field != sort_by.value or decoded.descending != (
+            sort_order == SortOrder.DESC
+        ):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Pagination cursor does not match the requested sort",
+            )
+
+        return decoded
+
+    async def _count(
+        self,
+        session: AsyncSession,
+        filters: ListingFilters,
+        strategy: CountStrategy,
+        listing_page: ListingPage,
+        *,
+        page: int,
+        page_size: int,
+        cursor: Cursor | None,
+        generation: int,
+    ) -> int | None:
+        if strategy == CountStrategy.NONE:
+            return None
+
+        if cursor is None and not listing_page.has_more and (listing_page.items or page == 1):
+            # The last offset page already tells us the exact total.
+            total = (page - 1) * page_size + len(listing_page.items)
+        else:
+            if strategy == CountStrategy.ESTIMATED:
+                total = listing_count_cache.get(filters)
+                if total is not None:
+                    return total
+                # Exact counts from other requests refine the cached estimate later.
+                total = await self.repository.estimate_count(
+                    session, filters, exact_up_to=settings.listing_count_exact_up_to
+                )
+            else:
+                total = await self.repository.count(session, filters)
+
+        listing_count_cache.set(filters, total, generation=generation)
+        return total
+
+    def _invalidate_all_caches(self, session: AsyncSession, deleted: Iterable[UUID] = ()) -> None:
+        # Matching every cached entry against hundreds of written listings costs more
+        # than recomputing, so bulk writes drop the caches wholesale.
+        deleted = list(deleted)
+
+        def evict() -> None:
+            listing_count_cache.clear()
+            listing_facets_cache.clear()
+            listing_response_cache.clear()
+            listing_response_flights.forget()
+            for listing_id in deleted:
+                self.search_engine.discard(listing_id)
+            self.search_engine.mark_stale()
+
+        run_after_commit(session, evict)
+
+    def _invalidate_caches(
         self,
         session: AsyncSession,
+        *listings: object,
+        listing_id: UUID | None = None,
+        discard: bool = False,
+    ) -> None:
+        """Evict cached counts, facets and responses affected by a write once it commits.
+
+        Evicting before the commit would let a read in between cache the old state again;
+        reads that started before the commit fail their generation check instead.
+        ``listings`` are the states (before and/or after the write) of the written
+        listing; search results whose filters match any of them may change.
+        ``listing_id`` also evicts every response that embeds that listing.
+        """
+
+        def matches(filters: ListingFilters) -> bool:
+            return any(filters.matches(listing) for listing in listings)
+
+        def evict() -> None:
+            listing_count_cache.delete_where(lambda filters, _: matches(filters))
+            listing_facets_cache.delete_where(lambda filters, _: matches(filters))
+            listing_response_cache.delete_where(
+                lambda _, cached: listing_id in cached.listing_ids
+                or (cached.filters is not None and matches(cached.filters))
+            )
+            # Reads already in flight may predate the write; later ones must not join them.
+            listing_response_flights.forget()
+            if discard and listing_id is not None:
+                self.search_engine.discard(listing_id)
+            elif listings:
+                self.search_engine.mark_stale()
+
+        run_after_commit(session, evict)
+
+    def _build_list_response(
+        self,
+        listing_page: ListingPage,
         *,
+        total: int | None,
         page: int,
         page_size: int,
         sort_by: ListingSortField,
         sort_order: SortOrder,
-        property_type: str | None = None,
-        listing_type: str | None = None,
-        city: str | None = None,
-        min_price: float | None = None,
-        max_price: float | None = None,
-        min_area: int | None = None,
-        max_area: int | None = None,
-        min_rooms: int | None = None,
-        max_rooms: int | None = None,
+        cursor: Cursor | None,
     ) -> ListingListRead:
-        self._validate_filters(
-            min_price=min_price,
-            max_price=max_price,
-            min_area=min_area,
-            max_area=max_area,
-            min_rooms=min_rooms,
-            max_rooms=max_rooms,
+        items = listing_page.items
+        descending = sort_order == SortOrder.DESC
+
+        def cursor_for(listing: Listing, backwards: bool) -> str:
+            return encode_cursor(
+                Cursor(
+                    sort_field=sort_by.value,
+                    descending=descending,
+                    value=getattr(listing, sort_by.value),
+                    id=listing.id,
+                    backwards=backwards,
+                )
+            )
+
+        next_cursor = prev_cursor = None
+        if items:
+            if cursor is not None and cursor.backwards:
+                has_next, has_prev = True, listing_page.has_more
+            else:
+                has_next = listing_page.has_more
+                has_prev = cursor is not None or page > 1
+            if has_next:
+                next_cursor = cursor_for(items[-1], backwards=False)
+            if has_prev:
+                prev_cursor = cursor_for(items[0], backwards=True)
+
+        return ListingListRead(
+            items=[ListingRead.from_record(row) for row in items],
+            total=total,
+            has_more=next_cursor is not None,
+            page=None if cursor is not None else page,
+            page_size=page_size,
+            next_cursor=next_cursor,
+            prev_cursor=prev_cursor,
         )
 
-        listings, total = await self.repository.list(
-            session,
+    async def _fetch_page(
+        self,
+        session: AsyncSession,
+        filters: ListingFilters,
+        *,
+        page: int,
+        page_size: int,
+        sort_by: ListingSortField,
+        sort_order: SortOrder,
+        cursor: Cursor | None,
+        count_strategy: CountStrategy,
+        projection: ListingProjection = FULL_PROJECTION,
+    ) -> tuple[ListingPage, int | None]:
+        """Resolve a page and its total."""
+
+        engine_result = None
+        if self.search_engine.supports(filters):
+            engine_result = self.search_engine.search(
+                filters,
+                sort_field=sort_by.value,
+                sort_descending=sort_order == SortOrder.DESC,
+                page=page,
+                page_size=page_size,
+                cursor=cursor,
+            )
+
+        if engine_result is not None:
+            # The snapshot already resolved the page and its total; only hydrate the rows.
+            listing_page = ListingPage(
+                items=await self.repository.get_records_by_ids(
+                    session, engine_result.ids, projection
+                ),
+                has_more=engine_result.has_more,
+            )
+            if count_strategy == CountStrategy.EXACT:
+                # The snapshot lags writes by up to its refresh interval, so its total
+                # serves the "estimated" strategy only.
+                total = await self.repository.count(session, filters)
+            elif count_strategy == CountStrategy.ESTIMATED:
+                total = engine_result.total
+            else:
+                total = None
+            return listing_page, total
+
+        count_generation = listing_count_cache.generation
+        page_query = dict(
+            filters=filters,
             page=page,
             page_size=page_size,
             sort_field=sort_by.value,
             sort_descending=sort_order == SortOrder.DESC,
-            property_type=property_type,
-            listing_type=listing_type,
-            city=city,
-            min_price=min_price,
-            max_price=max_price,
-            min_area=min_area,
-            max_area=max_area,
-            min_rooms=min_rooms,
-            max_rooms=max_rooms,
+            cursor=cursor,
+        )
+        listing_page = await self.repository.list_records(
+            session, projection=projection, **page_query
+        )
+        total = await self._count(
+            session,
+            filters,
+            count_strategy,
+            listing_page,
+            page=page,
+            page_size=page_size,
+            cursor=cursor,
+            generation=count_generation,
         )
+        return listing_page, total
 
-        return ListingListRead(
-            items=[ListingRead.model_validate(listing) for listing in listings],
+    async def _list(
+        self,
+        session: AsyncSession,
+        filters: ListingFilters,
+        *,
+        page: int,
+        page_size: int,
+        sort_by: ListingSortField,
+        sort_order: SortOrder,
+        cursor: str | None,
+        count_strategy: CountStrategy,
+        projection: ListingProjection = FULL_PROJECTION,
+    ) -> tuple[ListingListRead, str]:
+        """Return the page response and its ETag."""
+
+        self._validate_filters(filters, sort_by)
+        decoded_cursor = self._decode_cursor(cursor, sort_by, sort_order) if cursor else None
+        listing_page, total = await self._fetch_page(
+            session,
+            filters,
+            page=page,
+            page_size=page_size,
+            sort_by=sort_by,
+            sort_order=sort_order,
+            cursor=decoded_cursor,
+            count_strategy=count_strategy,
+            projection=projection,
+        )
+        etag = _page_etag(listing_page.items, listing_page.has_more, total, projection)
+        response = self._build_list_response(
+            listing_page,
             total=total,
             page=page,
             page_size=page_size,
+            sort_by=sort_by,
+            sort_order=sort_order,
+            cursor=decoded_cursor,
         )
+        return response, etag
 
-    async def list_user_listings(
+    async def list_listings(
         self,
         session: AsyncSession,
+        filters: ListingFilters,
         *,
-        user: User,
         page: int,
         page_size: int,
         sort_by: ListingSortField,
         sort_order: SortOrder,
-        property_type: str | None = None,
-        listing_type: str | None = None,
-        city: str | None = None,
-        min_price: float | None = None,
-        max_price: float | None = None,
-        min_area: int | None = None,
-        max_area: int | None = None,
-        min_rooms: int | None = None,
-        max_rooms: int | None = None,
+        cursor: str | None = None,
+        count_strategy: CountStrategy = CountStrategy.EXACT,
+        projection: ListingProjection = FULL_PROJECTION,
     ) -> ListingListRead:
-        self._validate_filters(
-            min_price=min_price,
-            max_price=max_price,
-            min_area=min_area,
-            max_area=max_area,
-            min_rooms=min_rooms,
-            max_rooms=max_rooms,
+        response, _ = await self._list(
+            session,
+            filters,
+            page=page,
+            page_size=page_size,
+            sort_by=sort_by,
+            sort_order=sort_order,
+            cursor=cursor,
+            count_strategy=count_strategy,
+            projection=projection,
         )
+        return response
 
-        listings, total = await self.repository.list(
-            session,
+    async def list_listings_response(
+        self,
+        session: AsyncSession,
+        filters: ListingFilters,
+        *,
+        page: int,
+        page_size: int,
+        sort_by: ListingSortField,
+        sort_order: SortOrder,
+        cursor: str | None = None,
+        count_strategy: CountStrategy = CountStrategy.EXACT,
+        projection: ListingProjection = FULL_PROJECTION,
+    ) -> SerializedResponse:
+        """Return a serialized search page, served from the response cache when possible."""
+
+        key = _list_response_key(
+            filters,
             page=page,
             page_size=page_size,
-            sort_field=sort_by.value,
-            sort_descending=sort_order == SortOrder.DESC,
-            user_id=user.id,
-            property_type=property_type,
-            listing_type=listing_type,
-            city=city,
-            min_price=min_price,
-            max_price=max_price,
-            min_area=min_area,
-            max_area=max_area,
-            min_rooms=min_rooms,
-            max_rooms=max_rooms,
+            sort_by=sort_by,
+            sort_order=sort_order,
+            cursor=cursor,
+            count_strategy=count_strategy,
+            projection=projection,
         )
+        cached = listing_response_cache.get(key)
+        if cached is not None:
+            return cached
 
-        return ListingListRead(
-            items=[ListingRead.model_validate(listing) for listing in listings],
-            total=total,
+        async def load() -> SerializedResponse:
+            generation = listing_response_cache.generation
+            listing_list, etag = await self._list(
+                session,
+                filters,
+                page=page,
+                page_size=page_size,
+                sort_by=sort_by,
+                sort_order=sort_order,
+                cursor=cursor,
+                count_strategy=count_strategy,
+                projection=projection,
+            )
+            response = SerializedResponse(
+                body=listing_list.model_dump_json(include=projection.list_include()).encode(),
+                etag=etag,
+                last_modified=None,
+                listing_ids=frozenset(item.id for item in listing_list.items),
+                filters=filters,
+            )
+            listing_response_cache.set(key, response, generation=generation)
+            return response
+
+        return await listing_response_flights.do(key, load)
+
+    async def list_user_listings(
+        self,
+        session: AsyncSession,
+        filters: ListingFilters,
+        *,
+        user: UserPrincipal,
+        page: int,
+        page_size: int,
+        sort_by: ListingSortField,
+        sort_order: SortOrder,
+        cursor: str | None = None,
+        count_strategy: CountStrategy = CountStrategy.EXACT,
+        projection: ListingProjection = FULL_PROJECTION,
+    ) -> ListingListRead:
+        filters = filters.model_copy(update={"user_id": user.id})
+        response, _ = await self._list(
+            session,
+            filters,
             page=page,
             page_size=page_size,
+            sort_by=sort_by,
+            sort_order=sort_order,
+            cursor=cursor,
+            count_strategy=count_strategy,
+            projection=projection,
+        )
+        return response
+
+    def export_listings(
+        self,
+        filters: ListingFilters,
+        *,
+        export_format: ExportFormat,
+        after_id: UUID | None = None,
+    ) -> AsyncIterator[bytes]:
+        """Validate an export and return its body as a stream of encoded chunks.
+
+        Listings are streamed in id order; ``after_id`` resumes an interrupted export
+        after the last listing received. Filters are validated before streaming starts,
+        so invalid ones still produce a regular error response.
+        """
+
+        self._validate_filters(filters)
+        return self._stream_export(filters, export_format, after_id)
+
+    async def _stream_export(
+        self, filters: ListingFilters, export_format: ExportFormat, after_id: UUID | None
+    ) -> AsyncIterator[bytes]:
+        if export_format == ExportFormat.CSV:
+            yield _csv_chunk([EXPORT_CSV_COLUMNS])
+
+        # The body streams after the endpoint has returned, when request-scoped
+        # dependencies (the request's session included) may already be closed, so the
+        # export holds its own session for as long as it streams.
+        async with self.session_factory() as session:
+            async for rows in self.repository.stream_export_rows(
+                session,
+                filters,
+                after_id=after_id,
+                batch_size=settings.listing_export_batch_size,
+            ):
+                listings = [ListingRead.from_record(row) for row in rows]
+                if export_format == ExportFormat.CSV:
+                    yield _csv_chunk(_csv_row(listing) for listing in listings)
+                else:
+                    yield b"".join(pydantic_core.to_json(listing) + b"\n" for listing in listings)
+
+    async def list_cities(
+        self, session: AsyncSession, *, prefix: str, limit: int
+    ) -> list[CitySuggestion]:
+        cities = await self.repository.list_cities(session, prefix.strip(), limit)
+        return [CitySuggestion(city=city, listings=count) for city, count in cities]
+
+    async def get_facets(
+        self, session: AsyncSession, filters: ListingFilters
+    ) -> ListingFacetsRead:
+        self._validate_filters(filters)
+
+        cached = listing_facets_cache.get(filters)
+        if cached is not None:
+            return cached
+
+        generation = listing_facets_cache.generation
+        counts = await self.repository.facet_counts(session, filters)
+
+        def values(name: str, limit: int | None = None) -> list[FacetCount]:
+            ranked = sorted(counts[name].items(), key=lambda item: (-item[1], str(item[0])))
+            return [
+                FacetCount(value=getattr(value, "value", value), count=count)
+                for value, count in ranked[:limit]
+            ]
+
+        def histogram(name: str) -> list[HistogramBucket]:
+            edges = FACET_HISTOGRAM_EDGES[name]
+            return [
+                HistogramBucket(
+                    min=lower,
+                    max=edges[index + 1] if index + 1 < len(edges) else None,
+                    count=counts[name].get(index + 1, 0),
+                )
+                for index, lower in enumerate(edges)
+            ]
+
+        facets = ListingFacetsRead(
+            total=sum(counts["property_type"].values()),
+            property_types=values("property_type"),
+            listing_types=values("listing_type"),
+            cities=values("city", settings.listing_facets_top_cities),
+            price=histogram("price"),
+            area_sqm=histogram("area_sqm"),
+            rooms=histogram("rooms"),
+        )
+        listing_facets_cache.set(filters, facets, generation=generation)
+        return facets
+
+    async def get_map_clusters(
+        self, session: AsyncSession, filters: ListingFilters, *, zoom: int
+    ) -> ListingMapRead:
+        """Cluster the listings matching ``filters``, which must include a bounding box."""
+
+        self._validate_filters(filters)
+
+        # A web map tile spans 360 / 2**zoom degrees; clusters split it into a fixed grid,
+        # so low zooms aggregate whole regions and high zooms resolve single listings.
+        cell_size = 360 / (2**zoom * settings.listing_map_cells_per_tile)
+        limit = settings.listing_map_max_clusters
+        rows = await self.repository.map_clusters(session, filters, cell_size, limit + 1)
+
+        return ListingMapRead(
+            zoom=zoom,
+            cell_size=cell_size,
+            clusters=[
+                MapCluster(
+                    latitude=row.latitude,
+                    longitude=row.longitude,
+                    count=row.count,
+                    min_price=row.min_price,
+                    max_price=row.max_price,
+                    listing_id=row.listing_id if row.count == 1 else None,
+                )
+                for row in rows[:limit]
+            ],
+            truncated=len(rows) > limit,
         )
@@ -0,0 +1,161 @@
+import time
+import uuid
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, replace
+from datetime import datetime, timezone
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.user import UserRole
+from app.repositories.refresh_session_repository import RefreshSessionRepository
+
+
+@dataclass(frozen=True)
+class RefreshSessionData:
+    """What a refresh token stands for: enough to issue access tokens without the user row."""
+
+    user_id: uuid.UUID
+    role: UserRole
+    token_version: int
+    expires_at: datetime
+
+
+class SessionStore(ABC):
+    """Refresh sessions keyed by the SHA-256 digest of their refresh token.
+
+    Every method takes the request's database session so that implementations backed by
+    the database write within the request's transaction; others ignore it.
+    """
+
+    @abstractmethod
+    async def create(
+        self, session: AsyncSession, token_hash: str, data: RefreshSessionData
+    ) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def rotate(
+        self,
+        session: AsyncSession,
+        token_hash: str,
+        new_token_hash: str,
+        expires_at: datetime,
+    ) -> RefreshSessionData | None:
+        """Move an unexpired session to ``new_token_hash``; None when there is none."""
+
+        raise NotImplementedError
+
+    @abstractmethod
+    async def revoke(self, session: AsyncSession, token_hash: str) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def revoke_user(self, session: AsyncSession, user_id: uuid.UUID) -> None:
+        raise NotImplementedError
+
+
+class MemorySessionStore(SessionStore):
+    """Keeps sessions in the worker's memory.
+
+    Sessions are lost on restart and unknown to other workers, so this suits development
+    and single-worker deployments only.
+    """
+
+    purge_interval_seconds = 60
+
+    def __init__(self) -> None:
+        self._sessions: dict[str, RefreshSessionData] = {}
+        self._next_purge = 0.0
+
+    async def create(
+        self, session: AsyncSession, token_hash: str, data: RefreshSessionData
+    ) -> None:
+        self._purge_expired()
+        self._sessions[token_hash] = data
+
+    async def rotate(
+        self,
+        session: AsyncSession,
+        token_hash: str,
+        new_token_hash: str,
+        expires_at: datetime,
+    ) -> RefreshSessionData | None:
+        data = self._sessions.pop(token_hash, None)
+        if data is None or data.expires_at <= datetime.now(timezone.utc):
+            return None
+        rotated = replace(data, expires_at=expires_at)
+        self._sessions[new_token_hash] = rotated
+        return rotated
+
+    async def revoke(self, session: AsyncSession, token_hash: str) -> None:
+        self._sessions.pop(token_hash, None)
+
+    async def revoke_user(self, session: AsyncSession, user_id: uuid.UUID) -> None:
+        self._sessions = {
+            token_hash: data
+            for token_hash, data in self._sessions.items()
+            if data.user_id != user_id
+        }
+
+    def _purge_expired(self) -> None:
+        if time.monotonic() < self._next_purge:
+            return
+        self._next_purge = time.monotonic() + self.purge_interval_seconds
+        now = datetime.now(timezone.utc)
+        self._sessions = {
+            token_hash: data
+            for token_hash, data in self._sessions.items()
+            if data.expires_at > now
+        }
+
+
+class PostgresSessionStore(SessionStore):
+    """Keeps sessions in the ``refresh_sessions`` table, shared by every worker."""
+
+    def __init__(self, repository: RefreshSessionRepository | None = None) -> None:
+        self.repository = repository or RefreshSessionRepository()
+
+    async def create(
+        self, session: AsyncSession, token_hash: str, data: RefreshSessionData
+    ) -> None:
+        await self.repository.create(
+            session,
+            token_hash,
+            user_id=data.user_id,
+            role=data.role,
+            token_version=data.token_version,
+            expires_at=data.expires_at,
+        )
+
+    async def rotate(
+        self,
+        session: AsyncSession,
+        token_hash: str,
+        new_token_hash: str,
+        expires_at: datetime,
+    ) -> RefreshSessionData | None:
+        row = await self.repository.rotate(session, token_hash, new_token_hash, expires_at)
+        if row is None:
+            return None
+        return RefreshSessionData(
+            user_id=row.user_id,
+            role=row.role,
+            token_version=row.token_version,
+            expires_at=row.expires_at,
+        )
+
+    async def revoke(self, session: AsyncSession, token_hash: str) -> None:
+        await self.repository.delete(session, token_hash)
+
+    async def revoke_user(self, session: AsyncSession, user_id: uuid.UUID) -> None:
+        await self.repository.delete_for_user(session, user_id)
+
+
+memory_session_store = MemorySessionStore()
+
+
+def get_session_store() -> SessionStore:
+    if settings.refresh_session_store == "memory":
+        return memory_session_store
+    return PostgresSessionStore()
@@ -1,16 +1,26 @@
 import uuid
+from datetime import timedelta
 
 from fastapi import HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.security import get_password_hash
+from app.core.config import settings
+from app.core.security import password_hasher
+from app.db.session import run_after_commit
 from app.repositories.user_repository import UserRepository
 from app.schemas.user import UserCreate, UserRead, UserUpdate
+from app.services.auth_service import current_user_cache, token_versions
+from app.services.session_store import SessionStore, get_session_store
 
 
 class UserService:
-    def __init__(self, repository: UserRepository | None = None) -> None:
+    def __init__(
+        self,
+        repository: UserRepository | None = None,
+        session_store: SessionStore | None = None,
+    ) -> None:
         self.repository = repository or UserRepository()
+        self.session_store = session_store or get_session_store()
 
     async def create_user(self, session: AsyncSession, payload: UserCreate) -> UserRead:
         existing = await self.repository.get_by_email(session, payload.email)
@@ -20,7 +30,7 @@ class UserService:
                 detail="A user with this email already exists.",
             )
 
-        hashed_password = get_password_hash(payload.password)
+        hashed_password = await password_hasher.hash(payload.password)
         user = await self.repository.create(session, payload, hashed_password)
         return UserRead.model_validate(user)
 
@@ -56,8 +66,12 @@ class UserService:
                 )
 
         hashed_password = (
-            get_password_hash(payload.password) if payload.password is not None else None
+            await password_hasher.hash(payload.password) if payload.password is not None else None
         )
+        # A new role or password revokes the tokens issued before it.
+        revoke_tokens = (
+            payload.role is not None and payload.role != user.role
+        ) or hashed_password is not None
 
         updated_user = await self.repository.update(
             session,
@@ -66,7 +80,19 @@ class UserService:
             full_name=payload.full_name,
             role=payload.role,
             hashed_password=hashed_password,
+            bump_token_version=revoke_tokens,
         )
+        if revoke_tokens:
+            await self.session_store.revoke_user(session, user_id)
+        token_version = updated_user.token_version
+
+        def forget_principal() -> None:
+            # Role and email changes take effect on the user's next request; evicting
+            # before the commit would let a concurrent request cache the old row again.
+            current_user_cache.delete(user_id)
+            token_versions.set(user_id, token_version)
+
+        run_after_commit(session, forget_principal)
         return UserRead.model_validate(updated_user)
 
     async def delete_user(self, session: AsyncSession, user_id: uuid.UUID) -> None:
@@ -76,4 +102,16 @@ class UserService:
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="User not found.",
             )
-        await self.repository.delete(session, user)
+        await self.repository.delete(
+            session,
+            user,
+            tombstone_ttl=timedelta(minutes=settings.access_token_expire_minutes),
+        )
+        # The table's foreign key cascades; other stores need telling.
+        await self.session_store.revoke_user(session, user_id)
+
+        def forget_user() -> None:
+            current_user_cache.delete(user_id)
+            token_versions.delete(user_id)
+
+        run_after_commit(session, forget_user)
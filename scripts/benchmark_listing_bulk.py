@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import time
+
+import httpx
+from sqlalchemy import select
+
+from app.core.security import create_access_token
+from app.db.session import SessionLocal, engine
+from app.main import app
+from app.models.user import User, UserRole
+
+LISTINGS = "/api/v1/listings"
+
+
+def listing_payload(index: int) -> dict:
+    return {
+        "title": f"Synced listing {index}",
+        "description": "Imported from an agency feed",
+        "property_type": random.choice(["apartment", "house", "land", "office"]),
+        "listing_type": random.choice(["sale", "rent"]),
+        "price": random.randint(50, 5_000) * 100,
+        "currency": "EUR",
+        "city": random.choice(["Berlin", "Paris", "Lisbon", "Madrid"]),
+        "area_sqm": random.randint(20, 300),
+        "rooms": random.randint(1, 8),
+    }
+
+
+async def timed(label: str, count: int, operation) -> list[str]:
+    started = time.perf_counter()
+    result = await operation()
+    elapsed = time.perf_counter() - started
+    print(f"{label:<22} {elapsed * 1000:>10.1f} {count / elapsed:>12.0f}")
+    return result
+
+
+async def run(count: int) -> None:
+    async with SessionLocal() as session:
+        user = await session.scalar(select(User).where(User.role == UserRole.ADMIN).limit(1))
+    if user is None:
+        raise SystemExit("Register an admin user first")
+    headers = {"Authorization": f"Bearer {create_access_token(str(user.id), user.role)}"}
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://benchmark", headers=headers
+    ) as client:
+
+        async def single_creates() -> list[str]:
+            ids = []
+            for index in range(count):
+                response = await client.post(LISTINGS, json=listing_payload(index))
+                ids.append(response.raise_for_status().json()["id"])
+            return ids
+
+        async def bulk_create() -> list[str]:
+            payload = [listing_payload(index) for index in range(count)]
+            response = await client.post(f"{LISTINGS}/bulk", json=payload)
+            return [item["id"] for item in response.raise_for_status().json()["items"]]
+
+        async def single_updates(ids: list[str]) -> list[str]:
+            for listing_id in ids:
+                response = await client.patch(f"{LISTINGS}/{listing_id}", json={"price": 1234})
+                response.raise_for_status()
+            return ids
+
+        async def bulk_update(ids: list[str]) -> list[str]:
+            response = await client.patch(
+                f"{LISTINGS}/bulk", json=[{"id": listing_id, "price": 1234} for listing_id in ids]
+            )
+            response.raise_for_status()
+            return ids
+
+        async def single_deletes(ids: list[str]) -> list[str]:
+            for listing_id in ids:
+                (await client.delete(f"{LISTINGS}/{listing_id}")).raise_for_status()
+            return ids
+
+        async def bulk_delete(ids: list[str]) -> list[str]:
+            (await client.post(f"{LISTINGS}/bulk/delete", json={"ids": ids})).raise_for_status()
+            return ids
+
+        print(f"{count} listings per operation, in-process ASGI")
+        print(f"{'operation':<22} {'total ms':>10} {'listings/s':>12}")
+        single_ids = await timed("create, one by one", count, single_creates)
+        bulk_ids = await timed("create, bulk", count, bulk_create)
+        await timed("update, one by one", count, lambda: single_updates(single_ids))
+        await timed("update, bulk", count, lambda: bulk_update(bulk_ids))
+        await timed("delete, one by one", count, lambda: single_deletes(single_ids))
+        await timed("delete, bulk", count, lambda: bulk_delete(bulk_ids))
+
+    await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Compare per-listing write endpoints with the bulk listing endpoints"
+    )
+    parser.add_argument("--count", type=int, default=200, help="Listings per operation")
+    args = parser.parse_args()
+
+    asyncio.run(run(args.count))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Any
+
+import httpx
+from sqlalchemy import event, select
+
+from app.db.session import engine
+from app.main import app
+from app.models.listing import Listing
+from app.services.listing_service import listing_response_cache, listing_response_flights
+
+
+class PoolUsage:
+    """Counts statements and tracks the most connections checked out at once."""
+
+    def __init__(self) -> None:
+        self.statements = 0
+        self.peak_connections = 0
+
+    def __enter__(self) -> PoolUsage:
+        event.listen(engine.sync_engine, "before_cursor_execute", self._statement)
+        event.listen(engine.sync_engine.pool, "checkout", self._checkout)
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        event.remove(engine.sync_engine, "before_cursor_execute", self._statement)
+        event.remove(engine.sync_engine.pool, "checkout", self._checkout)
+
+    def _statement(self, *args: Any) -> None:
+        self.statements += 1
+
+    def _checkout(self, *args: Any) -> None:
+        self.peak_connections = max(self.peak_connections, engine.sync_engine.pool.checkedout())
+
+
+async def burst(client: httpx.AsyncClient, paths: list[str]) -> list[float]:
+    async def get(path: str) -> float:
+        started = time.perf_counter()
+        response = await client.get(path)
+        response.raise_for_status()
+        return (time.perf_counter() - started) * 1000
+
+    return await asyncio.gather(*(get(path) for path in paths))
+
+
+async def run(concurrency: int) -> None:
+    async with engine.connect() as connection:
+        ids = (
+            await connection.execute(select(Listing.id).limit(concurrency))
+        ).scalars().all()
+
+    cases = {
+        "same listing": [f"/api/v1/listings/{ids[0]}"] * concurrency,
+        "distinct listings": [f"/api/v1/listings/{listing_id}" for listing_id in ids],
+        "same search page": ["/api/v1/listings?city=berlin&page_size=50&count=exact"]
+        * concurrency,
+    }
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+        await burst(client, cases["same listing"][:3])
+        print(f"{concurrency} concurrent requests per case, empty response cache")
+        print(
+            f"{'case':<20} {'statements':>10} {'peak conns':>10} {'collapsed':>9} "
+            f"{'p50 ms':>8} {'max ms':>8}"
+        )
+        for name, paths in cases.items():
+            listing_response_cache.clear()
+            collapsed_before = listing_response_flights.collapsed
+            with PoolUsage() as usage:
+                timings = await burst(client, paths)
+            print(
+                f"{name:<20} {usage.statements:>10} {usage.peak_connections:>10} "
+                f"{listing_response_flights.collapsed - collapsed_before:>9} "
+                f"{statistics.median(timings):>8.1f} {max(timings):>8.1f}"
+            )
+
+    await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Fire concurrent cold requests for the same and for distinct listings and report "
+            "the statements, pooled connections and latency they cost"
+        )
+    )
+    parser.add_argument(
+        "--concurrency", type=int, default=200, help="Simultaneous requests per case"
+    )
+    args = parser.parse_args()
+
+    asyncio.run(run(args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
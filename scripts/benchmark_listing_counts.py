@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from app.db.session import SessionLocal, engine
+from app.schemas.listing import CountStrategy, ListingFilters, ListingSortField, SortOrder
+from app.services.listing_service import ListingService, listing_count_cache
+from scripts.seed_listings import seed_listings
+
+# A spread of filter combinations resembling real search traffic.
+QUERIES = [
+    {},
+    {"listing_type": "rent"},
+    {"property_type": "apartment", "listing_type": "sale"},
+    {"city": "ber"},
+    {"min_price": 100_000, "max_price": 500_000},
+    {"listing_type": "rent", "min_rooms": 2, "max_rooms": 4, "min_area": 50},
+]
+
+
+async def measure(strategy: CountStrategy, iterations: int) -> list[float]:
+    service = ListingService()
+    timings: list[float] = []
+    for _ in range(iterations):
+        for filters in QUERIES:
+            async with SessionLocal() as session:
+                started = time.perf_counter()
+                await service.list_listings(
+                    session,
+                    ListingFilters(**filters),
+                    page=3,
+                    page_size=20,
+                    sort_by=ListingSortField.CREATED_AT,
+                    sort_order=SortOrder.DESC,
+                    count_strategy=strategy,
+                )
+                timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+async def run(iterations: int, seed: int) -> None:
+    if seed:
+        async with engine.begin() as connection:
+            await seed_listings(connection, seed)
+
+    print(f"{'strategy':<10} {'mean ms':>9} {'p50 ms':>9} {'p95 ms':>9}")
+    for strategy in CountStrategy:
+        listing_count_cache.clear()
+        # One warm-up pass so every strategy starts with a primed pool and buffer cache.
+        await measure(strategy, 1)
+        timings = await measure(strategy, iterations)
+        p95 = statistics.quantiles(timings, n=20)[-1]
+        print(
+            f"{strategy.value:<10} {statistics.fmean(timings):>9.2f} "
+            f"{statistics.median(timings):>9.2f} {p95:>9.2f}"
+        )
+
+    await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Compare list latency for the exact, estimated and none count strategies"
+    )
+    parser.add_argument("--iterations", type=int, default=20, help="Passes over the query set")
+    parser.add_argument(
+        "--seed", type=int, default=0, help="Seed this many synthetic listings before measuring"
+    )
+    args = parser.parse_args()
+
+    asyncio.run(run(args.iterations, args.seed))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import time
+import tracemalloc
+from collections.abc import Awaitable, Callable
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.session import SessionLocal, engine
+from app.repositories.listing_repository import ListingRepository
+from app.schemas.listing import ListingFilters, ListingListRead, ListingRead
+from scripts.seed_listings import seed_listings
+
+repository = ListingRepository()
+
+
+def page_query(page: int, page_size: int) -> dict:
+    return dict(
+        filters=ListingFilters(),
+        page=page,
+        page_size=page_size,
+        sort_field="created_at",
+        sort_descending=True,
+    )
+
+
+async def orm_page(session: AsyncSession, page: int, page_size: int) -> bytes:
+    """ORM instances with select-in loaded images (two round trips), validated from attributes."""
+
+    listing_page = await repository.list(session, **page_query(page, page_size))
+    items = [ListingRead.model_validate(listing) for listing in listing_page.items]
+    return ListingListRead(
+        items=items, total=None, has_more=listing_page.has_more, page=page, page_size=page_size
+    ).model_dump_json().encode()
+
+
+async def record_page(session: AsyncSession, page: int, page_size: int) -> bytes:
+    """Core rows, images aggregated in the same statement, built without validation."""
+
+    listing_page = await repository.list_records(session, **page_query(page, page_size))
+    items = [ListingRead.from_record(row) for row in listing_page.items]
+    return ListingListRead(
+        items=items, total=None, has_more=listing_page.has_more, page=page, page_size=page_size
+    ).model_dump_json().encode()
+
+
+async def measure(
+    load: Callable[[AsyncSession, int, int], Awaitable[bytes]], pages: int, page_size: int
+) -> tuple[list[float], list[float]]:
+    """Return CPU and wall-clock milliseconds per page."""
+
+    cpu: list[float] = []
+    wall: list[float] = []
+    async with SessionLocal() as session:
+        for page in range(1, pages + 1):
+            started_cpu, started_wall = time.process_time(), time.perf_counter()
+            await load(session, page, page_size)
+            cpu.append((time.process_time() - started_cpu) * 1000)
+            wall.append((time.perf_counter() - started_wall) * 1000)
+            # Both paths start every page from an empty identity map.
+            session.expunge_all()
+    return cpu, wall
+
+
+async def measure_allocations(
+    load: Callable[[AsyncSession, int, int], Awaitable[bytes]], pages: int, page_size: int
+) -> list[float]:
+    """Return the peak traced KiB per page."""
+
+    peaks: list[float] = []
+    async with SessionLocal() as session:
+        for page in range(1, pages + 1):
+            tracemalloc.start()
+            await load(session, page, page_size)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            peaks.append(peak / 1024)
+            session.expunge_all()
+    return peaks
+
+
+async def run(pages: int, page_size: int, seed: int) -> None:
+    if seed:
+        async with engine.begin() as connection:
+            await seed_listings(connection, seed)
+
+    paths = {"orm": orm_page, "records": record_page}
+    print(f"{pages} pages of {page_size} listings with images, newest first")
+    print(
+        f"{'path':<8} {'cpu ms/page':>12} {'p95 cpu ms':>11} {'p50 wall ms':>12} "
+        f"{'peak KiB/page':>14}"
+    )
+    for name, load in paths.items():
+        # One warm-up pass so both paths start with a primed pool and statement cache.
+        await measure(load, 3, page_size)
+        cpu, wall = await measure(load, pages, page_size)
+        memory = await measure_allocations(load, min(pages, 20), page_size)
+        p95 = statistics.quantiles(cpu, n=20)[-1]
+        print(
+            f"{name:<8} {statistics.fmean(cpu):>12.2f} {p95:>11.2f} "
+            f"{statistics.median(wall):>12.2f} {statistics.fmean(memory):>14.1f}"
+        )
+
+    await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Compare per-page CPU time, latency and allocations of the ORM and ORM-free "
+            "listing read paths"
+        )
+    )
+    parser.add_argument("--pages", type=int, default=100, help="Pages loaded per path")
+    parser.add_argument("--page-size", type=int, default=100, help="Listings per page")
+    parser.add_argument(
+        "--seed", type=int, default=0, help="Seed this many synthetic listings before measuring"
+    )
+    args = parser.parse_args()
+
+    asyncio.run(run(args.pages, args.page_size, args.seed))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from collections.abc import Callable
+
+import httpx
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute, serialize_response
+from sqlalchemy import func, select
+
+from app.api.v1.listings import router as listings_router
+from app.core.responses import ModelResponse
+from app.core.security import create_access_token
+from app.db.session import SessionLocal, engine
+from app.main import app
+from app.models.listing import Listing
+from app.models.user import User
+from app.schemas.listing import (
+    CountStrategy,
+    ListingFilters,
+    ListingListRead,
+    ListingSortField,
+    SortOrder,
+)
+from app.services.listing_service import ListingService, listing_response_cache
+
+PAGES = 5
+
+
+def list_route() -> APIRoute:
+    return next(
+        route
+        for route in listings_router.routes
+        if isinstance(route, APIRoute) and route.path == "/listings/me"
+    )
+
+
+async def response_model_encode(response: ListingListRead) -> bytes:
+    """What FastAPI does with a returned model: validate it against response_model, then
+    encode the result with the default JSONResponse."""
+
+    content = await serialize_response(
+        field=list_route().response_field, response_content=response
+    )
+    return JSONResponse(content).body
+
+
+async def model_response_encode(response: ListingListRead) -> bytes:
+    return ModelResponse(response).body
+
+
+async def encode_rate(
+    encode: Callable[[ListingListRead], object], response: ListingListRead, seconds: float
+) -> float:
+    done = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        await encode(response)
+        done += 1
+    return done / seconds
+
+
+async def request_rate(
+    client: httpx.AsyncClient, path: str, headers: dict[str, str], page_size: int, requests: int
+) -> tuple[float, float]:
+    """Return requests per second and the p50 latency in milliseconds."""
+
+    timings: list[float] = []
+    started = time.perf_counter()
+    for request in range(requests):
+        params = {"page": request % PAGES + 1, "page_size": page_size, "count": "none"}
+        # Measure the uncached path; anonymous pages would otherwise come from the cache.
+        listing_response_cache.clear()
+        request_started = time.perf_counter()
+        response = await client.get(path, params=params, headers=headers)
+        timings.append((time.perf_counter() - request_started) * 1000)
+        response.raise_for_status()
+    return requests / (time.perf_counter() - started), statistics.median(timings)
+
+
+async def run(page_size: int, requests: int, seconds: float) -> None:
+    async with SessionLocal() as session:
+        response = await ListingService().list_listings(
+            session,
+            ListingFilters(),
+            page=1,
+            page_size=page_size,
+            sort_by=ListingSortField.CREATED_AT,
+            sort_order=SortOrder.DESC,
+            count_strategy=CountStrategy.NONE,
+        )
+        # The user owning the most listings, so /listings/me has full pages.
+        owner_id = await session.scalar(
+            select(Listing.user_id)
+            .group_by(Listing.user_id)
+            .order_by(func.count().desc())
+            .limit(1)
+        )
+        owner = await session.get(User, owner_id)
+
+    body = await model_response_encode(response)
+    assert json.loads(body) == json.loads(await response_model_encode(response))
+    print(f"encoding one page of {len(response.items)} listings ({len(body) / 1024:.0f} KiB)")
+    print(f"{'encoder':<16} {'pages/s':>9}")
+    for name, encode in (
+        ("response_model", response_model_encode),
+        ("ModelResponse", model_response_encode),
+    ):
+        await encode_rate(encode, response, 0.2)
+        print(f"{name:<16} {await encode_rate(encode, response, seconds):>9.0f}")
+
+    token = create_access_token(str(owner.id), owner.role)
+    cases = {
+        "GET /listings": ("/api/v1/listings", {}),
+        "GET /listings/me": ("/api/v1/listings/me", {"Authorization": f"Bearer {token}"}),
+    }
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+        print(f"\n{requests} sequential requests, page_size={page_size}, in-process ASGI")
+        print(f"{'endpoint':<18} {'req/s':>8} {'p50 ms':>8}")
+        for name, (path, headers) in cases.items():
+            await request_rate(client, path, headers, page_size, 3)
+            rate, p50 = await request_rate(client, path, headers, page_size, requests)
+            print(f"{name:<18} {rate:>8.1f} {p50:>8.2f}")
+
+    await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Measure listing response encoding and end-to-end throughput of the listing "
+            "endpoints for large pages"
+        )
+    )
+    parser.add_argument("--page-size", type=int, default=100, help="Listings per page")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per endpoint")
+    parser.add_argument(
+        "--seconds", type=float, default=2.0, help="Duration of each encoding measurement"
+    )
+    args = parser.parse_args()
+
+    asyncio.run(run(args.page_size, args.requests, args.seconds))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import time
+from collections.abc import Awaitable, Callable
+
+from sqlalchemy import func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.session import SessionLocal, engine
+from app.models.listing import Listing
+from app.schemas.listing import CountStrategy, ListingFilters, ListingSortField, SortOrder
+from app.services.listing_service import ListingService
+from scripts.seed_listings import seed_listings
+
+# Search terms of increasing selectivity, matching the seeded vocabulary.
+TERMS = ["sauna", "river view", "garden balcony", "penthouse sea view", "elevator"]
+
+
+async def like_search(session: AsyncSession, term: str) -> None:
+    """The previous workaround: substring matching over title and description."""
+
+    pattern = f"%{term}%"
+    condition = or_(Listing.title.ilike(pattern), Listing.description.ilike(pattern))
+    await session.execute(
+        select(Listing)
+        .where(condition)
+        .order_by(Listing.created_at.desc(), Listing.id.desc())
+        .limit(21)
+    )
+    await session.scalar(select(func.count()).select_from(Listing).where(condition))
+
+
+def full_text_search(sort_by: ListingSortField) -> Callable[[AsyncSession, str], Awaitable[None]]:
+    service = ListingService()
+
+    async def search(session: AsyncSession, term: str) -> None:
+        await service.list_listings(
+            session,
+            ListingFilters(q=term),
+            page=1,
+            page_size=20,
+            sort_by=sort_by,
+            sort_order=SortOrder.DESC,
+            count_strategy=CountStrategy.EXACT,
+        )
+
+    return search
+
+
+async def measure(
+    search: Callable[[AsyncSession, str], Awaitable[None]], iterations: int
+) -> list[float]:
+    timings: list[float] = []
+    for _ in range(iterations):
+        for term in TERMS:
+            async with SessionLocal() as session:
+                started = time.perf_counter()
+                await search(session, term)
+                timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+async def run(iterations: int, seed: int) -> None:
+    if seed:
+        async with engine.begin() as connection:
+            await seed_listings(connection, seed)
+
+    async with engine.connect() as connection:
+        rows = await connection.scalar(select(func.count()).select_from(Listing))
+    print(f"{rows} listings, {len(TERMS)} terms x {iterations} iterations, page + exact total")
+
+    cases = {
+        "ilike": like_search,
+        "q newest": full_text_search(ListingSortField.CREATED_AT),
+        "q relevance": full_text_search(ListingSortField.RELEVANCE),
+    }
+    print(f"{'search':<12} {'mean ms':>9} {'p50 ms':>9} {'p95 ms':>9}")
+    for name, search in cases.items():
+        # One warm-up pass so every case starts with a primed pool and buffer cache.
+        await measure(search, 1)
+        timings = await measure(search, iterations)
+        p95 = statistics.quantiles(timings, n=20)[-1]
+        print(
+            f"{name:<12} {statistics.fmean(timings):>9.2f} "
+            f"{statistics.median(timings):>9.2f} {p95:>9.2f}"
+        )
+
+    await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Compare full-text listing search against ILIKE matching on title/description"
+    )
+    parser.add_argument("--iterations", type=int, default=10, help="Passes over the search terms")
+    parser.add_argument(
+        "--seed", type=int, default=0, help="Seed this many synthetic listings before measuring"
+    )
+    args = parser.parse_args()
+
+    asyncio.run(run(args.iterations, args.seed))
+
+
+if __name__ == "__main__":
+    main()
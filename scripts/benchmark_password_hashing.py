@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+from collections.abc import Awaitable, Callable
+
+import httpx
+from sqlalchemy import delete
+
+from app.core.security import (
+    PasswordHasher,
+    get_password_hash,
+    password_hasher,
+    verify_password,
+)
+from app.db.session import engine
+from app.main import app
+from app.models.user import User
+
+API = "/api/v1"
+PASSWORD = "benchmark-password"
+
+
+async def measure_lag(work: Callable[[], Awaitable[object]], interval: float) -> list[float]:
+    """Run ``work`` while a ticker records, in ms, how late each of its wake-ups was."""
+
+    lags: list[float] = []
+    done = asyncio.Event()
+
+    async def ticker() -> None:
+        while not done.is_set():
+            expected = time.perf_counter() + interval
+            await asyncio.sleep(interval)
+            lags.append(max(0.0, time.perf_counter() - expected) * 1000)
+
+    task = asyncio.create_task(ticker())
+    try:
+        await work()
+    finally:
+        done.set()
+        await task
+    return lags
+
+
+def report(name: str, lags: list[float], elapsed: float, rejected: int) -> None:
+    if len(lags) > 1:
+        quantiles = statistics.quantiles(lags, n=100, method="inclusive")
+    else:
+        quantiles = lags * 99
+    print(
+        f"{name:<22} {elapsed:>9.2f} {statistics.median(lags):>8.1f} {quantiles[98]:>8.1f} "
+        f"{max(lags):>8.1f} {rejected:>8}"
+    )
+
+
+async def run(logins: int, workers: int, max_queue: int, interval: float) -> None:
+    hashed = get_password_hash(PASSWORD)
+    hasher = PasswordHasher(max_workers=workers, max_queue=max_queue)
+    print(f"{logins} concurrent password checks, event loop probed every {interval * 1000:.0f} ms")
+    print(
+        f"{'case':<22} {'seconds':>9} {'p50 lag':>8} {'p99 lag':>8} {'max lag':>8} "
+        f"{'rejected':>8}"
+    )
+
+    async def inline() -> None:
+        async def check() -> None:
+            # The previous behaviour: bcrypt called straight from the coroutine.
+            verify_password(PASSWORD, hashed)
+            await asyncio.sleep(0)
+
+        await asyncio.gather(*(check() for _ in range(logins)))
+
+    async def executor() -> None:
+        await asyncio.gather(
+            *(hasher.verify(PASSWORD, hashed) for _ in range(logins)), return_exceptions=True
+        )
+
+    for name, work, counter in (("inline", inline, None), ("executor", executor, hasher)):
+        rejected_before = counter.rejected if counter else 0
+        started = time.perf_counter()
+        lags = await measure_lag(work, interval)
+        rejected = counter.rejected - rejected_before if counter else 0
+        report(name, lags, time.perf_counter() - started, rejected)
+
+    # The same storm against POST /auth/login, through the application's own hasher.
+    email = f"password-benchmark-{uuid.uuid4().hex[:8]}@example.com"
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+        (
+            await client.post(f"{API}/auth/register", json={"email": email, "password": PASSWORD})
+        ).raise_for_status()
+        statuses: list[int] = []
+
+        async def login_storm() -> None:
+            async def login() -> None:
+                response = await client.post(
+                    f"{API}/auth/login", json={"email": email, "password": PASSWORD}
+                )
+                statuses.append(response.status_code)
+
+            await asyncio.gather(*(login() for _ in range(logins)))
+
+        try:
+            rejected_before = password_hasher.rejected
+            started = time.perf_counter()
+            lags = await measure_lag(login_storm, interval)
+            report(
+                "POST /auth/login",
+                lags,
+                time.perf_counter() - started,
+                password_hasher.rejected - rejected_before,
+            )
+            print(
+                "login responses: "
+                + ", ".join(f"{code}={statuses.count(code)}" for code in sorted(set(statuses)))
+                + f" (PASSWORD_HASH_WORKERS={password_hasher.max_workers}, "
+                f"PASSWORD_HASH_MAX_QUEUE={password_hasher.max_queue})"
+            )
+        finally:
+            async with engine.begin() as connection:
+                await connection.execute(delete(User).where(User.email == email))
+
+    await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Measure event-loop lag while a storm of password checks runs inline, on the "
+            "password-hashing executor and through POST /auth/login"
+        )
+    )
+    parser.add_argument("--logins", type=int, default=40, help="Concurrent password checks")
+    parser.add_argument("--workers", type=int, default=4, help="Executor threads")
+    parser.add_argument(
+        "--max-queue", type=int, default=64, help="Checks allowed to wait for a thread"
+    )
+    parser.add_argument(
+        "--interval", type=float, default=0.01, help="Seconds between event-loop probes"
+    )
+    args = parser.parse_args()
+
+    asyncio.run(run(args.logins, args.workers, args.max_queue, args.interval))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import argparse
+import base64
+import json
+import sys
+import uuid
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Any
+
+from app.core.pagination import Cursor, InvalidCursorError, decode_cursor, encode_cursor
+from app.services.listing_service import CURSOR_VALUE_TYPES
+
+# Values each sort field issues cursors for; they must decode to themselves.
+VALID_VALUES: dict[str, Any] = {
+    "created_at": datetime(2024, 10, 1, 12, 30, tzinfo=timezone.utc),
+    "price": Decimal("1250.00"),
+    "area_sqm": 85,
+    "rooms": 3,
+    "relevance": 0.0759,
+}
+
+# Tampered cursor values every sort field must reject with InvalidCursorError (a 400)
+# rather than let through to the query or fail with another exception (a 500).
+TAMPERED_VALUES: list[Any] = [
+    None,
+    True,
+    "text",
+    [1],
+    {},
+    10**400,
+    -(10**400),
+    2**40,
+    1e308,
+    {"dt": "2024-10-01T12:30:00"},
+    {"dt": "9999-12-31T23:59:59-14:00"},
+    {"dt": "not a timestamp"},
+    {"dec": "abc"},
+    {"dec": "NaN"},
+    {"dec": "Infinity"},
+    {"dec": "1e999999"},
+    {"dec": 5},
+]
+
+# Numbers among them that are in range for the float-valued relevance rank.
+ACCEPTED = {("relevance", 2**40), ("relevance", 1e308)}
+
+
+def raw_cursor(payload: Any) -> str:
+    raw = json.dumps(payload).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def check(name: str, token: str, accept: bool, verbose: bool) -> bool:
+    try:
+        decode_cursor(token, CURSOR_VALUE_TYPES)
+    except InvalidCursorError:
+        outcome = "rejected"
+    except Exception as exc:  # Anything else would surface as a 500.
+        outcome = f"crashed ({type(exc).__name__}: {exc})"
+    else:
+        outcome = "accepted"
+    ok = outcome == ("accepted" if accept else "rejected")
+    if verbose or not ok:
+        print(f"{'ok' if ok else 'FAIL':<4} {name}: {outcome}")
+    return ok
+
+
+def run(verbose: bool) -> int:
+    listing_id = uuid.uuid4()
+    failures = checked = 0
+    for field in CURSOR_VALUE_TYPES:
+        cursor = Cursor(field, descending=True, value=VALID_VALUES[field], id=listing_id)
+        decoded = decode_cursor(encode_cursor(cursor), CURSOR_VALUE_TYPES)
+        checked += 1
+        if decoded != cursor:
+            failures += 1
+            print(f"FAIL {field}: round trip returned {decoded!r}")
+
+        payload = {"f": field, "d": True, "id": str(listing_id), "b": False}
+        for value in TAMPERED_VALUES:
+            accept = isinstance(value, (int, float)) and (field, value) in ACCEPTED
+            token = raw_cursor({**payload, "v": value})
+            checked += 1
+            if not check(f"{field} v={value!r:.40}", token, accept, verbose):
+                failures += 1
+
+    payload = {"f": "rooms", "d": True, "v": 1, "id": str(listing_id)}
+    for name, token in (
+        ("unknown sort field", raw_cursor({**payload, "f": "bogus"})),
+        ("bad id", raw_cursor({**payload, "id": "x"})),
+        ("not an object", raw_cursor([1, 2])),
+        ("not base64", "***"),
+    ):
+        checked += 1
+        if not check(name, token, False, verbose):
+            failures += 1
+
+    print(f"{checked} cursors checked, {failures} failing")
+    return 1 if failures else 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Decode valid and tampered pagination cursors and fail when a tampered one is "
+            "accepted or raises anything but InvalidCursorError"
+        )
+    )
+    parser.add_argument("--verbose", action="store_true", help="Print every checked cursor")
+    args = parser.parse_args()
+
+    sys.exit(run(args.verbose))
+
+
+if __name__ == "__main__":
+    main()
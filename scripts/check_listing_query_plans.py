@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import itertools
+import sys
+from collections.abc import Iterator
+from typing import Any
+
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.core.pagination import Cursor
+from app.db.session import engine
+from app.models.listing import Listing
+from app.models.listing_image import ListingImage
+from app.repositories.listing_repository import ListingRepository
+from app.schemas.listing import ListingFilters, ListingSortField
+from scripts.seed_listings import seed_listings
+
+# Filter combinations the frontend and crawlers actually send.
+FILTER_CASES: dict[str, dict[str, Any]] = {
+    "no filters": {},
+    "owner": {"user_id": None},  # filled in with a seeded owner
+    "listing type": {"listing_type": "rent"},
+    "listing + property type": {"listing_type": "sale", "property_type": "apartment"},
+    "city contains": {"city": "erli"},
+    "city prefix": {"city": "ber", "city_match": "prefix"},
+    "city exact": {"city": "berlin", "city_match": "exact"},
+    "price range": {"min_price": 100_000, "max_price": 300_000},
+    "rent price range": {"listing_type": "rent", "min_price": 500, "max_price": 400_000},
+    "area range": {"min_area": 60, "max_area": 120},
+    "rooms range": {"min_rooms": 2, "max_rooms": 4},
+    "bounding box": {"min_lat": 52.4, "max_lat": 52.6, "min_lng": 13.2, "max_lng": 13.6},
+    "radius": {"lat": 48.137, "lng": 11.575, "radius_km": 5},
+    "full text": {"q": "sauna"},
+    "full text + listing type": {"q": "garden balcony", "listing_type": "rent"},
+}
+
+SCANNED_TABLES = {Listing.__tablename__, ListingImage.__tablename__}
+
+
+def plan_nodes(plan: dict[str, Any]) -> Iterator[dict[str, Any]]:
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from plan_nodes(child)
+
+
+async def explain(connection: AsyncConnection, statement: Any) -> dict[str, Any]:
+    compiled = statement.compile(
+        dialect=connection.dialect, compile_kwargs={"literal_binds": True}
+    )
+    result = await connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}")
+    return result.scalar_one()[0]["Plan"]
+
+
+def seq_scans(plan: dict[str, Any]) -> list[str]:
+    return [
+        node["Relation Name"]
+        for node in plan_nodes(plan)
+        if node["Node Type"] == "Seq Scan" and node.get("Relation Name") in SCANNED_TABLES
+    ]
+
+
+async def ensure_seeded(connection: AsyncConnection, rows: int) -> None:
+    existing = await connection.scalar(select(func.count()).select_from(Listing))
+    if existing < rows:
+        print(f"Seeding {rows - existing} listings ...")
+        await seed_listings(connection, rows - existing)
+
+
+async def run(rows: int) -> int:
+    repository = ListingRepository()
+    async with engine.begin() as connection:
+        await ensure_seeded(connection, rows)
+        await connection.execute(text("ANALYZE listings"))
+        await connection.execute(text("ANALYZE listing_images"))
+        sample = (
+            await connection.execute(
+                select(Listing.id, Listing.user_id, Listing.created_at, Listing.price,
+                       Listing.area_sqm, Listing.rooms).limit(1)
+            )
+        ).one()
+        FILTER_CASES["owner"]["user_id"] = sample.user_id
+
+        failures = 0
+        checked = 0
+        cases = itertools.product(
+            ListingSortField, (True, False), FILTER_CASES.items(), (False, True)
+        )
+        for sort_field, descending, (case_name, filter_values), use_cursor in cases:
+            relevance = sort_field == ListingSortField.RELEVANCE
+            if relevance and "q" not in filter_values:
+                continue
+            cursor = None
+            if use_cursor:
+                cursor = Cursor(
+                    sort_field=sort_field.value,
+                    descending=descending,
+                    value=0.1 if relevance else getattr(sample, sort_field.value),
+                    id=sample.id,
+                )
+            query = repository.build_list_query(
+                filters=ListingFilters(**filter_values),
+                page=1,
+                page_size=20,
+                sort_field=sort_field.value,
+                sort_descending=descending,
+                cursor=cursor,
+            )
+            plan = await explain(connection, query)
+            checked += 1
+            scans = seq_scans(plan)
+            if scans:
+                failures += 1
+                mode = "cursor" if use_cursor else "offset"
+                order = "desc" if descending else "asc"
+                print(
+                    f"SEQ SCAN on {', '.join(scans)}: sort={sort_field.value} {order} "
+                    f"filters={case_name} mode={mode}"
+                )
+
+        ids = (await connection.execute(select(Listing.id).limit(20))).scalars().all()
+        images_plan = await explain(
+            connection, select(ListingImage).where(ListingImage.listing_id.in_(ids))
+        )
+        checked += 1
+        if seq_scans(images_plan):
+            failures += 1
+            print("SEQ SCAN on listing_images while loading images for a page")
+
+    await engine.dispose()
+    print(f"{checked} plans checked, {failures} falling back to sequential scans")
+    return 1 if failures else 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=(
+            "EXPLAIN every listing sort/filter combination against a seeded database and "
+            "fail when a plan falls back to a sequential scan"
+        )
+    )
+    parser.add_argument(
+        "--rows",
+        type=int,
+        default=200_000,
+        help="Minimum number of listings; missing rows are seeded before checking",
+    )
+    args = parser.parse_args()
+
+    sys.exit(asyncio.run(run(args.rows)))
+
+
+if __name__ == "__main__":
+    main()
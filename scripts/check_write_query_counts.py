@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+import uuid
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Any
+
+import httpx
+from fastapi import UploadFile
+from sqlalchemy import delete, event
+
+from app.api.v1.listings import get_listing_service
+from app.core.security import create_access_token
+from app.db.session import engine
+from app.main import app
+from app.models.user import User, UserRole
+from app.services.listing_service import ListingService
+from app.services.storage_service import StorageService
+
+API = "/api/v1"
+
+# Statements each write endpoint may issue, with the current user's principal already
+# cached. Update these deliberately when a change adds or removes queries.
+EXPECTED_STATEMENTS = {
+    "POST /auth/register": 2,
+    "PATCH /users/{user_id}": 2,
+    "POST /listings": 1,
+    "PATCH /listings/{listing_id}": 1,
+    "POST /listings/{listing_id}/images": 2,
+    "DELETE /listings/{listing_id}": 1,
+}
+
+LISTING = {
+    "title": "Query count check",
+    "property_type": "apartment",
+    "listing_type": "rent",
+    "price": 1200,
+    "currency": "EUR",
+    "city": "Berlin",
+    "area_sqm": 60,
+    "rooms": 2,
+}
+
+
+class StaticStorageService(StorageService):
+    """Stores nothing; the check only cares about the database side of an upload."""
+
+    async def upload_listing_image(self, file: UploadFile, listing_id: uuid.UUID) -> str:
+        return f"https://storage.example.com/{listing_id}/{file.filename}"
+
+
+@contextmanager
+def recorded_statements() -> Iterator[list[str]]:
+    statements: list[str] = []
+
+    def record(conn: Any, cursor: Any, statement: str, *args: Any) -> None:
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", record)
+
+
+async def run(verbose: bool) -> int:
+    app.dependency_overrides[get_listing_service] = lambda: ListingService(
+        storage_service=StaticStorageService()
+    )
+    suffix = uuid.uuid4().hex[:8]
+    counts: dict[str, list[str]] = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://check") as client:
+
+        async def call(name: str, method: str, path: str, **kwargs: Any) -> httpx.Response:
+            with recorded_statements() as statements:
+                response = await client.request(method, f"{API}{path}", **kwargs)
+            response.raise_for_status()
+            counts[name] = statements
+            return response
+
+        def auth(user: dict[str, Any]) -> dict[str, str]:
+            token = create_access_token(user["id"], UserRole(user["role"]))
+            return {"Authorization": f"Bearer {token}"}
+
+        admin = (
+            await client.post(
+                f"{API}/auth/register",
+                json={
+                    "email": f"check-admin-{suffix}@example.com",
+                    "password": "check-password",
+                    "role": "admin",
+                },
+            )
+        ).raise_for_status().json()
+        user = (
+            await call(
+                "POST /auth/register",
+                "POST",
+                "/auth/register",
+                json={"email": f"check-user-{suffix}@example.com", "password": "check-password"},
+            )
+        ).json()
+        try:
+            # Resolve the principals once, as any earlier request would have; updating the
+            # user evicts theirs again.
+            (await client.get(f"{API}/auth/me", headers=auth(admin))).raise_for_status()
+            await call(
+                "PATCH /users/{user_id}",
+                "PATCH",
+                f"/users/{user['id']}",
+                json={"full_name": "Query Count"},
+                headers=auth(admin),
+            )
+            (await client.get(f"{API}/auth/me", headers=auth(user))).raise_for_status()
+            listing = (
+                await call("POST /listings", "POST", "/listings", json=LISTING, headers=auth(user))
+            ).json()
+            await call(
+                "PATCH /listings/{listing_id}",
+                "PATCH",
+                f"/listings/{listing['id']}",
+                json={"price": 1300},
+                headers=auth(user),
+            )
+            await call(
+                "POST /listings/{listing_id}/images",
+                "POST",
+                f"/listings/{listing['id']}/images",
+                files={"file": ("front.jpg", b"\xff\xd8\xff", "image/jpeg")},
+                headers=auth(user),
+            )
+            await call(
+                "DELETE /listings/{listing_id}",
+                "DELETE",
+                f"/listings/{listing['id']}",
+                headers=auth(user),
+            )
+        finally:
+            async with engine.begin() as connection:
+                await connection.execute(
+                    delete(User).where(User.id.in_([admin["id"], user["id"]]))
+                )
+
+    await engine.dispose()
+
+    failures = 0
+    print(f"{'endpoint':<36} {'statements':>10} {'expected':>9}")
+    for name, expected in EXPECTED_STATEMENTS.items():
+        statements = counts[name]
+        failed = len(statements) != expected
+        failures += failed
+        print(f"{name:<36} {len(statements):>10} {expected:>9}{'  MISMATCH' if failed else ''}")
+        if failed or verbose:
+            for statement in statements:
+                print(f"    {' '.join(statement.split())[:160]}")
+    return 1 if failures else 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Count the SQL statements each write endpoint issues and fail when a count "
+            "differs from the expected one"
+        )
+    )
+    parser.add_argument(
+        "--verbose", action="store_true", help="Print the statements of every endpoint"
+    )
+    args = parser.parse_args()
+
+    sys.exit(asyncio.run(run(args.verbose)))
+
+
+if __name__ == "__main__":
+    main()
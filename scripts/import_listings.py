@@ -0,0 +1,414 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import csv
+import json
+import time
+import uuid
+from collections.abc import Iterator
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from decimal import Decimal
+from pathlib import Path
+from typing import Annotated, Any
+
+from pydantic import Field, ValidationError
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.db.session import engine
+from app.schemas.listing import ListingCreate
+
+# Columns of the staging table, in COPY order.
+STAGING_COLUMNS = (
+    "line",
+    "id",
+    "title",
+    "description",
+    "property_type",
+    "listing_type",
+    "price",
+    "currency",
+    "city",
+    "area_sqm",
+    "rooms",
+    "latitude",
+    "longitude",
+    "image_urls",
+)
+LISTING_COLUMNS = STAGING_COLUMNS[2:-1]
+
+CREATE_STAGING_SQL = text(
+    """
+    CREATE TEMP TABLE listing_import (
+        line bigint NOT NULL,
+        id uuid NOT NULL,
+        title text NOT NULL,
+        description text,
+        property_type text NOT NULL,
+        listing_type text NOT NULL,
+        price numeric(12, 2) NOT NULL,
+        currency text NOT NULL,
+        city text NOT NULL,
+        area_sqm integer NOT NULL,
+        rooms integer NOT NULL,
+        latitude float8,
+        longitude float8,
+        image_urls text[]
+    ) ON COMMIT DROP
+    """
+)
+
+# A feed may list the same listing more than once; its last row wins. ON CONFLICT
+# cannot touch the same row twice in one statement, so duplicates go first.
+DEDUPLICATE_SQL = text(
+    """
+    CREATE TEMP TABLE listing_import_rows ON COMMIT DROP AS
+    SELECT DISTINCT ON (id) * FROM listing_import ORDER BY id, line DESC
+    """
+)
+
+# Existing listings are only updated when they belong to the importing owner and
+# something changed, so unchanged rows of a nightly feed cost no writes (and keep
+# their updated_at).
+UPSERT_SQL = text(
+    f"""
+    WITH upserted AS (
+        INSERT INTO listings (id, user_id, {", ".join(LISTING_COLUMNS)})
+        SELECT
+            id, :owner_id, title, description,
+            property_type::property_type_enum, listing_type::listing_type_enum,
+            price, currency, city, area_sqm, rooms, latitude, longitude
+        FROM listing_import_rows
+        ON CONFLICT (id) DO UPDATE SET
+            {", ".join(f"{name} = excluded.{name}" for name in LISTING_COLUMNS)},
+            updated_at = now()
+        WHERE listings.user_id = excluded.user_id
+            AND ({", ".join(f"listings.{name}" for name in LISTING_COLUMNS)})
+                IS DISTINCT FROM ({", ".join(f"excluded.{name}" for name in LISTING_COLUMNS)})
+        RETURNING xmax = 0 AS inserted
+    )
+    SELECT count(*) FILTER (WHERE inserted), count(*) FILTER (WHERE NOT inserted)
+    FROM upserted
+    """
+)
+
+# Rows that carry images replace the listing's image set: URLs missing from the feed
+# are removed, new ones are added and images already stored are left alone.
+DELETE_IMAGES_SQL = text(
+    """
+    DELETE FROM listing_images
+    USING listing_import_rows AS feed, listings
+    WHERE listing_images.listing_id = feed.id
+        AND feed.image_urls IS NOT NULL
+        AND listings.id = feed.id
+        AND listings.user_id = :owner_id
+        AND listing_images.url <> ALL (feed.image_urls)
+    """
+)
+
+INSERT_IMAGES_SQL = text(
+    """
+    INSERT INTO listing_images (id, listing_id, url, created_at)
+    SELECT
+        gen_random_uuid(),
+        feed.id,
+        image.url,
+        -- Images are read oldest first; spacing them keeps the feed's order.
+        now() + image.position * interval '1 microsecond'
+    FROM listing_import_rows AS feed
+    JOIN listings ON listings.id = feed.id AND listings.user_id = :owner_id
+    CROSS JOIN LATERAL unnest(feed.image_urls) WITH ORDINALITY AS image(url, position)
+    WHERE NOT EXISTS (
+        SELECT 1 FROM listing_images
+        WHERE listing_images.listing_id = feed.id AND listing_images.url = image.url
+    )
+    """
+)
+
+
+class ListingFeedRow(ListingCreate):
+    """A feed row: a listing plus the optional identifier and images it is upserted with."""
+
+    id: uuid.UUID | None = None
+    # None leaves the listing's images untouched, a list replaces them.
+    image_urls: list[Annotated[str, Field(min_length=1, max_length=1024)]] | None = None
+
+
+@dataclass
+class ValidatedBatch:
+    records: list[tuple[Any, ...]]
+    errors: list[tuple[int, str]]
+
+
+@dataclass
+class ImportStats:
+    read: int = 0
+    invalid: int = 0
+    errors: list[tuple[int, str]] = field(default_factory=list)
+
+
+def validate_batch(rows: list[tuple[int, dict[str, Any] | str]]) -> ValidatedBatch:
+    """Validate raw feed rows into staging records. Runs in the worker processes.
+
+    Rows the reader could not parse arrive as their error message.
+    """
+
+    records: list[tuple[Any, ...]] = []
+    errors: list[tuple[int, str]] = []
+    for line, raw in rows:
+        if isinstance(raw, str):
+            errors.append((line, raw))
+            continue
+        try:
+            row = ListingFeedRow.model_validate(raw)
+        except ValidationError as exc:
+            messages = (
+                f"{'.'.join(map(str, error['loc'])) or 'row'}: {error['msg']}"
+                for error in exc.errors(include_url=False, include_context=False)
+            )
+            errors.append((line, "; ".join(messages)))
+            continue
+        records.append(
+            (
+                line,
+                row.id or uuid.uuid4(),
+                row.title,
+                row.description,
+                row.property_type,
+                row.listing_type,
+                # Through str so the value stored is the one the feed spelled out.
+                Decimal(str(row.price)),
+                row.currency,
+                row.city,
+                row.area_sqm,
+                row.rooms,
+                row.latitude,
+                row.longitude,
+                row.image_urls,
+            )
+        )
+    return ValidatedBatch(records, errors)
+
+
+def read_csv(path: Path) -> Iterator[tuple[int, dict[str, Any] | str]]:
+    with path.open(newline="", encoding="utf-8") as feed:
+        reader = csv.DictReader(feed)
+        for row in reader:
+            # CSV has no null; empty cells are missing values.
+            values: dict[str, Any] = {
+                name: value for name, value in row.items() if name and value != ""
+            }
+            if "image_urls" in row:
+                values["image_urls"] = (row["image_urls"] or "").split()
+            yield reader.line_num, values
+
+
+def read_ndjson(path: Path) -> Iterator[tuple[int, dict[str, Any] | str]]:
+    with path.open(encoding="utf-8") as feed:
+        for line, content in enumerate(feed, start=1):
+            if not content.strip():
+                continue
+            try:
+                values = json.loads(content)
+            except json.JSONDecodeError as exc:
+                yield line, f"invalid JSON: {exc}"
+                continue
+            if not isinstance(values, dict):
+                yield line, "expected a JSON object"
+                continue
+            # Accept our own export format, where images are objects with a url.
+            if "images" in values and "image_urls" not in values:
+                images = values.pop("images")
+                if isinstance(images, list):
+                    values["image_urls"] = [
+                        image.get("url") if isinstance(image, dict) else image for image in images
+                    ]
+            yield line, values
+
+
+def batches(
+    rows: Iterator[tuple[int, dict[str, Any] | str]], size: int
+) -> Iterator[list[tuple[int, dict[str, Any] | str]]]:
+    batch: list[tuple[int, dict[str, Any] | str]] = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+async def load_staging(
+    connection: AsyncConnection,
+    rows: Iterator[tuple[int, dict[str, Any] | str]],
+    executor: Executor,
+    workers: int,
+    batch_size: int,
+    max_errors: int,
+) -> ImportStats:
+    """Validate the feed in batches and binary-COPY the valid rows into the staging table.
+
+    Batches are validated in the executor while earlier ones are being copied.
+    """
+
+    raw_connection = await connection.get_raw_connection()
+    driver_connection = raw_connection.driver_connection
+    loop = asyncio.get_running_loop()
+    # Enough batches in flight to keep every worker busy while one is being copied.
+    max_pending = workers * 2
+    stats = ImportStats()
+    pending: list[asyncio.Future[ValidatedBatch]] = []
+
+    async def copy_next() -> None:
+        validated = await pending.pop(0)
+        stats.invalid += len(validated.errors)
+        stats.errors.extend(validated.errors[: max(max_errors - len(stats.errors), 0)])
+        if validated.records:
+            await driver_connection.copy_records_to_table(
+                "listing_import", records=validated.records, columns=STAGING_COLUMNS
+            )
+
+    for batch in batches(rows, batch_size):
+        stats.read += len(batch)
+        pending.append(loop.run_in_executor(executor, validate_batch, batch))
+        if len(pending) >= max_pending:
+            await copy_next()
+    while pending:
+        await copy_next()
+    return stats
+
+
+async def run(
+    path: Path,
+    feed_format: str,
+    owner_email: str,
+    batch_size: int,
+    workers: int,
+    max_errors: int,
+    dry_run: bool,
+) -> None:
+    rows = read_csv(path) if feed_format == "csv" else read_ndjson(path)
+    executor: Executor = (
+        ProcessPoolExecutor(max_workers=workers) if workers > 1 else ThreadPoolExecutor(1)
+    )
+    timings: dict[str, float] = {}
+
+    started = time.perf_counter()
+    async with engine.connect() as connection:
+        owner_id = await connection.scalar(
+            text("SELECT id FROM users WHERE email = :email"), {"email": owner_email}
+        )
+        if owner_id is None:
+            raise SystemExit(f"No user with email {owner_email}")
+
+        # The COPY goes through the driver connection, inside the transaction
+        # SQLAlchemy has begun, so a failed import leaves nothing behind.
+        await connection.execute(CREATE_STAGING_SQL)
+        with executor:
+            stats = await load_staging(
+                connection, rows, executor, max(workers, 1), batch_size, max_errors
+            )
+        timings["validate + copy"] = time.perf_counter() - started
+
+        phase_started = time.perf_counter()
+        await connection.execute(DEDUPLICATE_SQL)
+        await connection.execute(text("ANALYZE listing_import_rows"))
+        distinct = await connection.scalar(text("SELECT count(*) FROM listing_import_rows"))
+        inserted, updated = (
+            await connection.execute(UPSERT_SQL, {"owner_id": owner_id})
+        ).one()
+        timings["upsert listings"] = time.perf_counter() - phase_started
+
+        phase_started = time.perf_counter()
+        removed_images = (
+            await connection.execute(DELETE_IMAGES_SQL, {"owner_id": owner_id})
+        ).rowcount
+        added_images = (
+            await connection.execute(INSERT_IMAGES_SQL, {"owner_id": owner_id})
+        ).rowcount
+        timings["sync images"] = time.perf_counter() - phase_started
+
+        if dry_run:
+            await connection.rollback()
+        else:
+            await connection.commit()
+    await engine.dispose()
+    elapsed = time.perf_counter() - started
+
+    for line, message in stats.errors:
+        print(f"line {line}: {message}")
+    if stats.invalid > len(stats.errors):
+        print(f"... and {stats.invalid - len(stats.errors)} more invalid rows")
+    valid = stats.read - stats.invalid
+    print(
+        f"{stats.read} rows read, {valid} valid, {stats.invalid} invalid, "
+        f"{valid - distinct} duplicates"
+    )
+    print(
+        f"{inserted} listings created, {updated} updated, "
+        f"{distinct - inserted - updated} unchanged or owned by another user"
+    )
+    print(f"{added_images} images added, {removed_images} removed")
+    for phase, seconds in timings.items():
+        print(f"{phase:<16} {seconds:>8.1f}s")
+    print(f"{'total':<16} {elapsed:>8.1f}s  {stats.read / elapsed:,.0f} rows/s")
+    if dry_run:
+        print("Dry run: rolled back")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Import a CSV or NDJSON listing feed: rows are validated in batches, COPYed into "
+            "a staging table and upserted by id, together with their images"
+        )
+    )
+    parser.add_argument("path", type=Path, help="Feed file, in the listing export format")
+    parser.add_argument(
+        "--format",
+        dest="feed_format",
+        choices=("csv", "ndjson"),
+        help="Feed format; defaults to the file extension",
+    )
+    parser.add_argument(
+        "--owner-email", required=True, help="User that owns the imported listings"
+    )
+    parser.add_argument("--batch-size", type=int, default=10_000, help="Rows per batch")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Processes validating batches; 1 validates in a single background thread",
+    )
+    parser.add_argument(
+        "--max-errors", type=int, default=20, help="Invalid rows to print in detail"
+    )
+    parser.add_argument(
+        "--dry-run", action="store_true", help="Validate and stage the feed, then roll back"
+    )
+    args = parser.parse_args()
+
+    feed_format = args.feed_format or args.path.suffix.lstrip(".").lower()
+    if feed_format in ("json", "jsonl"):
+        feed_format = "ndjson"
+    if feed_format not in ("csv", "ndjson"):
+        parser.error("cannot tell the feed format from the file name; pass --format")
+
+    asyncio.run(
+        run(
+            args.path,
+            feed_format,
+            args.owner_email,
+            args.batch_size,
+            args.workers,
+            args.max_errors,
+            args.dry_run,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
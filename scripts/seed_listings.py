@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+import uuid
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.db.session import engine
+
+# (city, latitude, longitude) of each seeded city centre.
+CITIES = [
+    ("Berlin", 52.520, 13.405),
+    ("Hamburg", 53.551, 9.994),
+    ("Munich", 48.137, 11.575),
+    ("Cologne", 50.938, 6.960),
+    ("Frankfurt", 50.110, 8.682),
+    ("Stuttgart", 48.776, 9.183),
+    ("Leipzig", 51.340, 12.375),
+    ("Dresden", 51.050, 13.738),
+    ("Vienna", 48.208, 16.374),
+    ("Zurich", 47.377, 8.542),
+    ("Lisbon", 38.722, -9.139),
+    ("Porto", 41.158, -8.629),
+    ("Madrid", 40.417, -3.704),
+    ("Barcelona", 41.385, 2.173),
+    ("Valencia", 39.470, -0.376),
+    ("Paris", 48.857, 2.352),
+    ("Lyon", 45.764, 4.836),
+    ("Warsaw", 52.230, 21.012),
+    ("Krakow", 50.065, 19.945),
+    ("Prague", 50.076, 14.438),
+]
+
+# Vocabulary for titles and descriptions, so full-text searches have realistic selectivity.
+ADJECTIVES = [
+    "Bright", "Spacious", "Cozy", "Modern", "Renovated", "Quiet", "Sunny", "Charming",
+    "Elegant", "Historic", "Luxury", "Compact", "Family", "Penthouse", "Loft",
+]
+FEATURES = [
+    "balcony", "garden", "terrace", "garage", "river view", "rooftop terrace", "fireplace",
+    "swimming pool", "sea view", "home office", "wine cellar", "sauna",
+]
+NEARBY = [
+    "metro", "park", "schools", "old town", "university", "shopping centre", "beach",
+    "train station", "airport", "hospital", "lake",
+]
+AMENITIES = [
+    "newly renovated kitchen", "floor heating", "high ceilings", "elevator", "parking space",
+    "storage room", "pets allowed", "fully furnished", "air conditioning", "solar panels",
+    "fibre internet", "concierge", "gym", "bike storage",
+]
+
+SEED_USERS_SQL = text(
+    """
+    INSERT INTO users (id, email, hashed_password, full_name, role)
+    SELECT
+        gen_random_uuid(),
+        'seed-' || :batch || '-' || g || '@example.com',
+        '!',
+        'Seed user',
+        'user'
+    FROM generate_series(1, :users) AS g
+    """
+)
+
+# Rows are generated server-side so millions of listings seed in seconds.
+SEED_LISTINGS_SQL = text(
+    """
+    INSERT INTO listings (
+        id, user_id, title, description, property_type, listing_type,
+        price, currency, city, area_sqm, rooms, latitude, longitude, created_at
+    )
+    SELECT
+        gen_random_uuid(),
+        seed_users.ids[1 + (g % array_length(seed_users.ids, 1))],
+        words.adjectives[1 + floor(random() * cardinality(words.adjectives))::int]
+            || ' ' || (ARRAY['apartment', 'house', 'plot', 'office'])[1 + g % 4]
+            || ' with ' || words.features[1 + floor(random() * cardinality(words.features))::int],
+        'Close to ' || words.nearby[1 + floor(random() * cardinality(words.nearby))::int]
+            || ', ' || words.amenities[1 + floor(random() * cardinality(words.amenities))::int]
+            || ' and ' || words.amenities[1 + floor(random() * cardinality(words.amenities))::int]
+            || '. Seeded listing number ' || g || '.',
+        (ARRAY['apartment', 'house', 'land', 'office'])[1 + g % 4]::property_type_enum,
+        (ARRAY['sale', 'rent'])[1 + (g / 4) % 2]::listing_type_enum,
+        round((random() * 2000000)::numeric, 2),
+        'EUR',
+        (CAST(:cities AS text[]))[1 + (g * 7) % cardinality(CAST(:cities AS text[]))],
+        20 + (random() * 400)::int,
+        (random() * 8)::int,
+        -- Scattered within roughly 15 km of the city centre.
+        (CAST(:latitudes AS float8[]))[1 + (g * 7) % cardinality(CAST(:cities AS text[]))]
+            + (random() - 0.5) * 0.27,
+        (CAST(:longitudes AS float8[]))[1 + (g * 7) % cardinality(CAST(:cities AS text[]))]
+            + (random() - 0.5) * 0.4,
+        now() - (random() * interval '730 days')
+    FROM generate_series(1, :count) AS g,
+        (
+            SELECT array_agg(id) AS ids
+            FROM users
+            WHERE email LIKE 'seed-' || :batch || '-%'
+        ) AS seed_users,
+        (
+            SELECT
+                CAST(:adjectives AS text[]) AS adjectives,
+                CAST(:features AS text[]) AS features,
+                CAST(:nearby AS text[]) AS nearby,
+                CAST(:amenities AS text[]) AS amenities
+        ) AS words
+    """
+)
+
+SEED_IMAGES_SQL = text(
+    """
+    INSERT INTO listing_images (id, listing_id, url, created_at)
+    SELECT
+        gen_random_uuid(),
+        listings.id,
+        'https://storage.googleapis.com/seed-listings/' || listings.id || '/' || n || '.jpg',
+        listings.created_at
+    FROM listings
+    JOIN users ON users.id = listings.user_id
+    CROSS JOIN generate_series(1, :images_per_listing) AS n
+    WHERE users.email LIKE 'seed-' || :batch || '-%'
+    """
+)
+
+
+async def seed_listings(
+    connection: AsyncConnection,
+    count: int,
+    *,
+    users: int = 100,
+    images_per_listing: int = 2,
+    chunk_size: int = 100_000,
+) -> None:
+    """Insert ``count`` synthetic listings owned by ``users`` freshly created seed users."""
+
+    batch = uuid.uuid4().hex[:8]
+    await connection.execute(SEED_USERS_SQL, {"batch": batch, "users": users})
+    remaining = count
+    while remaining > 0:
+        chunk = min(chunk_size, remaining)
+        await connection.execute(
+            SEED_LISTINGS_SQL,
+            {
+                "batch": batch,
+                "count": chunk,
+                "cities": [city for city, _, _ in CITIES],
+                "latitudes": [latitude for _, latitude, _ in CITIES],
+                "longitudes": [longitude for _, _, longitude in CITIES],
+                "adjectives": ADJECTIVES,
+                "features": FEATURES,
+                "nearby": NEARBY,
+                "amenities": AMENITIES,
+            },
+        )
+        remaining -= chunk
+    await connection.execute(
+        SEED_IMAGES_SQL, {"batch": batch, "images_per_listing": images_per_listing}
+    )
+    await connection.execute(text("ANALYZE listings"))
+    await connection.execute(text("ANALYZE listing_images"))
+
+
+async def run(count: int, users: int, images_per_listing: int) -> None:
+    started = time.perf_counter()
+    async with engine.begin() as connection:
+        await seed_listings(connection, count, users=users, images_per_listing=images_per_listing)
+    await engine.dispose()
+    elapsed = time.perf_counter() - started
+    print(f"Seeded {count} listings for {users} users in {elapsed:.1f}s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Seed the database with synthetic listings")
+    parser.add_argument("--count", type=int, default=100_000, help="Number of listings to insert")
+    parser.add_argument("--users", type=int, default=100, help="Number of seed users owning them")
+    parser.add_argument(
+        "--images-per-listing", type=int, default=2, help="Image rows to attach to each listing"
+    )
+    args = parser.parse_args()
+
+    asyncio.run(run(args.count, args.users, args.images_per_listing))
+
+
+if __name__ == "__main__":
+    main()